@@ -1,13 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ExifTags
+from PIL import ImageTk
 import os
-import shutil
-import re # 파일명으로 부적합한 문자 제거용
 import subprocess
 import platform
 import threading
 import queue
+import time
+from gearview_core import (PhotoLibrary, iter_scan_events, remove_from_scan_index, run_file_jobs,
+                           PreviewLoader, ThumbnailCache, DEFAULT_SCAN_WORKERS, MAX_SCAN_WORKERS,
+                           DEFAULT_FILE_WORKERS, MAX_FILE_WORKERS, DEFAULT_DEVICE_WORKERS, MAX_DEVICE_WORKERS,
+                           find_duplicates, get_redundant_copies, get_app_data_dir,
+                           metrics, ThreadProfiler, format_profile, FolderWatcher, GROUP_FIELDS, EXTRA_FIELDS,
+                           natural_sort_key, check_date_bound)
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
     DND_AVAILABLE = True
@@ -18,100 +23,69 @@ except ImportError:
 # --- 전역 변수 및 데이터 구조 ---
 source_folders = []
 target_folder = ""
-# scanned_files_by_name: Key: filename, Value: filepath (파일명 중복 시 첫 번째 파일만)
-scanned_files_by_name = {}
-# files_by_camera_lens: Key: camera_model, Value: dict {lens_model: [filepaths]}
-files_by_camera_lens = {}
+# 분석 결과 데이터 모델 (카메라 > 렌즈 > 파일, 그룹별 개수는 library가 미리 계산해 둠)
+# 연도/초점 거리 등 추가 필드도 함께 읽어 두고 Group By 창에서 다시 읽지 않고 묶음
+library = PhotoLibrary(extra_fields=EXTRA_FIELDS)
+# 트리뷰 아이템 ID: 카메라 -> 아이템, (카메라, 렌즈) -> 아이템, 파일 경로 -> 아이템
+camera_tree_nodes = {}
+lens_tree_nodes = {}
+file_tree_nodes = {}
+# 파일 아이템 ID -> 파일 경로 (선택 처리 시 트리에 values를 묻지 않기 위함)
+file_node_paths = {}
+# 카메라/렌즈 아이템 ID -> (카메라, 렌즈 또는 None), 하위 노드를 이미 만든 아이템 ID 집합
+# 렌즈/파일 노드는 상위 그룹을 처음 펼칠 때 만들어짐 (그 전에는 펼침 화살표용 빈 자식만 있음)
+tree_node_keys = {}
+populated_tree_nodes = set()
 # 현재 정렬 모드 ('count' 또는 'name')
 current_sort_mode = 'count'
 # 스캔 결과를 위한 큐
 scan_result_queue = queue.Queue()
-
-# --- EXIF 처리 함수 ---
-def get_exif_data(filepath):
-    """ 이미지 파일에서 EXIF 데이터를 읽어옵니다. """
+# check_scan_result가 한 번에 큐를 처리하는 최대 시간 (UI 응답성 유지)
+SCAN_UI_TIME_BUDGET = 0.05
+# 진행률 계산용 스캔 상태
+scan_progress = {'total': 0, 'processed': 0, 'start_time': 0.0}
+# 미리보기 디코딩 (백그라운드 스레드 + LRU 캐시 + 디스크 썸네일 캐시), 결과는 큐로 메인 스레드에 전달
+preview_loader = PreviewLoader(thumbnail_cache=ThumbnailCache())
+preview_result_queue = queue.Queue()
+preview_poll = {'after_id': None}
+# 복사/이동 진행 상황 큐 (작업 스레드 -> 메인 스레드), 진행 중인 작업 상태
+file_job_queue = queue.Queue()
+file_job_state = {'action': None, 'cancel_event': None}
+# 중복 파일 찾기 결과 큐 (작업 스레드 -> 메인 스레드)
+duplicates_queue = queue.Queue()
+# 작업 스레드가 진행 상황을 큐에 넣는 최소 간격 (초)
+FILE_PROGRESS_INTERVAL = 0.1
+# 선택한 파일 위/아래로 미리 만들어 둘 미리보기 수
+PREVIEW_PREFETCH_COUNT = 3
+# 스캔 후 소스 폴더 감시 (Linux는 inotify, 그 외 폴링), 변경 내용 큐 (감시 스레드 -> 메인 스레드)
+watch_state = {'watcher': None, 'mode': None}
+watch_queue = queue.Queue()
+# 감시 변경 내용을 확인하는 간격 (ms)
+WATCH_POLL_MS = 500
+# 필터 막대: 조건이 있으면 트리뷰는 library 대신 조건에 맞는 파일만 담은 view를 표시 (shown_library)
+filter_state = {'view': None, 'after_id': None}
+# 입력이 멈춘 뒤 필터를 적용하기까지 기다리는 시간 (ms)
+FILTER_DELAY_MS = 200
+# Group By 창 (열려 있으면 창, 트리뷰, 단계 선택 변수, 현재 그룹 결과)
+# 그룹 노드 ID -> 그룹 이름 튜플, 파일 노드 ID -> 파일 경로
+group_by_state = {'window': None, 'tree': None, 'status': None, 'level_vars': [], 'grouping': None,
+                  'node_prefixes': {}, 'file_paths': {}}
+# Group By 창의 단계 수와 기본 단계
+GROUP_BY_LEVELS = 3
+GROUP_BY_DEFAULT_KEYS = ('lens', 'focal_length', 'year')
+# 진단 창 (열려 있으면 창과 텍스트 위젯), 마지막 cProfile 결과 요약
+diagnostics_state = {'window': None, 'text': None, 'after_id': None, 'profile_report': ""}
+# 진단 창이 열려 있는 동안 계측 값을 다시 표시하는 간격 (ms)
+DIAGNOSTICS_REFRESH_MS = 1000
+
+def read_worker_count(count_var, default_count, max_count):
+    """ 작업자 수 입력 칸을 읽어 1~max_count로 맞춥니다. (잘못된 값이면 기본값 사용, 맞춘 값을 칸에 다시 표시) """
     try:
-        img = Image.open(filepath)
-        exif_data_pil = img._getexif() # Pillow 내부 형식의 EXIF 데이터
-        if exif_data_pil is None:
-            return {}
-
-        exif = {}
-        for tag_id, value in exif_data_pil.items():
-            tag_name = ExifTags.TAGS.get(tag_id, tag_id)
-            exif[tag_name] = value
-        return exif
-    except Exception as e:
-        print(f"Error reading EXIF for {filepath}: {e}")
-        return {}
-
-def get_lens_info(exif_data):
-    """ EXIF 데이터에서 렌즈 모델 정보를 추출합니다. """
-    lens_model = exif_data.get('LensModel')
-    if lens_model:
-        # 간혹 바이트 문자열로 반환되는 경우 디코딩
-        if isinstance(lens_model, bytes):
-            try:
-                lens_model = lens_model.decode('utf-8', errors='replace').strip()
-            except UnicodeDecodeError:
-                lens_model = str(lens_model) # 디코딩 실패 시 문자열로 강제 변환
-        return str(lens_model).strip() # 공백 제거
-
-    lens_make = exif_data.get('LensMake')
-    # 다른 렌즈 관련 태그들을 조합하여 정보를 만들 수도 있습니다.
-    # 예: FocalLength, FNumber 등
-    # 여기서는 LensModel이 없으면 LensMake라도 반환하거나, 더 복잡한 로직을 추가할 수 있습니다.
-    if lens_make:
-        if isinstance(lens_make, bytes):
-            try:
-                lens_make = lens_make.decode('utf-8', errors='replace').strip()
-            except UnicodeDecodeError:
-                lens_make = str(lens_make)
-        return f"Make: {str(lens_make).strip()}"
-
-    return "No lens info"
-
-def get_camera_info(exif_data):
-    """ EXIF 데이터에서 카메라 모델 정보를 추출합니다. """
-    camera_model = exif_data.get('Model')
-    camera_make = exif_data.get('Make')
-    
-    if camera_model:
-        # 간혹 바이트 문자열로 반환되는 경우 디코딩
-        if isinstance(camera_model, bytes):
-            try:
-                camera_model = camera_model.decode('utf-8', errors='replace').strip()
-            except UnicodeDecodeError:
-                camera_model = str(camera_model)
-        
-        camera_model = str(camera_model).strip()
-        
-        # 제조사 정보가 있고 모델명에 제조사가 포함되지 않은 경우 조합
-        if camera_make:
-            if isinstance(camera_make, bytes):
-                try:
-                    camera_make = camera_make.decode('utf-8', errors='replace').strip()
-                except UnicodeDecodeError:
-                    camera_make = str(camera_make)
-            
-            camera_make = str(camera_make).strip()
-            
-            # 모델명에 제조사명이 이미 포함되어 있는지 확인
-            if camera_make.lower() not in camera_model.lower():
-                return f"{camera_make} {camera_model}"
-        
-        return camera_model
-    
-    # 모델 정보가 없으면 제조사라도 반환
-    if camera_make:
-        if isinstance(camera_make, bytes):
-            try:
-                camera_make = camera_make.decode('utf-8', errors='replace').strip()
-            except UnicodeDecodeError:
-                camera_make = str(camera_make)
-        return f"Make: {str(camera_make).strip()}"
-    
-    return "No camera info"
+        worker_count = max(1, min(max_count, int(count_var.get())))
+    except (ValueError, tk.TclError):
+        worker_count = default_count
+    count_var.set(worker_count)
+    return worker_count
 
 # --- 파일 스캔 및 분석 함수 ---
 def scan_and_analyze_files():
@@ -119,97 +93,265 @@ def scan_and_analyze_files():
         messagebox.showwarning("Warning", "Please select source folders first.")
         return
     
-    # 스캔 버튼 비활성화
+    worker_count = read_worker_count(scan_workers_var, DEFAULT_SCAN_WORKERS, MAX_SCAN_WORKERS)
+    
+    # 다시 스캔하는 동안은 감시 중지 (스캔이 끝나면 새 결과로 다시 시작)
+    stop_folder_watch()
+    
+    # 스캔/클리어 버튼 비활성화
     scan_button.config(state='disabled')
+    clear_button.config(state='disabled')
     
-    # 프로그레스바 표시
+    # 이전 결과 초기화 (결과는 스캔 중에 배치 단위로 채워짐)
+    library.clear()
+    apply_filter()
+    cancel_image_preview()
+    scan_progress.update(total=0, processed=0, start_time=time.perf_counter())
+    
+    # 프로그레스바 표시 (파일 목록 수집 중에는 전체 개수를 모르므로 indeterminate)
     progress_bar.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
-    progress_bar.config(mode='indeterminate')
+    progress_bar.config(mode='indeterminate', value=0)
     progress_bar.start()
+    status_label.config(text="Listing files...")
     
     # 백그라운드에서 스캔 실행
-    scan_thread = threading.Thread(target=scan_files_background)
+    scan_thread = threading.Thread(target=scan_files_background,
+                                   args=(list(source_folders), worker_count,
+                                         follow_symlinks_var.get(), skip_hidden_var.get(), profile_scan_var.get()))
     scan_thread.daemon = True
     scan_thread.start()
     
     # 결과 확인을 위한 타이머 시작
     window.after(100, check_scan_result)
 
-def scan_files_background():
-    global scanned_files_by_name, files_by_camera_lens, scan_result_queue
-    
+def scan_files_background(folders, worker_count=DEFAULT_SCAN_WORKERS, follow_symlinks=False, skip_hidden=False,
+                          profile=False):
+    """ 백그라운드 스캔: 엔진의 스캔 이벤트를 그대로 scan_result_queue로 넘깁니다.
+    ("listing", 개수) -> ("total", 개수) -> ("batch", [...]) 반복 -> ("success", 메시지) 또는 ("error", 메시지)
+    분석 결과(library)는 UI 스레드의 check_scan_result에서만 변경합니다.
+    profile이면 스캔 스레드와 작업자 스레드를 cProfile로 기록해 ("profile", 저장 경로, 요약)을 success 앞에 보냅니다. """
+    profiler = None
+    if profile:
+        profiler = ThreadProfiler()
+        profiler.start()
     try:
-        scanned_files_by_name.clear()
-        files_by_camera_lens.clear()
-        
-        file_count = 0
-        for folder_path in source_folders:
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    if file.lower().endswith(('.jpg', '.jpeg')):
-                        file_path = os.path.join(root, file)
-                        # 파일명 기준 중복 처리: 이미 같은 이름의 파일이 있다면 건너뜀
-                        if file not in scanned_files_by_name:
-                            scanned_files_by_name[file] = file_path
-                            file_count += 1
-                            # EXIF 분석
-                            exif = get_exif_data(file_path)
-                            lens_info = get_lens_info(exif)
-                            camera_info = get_camera_info(exif)
-
-                            # 카메라별 > 렌즈별 2단계 분류
-                            if camera_info not in files_by_camera_lens:
-                                files_by_camera_lens[camera_info] = {}
-                            
-                            if lens_info not in files_by_camera_lens[camera_info]:
-                                files_by_camera_lens[camera_info][lens_info] = []
-                            
-                            files_by_camera_lens[camera_info][lens_info].append(file_path)
-        
-        # 결과를 큐에 넣기
-        total_lens_groups = sum(len(lenses) for lenses in files_by_camera_lens.values())
-        result_message = f"Analysis complete: {len(scanned_files_by_name)} unique JPG files processed. {len(files_by_camera_lens)} cameras, {total_lens_groups} lens groups."
-        scan_result_queue.put(("success", result_message))
-        
+        for event in iter_scan_events(folders, worker_count, follow_symlinks=follow_symlinks, skip_hidden=skip_hidden,
+                                      extra_fields=library.extra_fields):
+            if event[0] == "success" and profiler is not None:
+                scan_result_queue.put(save_scan_profile(profiler.stop()))
+                profiler = None
+            scan_result_queue.put(event)
     except Exception as e:
         scan_result_queue.put(("error", str(e)))
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+def save_scan_profile(stats):
+    """ cProfile 결과를 설정 폴더에 저장하고 ("profile", 경로, 요약) 메시지를 만듭니다. """
+    profile_path = os.path.join(get_app_data_dir(), "scan_profile.prof")
+    try:
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        stats.dump_stats(profile_path)
+    except OSError as e:
+        print(f"Failed to save scan profile: {e}")
+        profile_path = None
+    return ("profile", profile_path, format_profile(stats))
+
 
 def check_scan_result():
+    """ 스캔 큐의 메시지를 처리합니다. 한 번에 SCAN_UI_TIME_BUDGET 동안만 처리하고 다시 예약합니다. """
+    deadline = time.perf_counter() + SCAN_UI_TIME_BUDGET
     try:
-        result_type, message = scan_result_queue.get_nowait()
-        
-        # 프로그레스바 숨기기
-        progress_bar.stop()
-        progress_bar.pack_forget()
-        
-        # 스캔 버튼 다시 활성화
-        scan_button.config(state='normal')
-        
-        if result_type == "success":
-            update_treeview()
-            status_label.config(text=message)
-            if not scanned_files_by_name:
-                messagebox.showinfo("Info", "No JPG files found in selected folders.")
-        else:
-            status_label.config(text="Error occurred during scanning.")
-            messagebox.showerror("Error", f"An error occurred: {message}")
+        while time.perf_counter() < deadline:
+            message = scan_result_queue.get_nowait()
+            result_type = message[0]
             
+            if result_type == "listing":
+                status_label.config(text=f"Listing files... {message[1]} found")
+            elif result_type == "total":
+                # 전체 파일 수가 정해지면 determinate 진행률로 전환
+                scan_progress['total'] = message[1]
+                progress_bar.stop()
+                progress_bar.config(mode='determinate', maximum=max(1, message[1]), value=0)
+            elif result_type == "batch":
+                merge_scan_batch(message[1])
+                scan_progress['processed'] += len(message[1])
+                update_scan_progress()
+            elif result_type == "profile":
+                _, profile_path, profile_summary = message
+                diagnostics_state['profile_report'] = f"cProfile of the last scan (saved to {profile_path}):\n\n{profile_summary}"
+                profile_scan_var.set(False)  # 프로파일은 한 번의 스캔에만 적용
+                refresh_diagnostics()
+            else:
+                finish_scan(result_type, message[1])
+                return
     except queue.Empty:
-        # 아직 결과가 없으면 다시 확인
-        window.after(100, check_scan_result)
+        pass
+    # 아직 스캔이 끝나지 않았으면 다시 확인
+    window.after(50, check_scan_result)
+
+def update_scan_progress():
+    """ 진행률 바와 상태 표시줄에 처리 속도와 남은 시간을 표시합니다. """
+    processed = scan_progress['processed']
+    total = scan_progress['total']
+    progress_bar.config(value=processed)
+    elapsed = time.perf_counter() - scan_progress['start_time']
+    files_per_second = processed / elapsed if elapsed > 0 else 0
+    if files_per_second > 0:
+        remaining_seconds = int((total - processed) / files_per_second)
+        eta = f"{remaining_seconds // 60}:{remaining_seconds % 60:02d}"
+    else:
+        eta = "--:--"
+    status_label.config(text=f"Scanning: {processed}/{total} files ({files_per_second:.0f} files/s, ETA {eta})")
+
+def finish_scan(result_type, message):
+    # 프로그레스바 숨기기
+    progress_bar.stop()
+    progress_bar.pack_forget()
+    
+    # 스캔/클리어 버튼 다시 활성화
+    scan_button.config(state='normal')
+    clear_button.config(state='normal')
+    
+    if result_type == "success":
+        # 스트리밍 중에는 도착 순서로 추가한 파일 노드를 수정 날짜 순으로 정렬
+        if filter_state['view'] is not None:
+            apply_filter()
+        sort_file_nodes()
+        refresh_group_by_window()
+        status_label.config(text=message)
+        if not library:
+            messagebox.showinfo("Info", "No photos found in selected folders.")
+        elif watch_folders_var.get():
+            start_folder_watch()
+    else:
+        status_label.config(text="Error occurred during scanning.")
+        messagebox.showerror("Error", f"An error occurred: {message}")
+
+def merge_scan_batch(batch):
+    """ 스캔 배치를 분석 결과에 병합하고 트리뷰에 노드를 추가합니다. (UI 스레드 전용)
+    렌즈/파일 노드는 상위 그룹이 이미 펼쳐진 경우에만 추가합니다. """
+    started = time.perf_counter()
+    if filter_state['view'] is not None:
+        # 필터 중에는 결과에만 추가하고 트리는 잠시 뒤 필터를 다시 적용해 갱신
+        # (배치마다 미루면 스캔이 끝날 때까지 갱신되지 않으므로 이미 예약돼 있으면 그대로 둠)
+        for file_path, camera_info, lens_info, file_stat, field_values in batch:
+            library.add_file(file_path, camera_info, lens_info, file_stat, field_values)
+        if filter_state['after_id'] is None:
+            schedule_filter()
+        metrics.observe("tree.merge_batch", time.perf_counter() - started)
+        return
+    touched_groups = set()
+    for file_path, camera_info, lens_info, file_stat, field_values in batch:
+        # 카메라별 > 렌즈별 2단계 분류 (추가 필드 값은 Group By 창용으로 함께 저장)
+        library.add_file(file_path, camera_info, lens_info, file_stat, field_values)
+        touched_groups.add((camera_info, lens_info))
+        
+        camera_node = camera_tree_nodes.get(camera_info)
+        if camera_node is None:
+            insert_camera_node(camera_info)
+        elif camera_node in populated_tree_nodes:
+            lens_node = lens_tree_nodes.get((camera_info, lens_info))
+            if lens_node is None:
+                insert_lens_node(camera_info, lens_info)
+            elif lens_node in populated_tree_nodes:
+                insert_file_node(lens_node, file_path)
+    
+    # 바뀐 그룹의 개수 표시 갱신
+    touched_cameras = set()
+    for camera_info, lens_info in touched_groups:
+        lens_node = lens_tree_nodes.get((camera_info, lens_info))
+        if lens_node is not None:
+            result_tree.item(lens_node, text=lens_node_text(camera_info, lens_info))
+        touched_cameras.add(camera_info)
+    for camera_info in touched_cameras:
+        result_tree.item(camera_tree_nodes[camera_info], text=camera_node_text(camera_info))
+    reorder_group_nodes(touched_cameras)
+    metrics.observe("tree.merge_batch", time.perf_counter() - started)
 
 def clear_analysis_results():
     """분석 결과 리스트 초기화"""
-    global scanned_files_by_name, files_by_camera_lens
-    scanned_files_by_name.clear()
-    files_by_camera_lens.clear()
-    update_treeview()
-    clear_image_preview()
+    stop_folder_watch()
+    library.clear()
+    apply_filter()
+    refresh_group_by_window()
+    cancel_image_preview()
     status_label.config(text="Analysis results cleared.")
 
+# --- 폴더 감시 함수 ---
+def on_watch_toggle():
+    if not watch_folders_var.get():
+        stop_folder_watch()
+        status_label.config(text="Stopped watching source folders.")
+    elif library:
+        start_folder_watch()
+    else:
+        status_label.config(text="Source folders will be watched after the next scan.")
+
+def start_folder_watch():
+    """ 현재 분석 결과를 기준으로 소스 폴더 감시를 (다시) 시작합니다.
+    바뀐 파일만 감시 스레드에서 분석하고 결과는 watch_queue로 받습니다. """
+    stop_folder_watch()
+    if not source_folders:
+        return
+    known_files = [(file_path, file_stat) for file_path, _, _, file_stat in library.iter_files()]
+    watcher = FolderWatcher(list(source_folders), lambda rows, removed_paths: watch_queue.put((rows, removed_paths)),
+                            known_files, follow_symlinks=follow_symlinks_var.get(), skip_hidden=skip_hidden_var.get(),
+                            extra_fields=library.extra_fields)
+    watch_state.update(watcher=watcher, mode=None)
+    watcher.start()
+    window.after(WATCH_POLL_MS, check_watch_result, watcher)
+
+def stop_folder_watch():
+    """ 감시를 멈추고 아직 반영하지 않은 변경은 버립니다. (다시 스캔하거나 결과를 지울 때) """
+    watcher = watch_state['watcher']
+    if watcher is None:
+        return
+    watcher.stop()
+    watch_state.update(watcher=None, mode=None)
+    while True:
+        try:
+            watch_queue.get_nowait()
+        except queue.Empty:
+            break
+
+def check_watch_result(watcher):
+    """ 감시 스레드가 보낸 변경을 반영합니다. 감시가 바뀌거나 멈추면 예약을 끝냅니다. """
+    if watch_state['watcher'] is not watcher:
+        return
+    if watch_state['mode'] != watcher.mode:
+        watch_state['mode'] = watcher.mode
+        status_label.config(text=f"Watching {len(watcher.folders)} source folders for changes ({watcher.mode}).")
+    try:
+        while True:
+            rows, removed_paths = watch_queue.get_nowait()
+            apply_watch_changes(rows, removed_paths)
+    except queue.Empty:
+        pass
+    window.after(WATCH_POLL_MS, check_watch_result, watcher)
+
+def apply_watch_changes(rows, removed_paths):
+    """ 감시로 찾은 변경을 분석 결과와 트리뷰에 반영합니다. (UI 스레드 전용)
+    바뀐 파일은 기존 노드를 지우고 새 그룹에 다시 넣으며, 영향받은 그룹의 개수와 파일 순서만 갱신합니다. """
+    stale_paths = list(removed_paths) + [row[0] for row in rows if row[0] in library]
+    if stale_paths:
+        remove_files_from_results(stale_paths)
+    if rows:
+        merge_scan_batch(rows)
+        if filter_state['view'] is None:
+            for camera_info, lens_info in {(row[1], row[2]) for row in rows}:
+                sort_lens_file_nodes(camera_info, lens_info)
+    refresh_group_by_window()
+    status_label.config(text=f"Source folders changed: {len(rows)} files added or updated, "
+                             f"{len(removed_paths)} removed. {len(library)} files in total.")
+
 
 # --- GUI 업데이트 함수 ---
 def update_source_folder_list():
+    # 감시 중이면 바뀐 폴더 목록으로 다시 시작 (새 폴더의 파일은 감시가 새 파일로 추가함)
+    if watch_state['watcher'] is not None:
+        start_folder_watch()
     source_folder_listbox.delete(0, tk.END)
     for folder in source_folders:
         source_folder_listbox.insert(tk.END, folder)
@@ -219,8 +361,20 @@ def update_source_folder_list():
 def on_sort_mode_change():
     global current_sort_mode
     current_sort_mode = sort_mode_var.get()
-    # 트리뷰 업데이트
-    update_treeview()
+    # 트리를 다시 만들지 않고 카메라 노드와 펼쳐진 카메라의 렌즈 노드 순서만 다시 맞춤
+    reorder_group_nodes(list(camera_tree_nodes))
+    refresh_group_by_window()
+
+def on_tree_open(event):
+    """ 그룹을 처음 펼칠 때 하위 노드(렌즈 또는 파일)를 만듭니다. """
+    item = result_tree.focus()
+    if item in populated_tree_nodes or item not in tree_node_keys:
+        return
+    camera_info, lens_info = tree_node_keys[item]
+    if lens_info is None:
+        populate_camera_node(camera_info)
+    else:
+        populate_lens_node(camera_info, lens_info)
 
 def on_tree_double_click(event):
     """ 트리뷰 아이템 더블클릭 시 파일 열기 """
@@ -245,84 +399,106 @@ def on_tree_double_click(event):
                 messagebox.showerror("Error", f"Cannot open file: {str(e)}")
 
 def on_tree_single_click(event):
-    """트리뷰 단일 클릭 시 이미지 미리보기 업데이트"""
+    """트리뷰 선택 변경 시 이미지 미리보기 요청 (디코딩은 백그라운드에서)"""
     selection = result_tree.selection()
-    if selection:
-        item = selection[0]
-        tags = result_tree.item(item, "tags")
-        
-        # 파일 아이템인 경우
-        if 'file_item' in tags:
-            file_path = result_tree.item(item, "values")[0] if result_tree.item(item, "values") else None
-            if file_path and os.path.exists(file_path):
-                update_image_preview(file_path)
-            else:
-                clear_image_preview()
+    if not selection:
+        cancel_image_preview()
+        return
+    item = selection[0]
+    file_path = file_node_paths.get(item)
+    prefetch_paths = []
+    if file_path is not None:
+        # 파일 아이템: 위/아래 이웃 파일을 미리 만들어 둠 (화살표 키로 넘길 때 대기 없음)
+        prefetch_paths = get_neighbour_file_paths(item)
+    elif item in tree_node_keys:
         # 카메라 그룹이나 렌즈 그룹인 경우 첫 번째 파일 표시
-        elif 'camera_group' in tags or 'lens_group' in tags:
-            # 하위 파일 아이템들 중 첫 번째 찾기
-            first_file_path = find_first_file_in_group(item)
-            if first_file_path:
-                update_image_preview(first_file_path)
-            else:
-                clear_image_preview()
-        else:
-            clear_image_preview()
-    else:
-        clear_image_preview()
+        file_path = find_first_file_in_group(item)
+    if file_path is None:
+        cancel_image_preview()
+        return
+    request_image_preview(file_path, prefetch_paths)
+
+def get_neighbour_file_paths(item):
+    """ 선택한 파일 노드 바로 아래/위 PREVIEW_PREFETCH_COUNT개 형제 파일 경로 (가까운 순) """
+    below, above = [], []
+    next_item = prev_item = item
+    for _ in range(PREVIEW_PREFETCH_COUNT):
+        if next_item:
+            next_item = result_tree.next(next_item)
+            if next_item in file_node_paths:
+                below.append(file_node_paths[next_item])
+        if prev_item:
+            prev_item = result_tree.prev(prev_item)
+            if prev_item in file_node_paths:
+                above.append(file_node_paths[prev_item])
+    neighbours = []
+    for pair in zip(below + [None] * len(above), above + [None] * len(below)):
+        neighbours.extend(path for path in pair if path is not None)
+    return neighbours
 
 def find_first_file_in_group(group_item):
-    """그룹 아이템에서 첫 번째 파일 경로를 찾습니다 (수정 날짜 기준)"""
-    children = result_tree.get_children(group_item)
+    """그룹 아이템에서 첫 번째 파일 경로를 찾습니다 (수정 날짜 기준)
+    하위 노드가 아직 만들어지지 않았을 수 있으므로 트리 대신 분석 결과에서 찾습니다."""
+    group_key = tree_node_keys.get(group_item)
+    if group_key is None:
+        return None
+    camera_info, lens_info = group_key
+    if not shown_library().has_group(camera_info):
+        return None
+    if lens_info is None:
+        # 카메라 그룹이면 트리에서 맨 위에 오는 렌즈 그룹
+        lens_info = sort_lens_groups(camera_info)[0]
     
-    for child in children:
-        child_tags = result_tree.item(child, "tags")
-        
-        # 파일 아이템인 경우
-        if 'file_item' in child_tags:
-            file_path = result_tree.item(child, "values")[0] if result_tree.item(child, "values") else None
-            if file_path and os.path.exists(file_path):
-                return file_path
-        # 하위 그룹인 경우 재귀적으로 탐색
-        else:
-            result = find_first_file_in_group(child)
-            if result:
-                return result
+    for file_path in shown_library().sorted_group_files(camera_info, lens_info):
+        if os.path.exists(file_path):
+            return file_path
     
     return None
 
-def update_image_preview(file_path):
-    """이미지 미리보기 업데이트"""
+def request_image_preview(file_path, prefetch_paths=()):
+    """ 미리보기를 요청합니다. 캐시에 있으면 바로 표시하고, 없으면 준비되는 대로 표시합니다. """
+    preview_loader.request(file_path, library.get_mtime(file_path),
+                           prefetch=[(path, library.get_mtime(path)) for path in prefetch_paths],
+                           callback=lambda *result: preview_result_queue.put(result))
+    check_preview_result()
+
+def check_preview_result():
+    """ 백그라운드에서 만든 미리보기를 메인 스레드에서 표시합니다. """
+    if preview_poll['after_id'] is not None:
+        window.after_cancel(preview_poll['after_id'])
+        preview_poll['after_id'] = None
     try:
-        # 이미지 열기 및 크기 조정
-        image = Image.open(file_path)
-        # 미리보기 크기에 맞게 조정 (비율 유지)
-        preview_size = (200, 150)
-        image.thumbnail(preview_size, Image.Resampling.LANCZOS)
-        
-        # tkinter PhotoImage로 변환
-        from tkinter import PhotoImage
-        import io
-        
-        # PIL Image를 PhotoImage로 변환하기 위해 임시 저장
-        bio = io.BytesIO()
-        image.save(bio, format='PNG')
-        bio.seek(0)
-        
-        # PhotoImage 생성
-        photo = PhotoImage(data=bio.getvalue())
-        
-        # 라벨에 이미지 설정
-        preview_label.configure(image=photo)
-        preview_label.image = photo  # 참조 유지
-        
-        # 파일명 표시
-        filename = os.path.basename(file_path)
-        filename_label.configure(text=filename)
-        
-    except Exception as e:
-        clear_image_preview()
-        print(f"이미지 미리보기 오류: {e}")
+        while True:
+            file_path, image, error = preview_result_queue.get_nowait()
+            if error is None:
+                update_image_preview(file_path, image)
+            else:
+                clear_image_preview()
+                print(f"이미지 미리보기 오류: {error}")
+    except queue.Empty:
+        pass
+    if preview_loader.is_waiting():
+        preview_poll['after_id'] = window.after(15, check_preview_result)
+
+def cancel_image_preview():
+    """ 대기 중인 미리보기 요청과 아직 표시하지 않은 결과를 버리고 미리보기를 지웁니다. """
+    preview_loader.cancel()
+    while not preview_result_queue.empty():
+        preview_result_queue.get_nowait()
+    clear_image_preview()
+
+def update_image_preview(file_path, image):
+    """이미지 미리보기 업데이트"""
+    # PNG로 다시 인코딩하지 않고 Tk 이미지로 바로 전달
+    photo = ImageTk.PhotoImage(image)
+    
+    # 라벨에 이미지 설정
+    preview_label.configure(image=photo)
+    preview_label.image = photo  # 참조 유지
+    
+    # 파일명 표시
+    filename = os.path.basename(file_path)
+    filename_label.configure(text=filename)
 
 def clear_image_preview():
     """이미지 미리보기 지우기"""
@@ -336,20 +512,40 @@ def on_tree_right_click(event):
     if not item:
         return
     
+    # 컨텍스트 메뉴 생성
+    context_menu = tk.Menu(window, tearoff=0)
+    
     # 파일 아이템인지 확인
     values = result_tree.item(item, 'values')
     if values and len(values) > 0:
         file_path = values[0]
         if os.path.isfile(file_path):
-            # 컨텍스트 메뉴 생성
-            context_menu = tk.Menu(window, tearoff=0)
             context_menu.add_command(label="Open Folder", command=lambda: open_file_folder(file_path))
-            
-            # 메뉴 표시
-            try:
-                context_menu.tk_popup(event.x_root, event.y_root)
-            finally:
-                context_menu.grab_release()
+        context_menu.add_command(label="Refresh File Info", command=lambda: refresh_tree_item(item))
+    elif item in tree_node_keys:
+        # 카메라/렌즈 그룹
+        context_menu.add_command(label="Refresh File Info", command=lambda: refresh_tree_item(item))
+    else:
+        return
+    
+    # 메뉴 표시
+    try:
+        context_menu.tk_popup(event.x_root, event.y_root)
+    finally:
+        context_menu.grab_release()
+
+def refresh_tree_item(item):
+    """ 선택한 파일 또는 그룹에 속한 파일의 크기/수정 시각을 다시 읽습니다. """
+    if item in tree_node_keys:
+        camera_info, lens_info = tree_node_keys[item]
+        file_paths = shown_library().get_group_files(camera_info, lens_info)
+    else:
+        file_paths = [file_node_paths[item]]
+    status_label.config(text=f"Refreshing file info ({len(file_paths)} files)...")
+    window.update_idletasks()
+    changed_count, missing_count = refresh_file_stats(file_paths)
+    status_label.config(text=f"File info refreshed: {len(file_paths)} files checked, {changed_count} updated, "
+                             f"{missing_count} missing files removed.")
 
 def open_file_folder(file_path):
     """ 파일이 있는 폴더 열기 """
@@ -367,59 +563,249 @@ def open_file_folder(file_path):
     except Exception as e:
         messagebox.showerror("Error", f"Cannot open folder: {str(e)}")
 
+def sort_camera_groups():
+    """ 카메라 이름을 현재 정렬 모드로 정렬합니다.
+    'count'는 총 파일 수 기준 내림차순 (많은 것이 위로), 'name'은 카메라 이름 오름차순 (ABC 순) """
+    return shown_library().sort_cameras(by_count=(current_sort_mode == 'count'))
+
+def sort_lens_groups(camera_info):
+    """ 카메라의 렌즈 이름을 현재 정렬 모드로 정렬합니다. (파일 수 내림차순 또는 이름순) """
+    return shown_library().sort_lenses(camera_info, by_count=(current_sort_mode == 'count'))
+
+def camera_node_text(camera_info):
+    return (f"{camera_info} ({shown_library().camera_file_count(camera_info)} files, "
+            f"{shown_library().camera_lens_count(camera_info)} lenses)")
+
+def lens_node_text(camera_info, lens_info):
+    return f"{lens_info} ({shown_library().lens_file_count(camera_info, lens_info)} files)"
+
+def reorder_group_nodes(camera_infos):
+    """ 현재 정렬 모드에 맞게 카메라 노드와, 주어진 카메라 중 펼쳐진 카메라의 렌즈 노드 순서만 다시 맞춥니다. """
+    for camera_info in camera_infos:
+        camera_node = camera_tree_nodes.get(camera_info)
+        if shown_library().has_group(camera_info) and camera_node in populated_tree_nodes:
+            result_tree.set_children(camera_node,
+                                     *[lens_tree_nodes[(camera_info, lens_info)]
+                                       for lens_info in sort_lens_groups(camera_info)])
+    if camera_infos:
+        result_tree.set_children("", *[camera_tree_nodes[camera_info] for camera_info in sort_camera_groups()])
+
+def sort_lens_file_nodes(camera_info, lens_info):
+    """ 펼쳐진 렌즈 그룹의 파일 노드를 수정 날짜 내림차순(최신 파일이 위로)으로 정렬합니다.
+    스캔 때 저장한 수정 시각을 사용하므로 파일 시스템에 접근하지 않습니다. (Tk 호출 한 번) """
+    lens_node = lens_tree_nodes.get((camera_info, lens_info))
+    if lens_node in populated_tree_nodes:
+        result_tree.set_children(lens_node, *[file_tree_nodes[file_path]
+                                              for file_path in shown_library().sorted_group_files(camera_info, lens_info)])
+
+def refresh_file_stats(file_paths):
+    """ 저장된 크기/수정 시각을 다시 읽습니다. (우클릭 메뉴의 Refresh File Info)
+    사라진 파일은 결과에서 제거하고, 펼쳐진 렌즈 그룹의 파일 순서를 다시 맞춥니다. """
+    missing_paths = []
+    changed_count = 0
+    changed_groups = set()
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            missing_paths.append(file_path)
+            continue
+        if library.set_stat(file_path, (stat.st_size, stat.st_mtime_ns)):
+            changed_groups.add(library.get_group_key(file_path))
+            changed_count += 1
+    if missing_paths:
+        remove_files_from_results(missing_paths)
+        remove_from_scan_index(missing_paths)
+        refresh_group_by_window()
+    for camera_info, lens_info in changed_groups:
+        if shown_library().has_group(camera_info, lens_info):
+            sort_lens_file_nodes(camera_info, lens_info)
+    return changed_count, len(missing_paths)
+
+def sort_file_nodes():
+    """ 펼쳐진 렌즈 그룹의 파일 노드를 수정 날짜 순으로 정렬합니다. (그룹마다 Tk 호출 한 번) """
+    for camera_info, lens_info in list(lens_tree_nodes):
+        sort_lens_file_nodes(camera_info, lens_info)
+
+def insert_camera_node(camera_info):
+    """ 카메라 노드를 펼침 화살표용 빈 자식과 함께 추가합니다. """
+    camera_node = result_tree.insert("", tk.END, 
+                                   text=camera_node_text(camera_info), 
+                                   open=False, tags=('camera_group',))
+    result_tree.insert(camera_node, tk.END, text="", tags=('placeholder',))
+    metrics.count("tree.inserts", 2)
+    camera_tree_nodes[camera_info] = camera_node
+    tree_node_keys[camera_node] = (camera_info, None)
+    return camera_node
+
+def insert_lens_node(camera_info, lens_info):
+    """ 렌즈 노드를 펼침 화살표용 빈 자식과 함께 추가합니다. """
+    lens_node = result_tree.insert(camera_tree_nodes[camera_info], tk.END, 
+                                 text=lens_node_text(camera_info, lens_info), 
+                                 open=False, tags=('lens_group',))
+    result_tree.insert(lens_node, tk.END, text="", tags=('placeholder',))
+    metrics.count("tree.inserts", 2)
+    lens_tree_nodes[(camera_info, lens_info)] = lens_node
+    tree_node_keys[lens_node] = (camera_info, lens_info)
+    return lens_node
+
+def insert_file_node(lens_node, file_path):
+    filename = os.path.basename(file_path)
+    file_node = result_tree.insert(lens_node, tk.END, text=filename, values=(file_path,), tags=('file_item',))
+    metrics.count("tree.inserts")
+    file_tree_nodes[file_path] = file_node
+    file_node_paths[file_node] = file_path
+
+def populate_camera_node(camera_info):
+    """ 카메라 노드의 빈 자식을 정렬된 렌즈 노드로 바꿉니다. """
+    started = time.perf_counter()
+    camera_node = camera_tree_nodes[camera_info]
+    result_tree.delete(*result_tree.get_children(camera_node))
+    populated_tree_nodes.add(camera_node)
+    for lens_info in sort_lens_groups(camera_info):
+        insert_lens_node(camera_info, lens_info)
+    metrics.observe("tree.populate", time.perf_counter() - started)
+
+def populate_lens_node(camera_info, lens_info):
+    """ 렌즈 노드의 빈 자식을 수정 날짜 순 파일 노드로 바꿉니다. """
+    started = time.perf_counter()
+    lens_node = lens_tree_nodes[(camera_info, lens_info)]
+    result_tree.delete(*result_tree.get_children(lens_node))
+    populated_tree_nodes.add(lens_node)
+    for file_path in shown_library().sorted_group_files(camera_info, lens_info):
+        insert_file_node(lens_node, file_path)
+    metrics.observe("tree.populate", time.perf_counter() - started)
+
+def forget_tree_node(item):
+    """ 삭제할 카메라/렌즈 노드를 매핑에서 제거합니다. """
+    tree_node_keys.pop(item, None)
+    populated_tree_nodes.discard(item)
+
+def shown_library():
+    """ 트리뷰에 표시하는 결과: 필터 중이면 조건에 맞는 파일만 담은 view, 아니면 전체 library """
+    view = filter_state['view']
+    return library if view is None else view
+
+def get_filter_conditions():
+    """ 필터 막대의 (조건 dict, 오류 메시지). 빈 칸은 빼고, 잘못된 날짜는 빼고 메시지로 알립니다. """
+    conditions = {'camera': filter_camera_var.get().strip(), 'lens': filter_lens_var.get().strip(),
+                  'date_from': filter_date_from_var.get().strip(), 'date_to': filter_date_to_var.get().strip(),
+                  'name': filter_name_var.get().strip()}
+    error_message = ""
+    for key in ('date_from', 'date_to'):
+        try:
+            check_date_bound(conditions[key])
+        except ValueError as e:
+            error_message = str(e)
+            conditions[key] = ""
+    return {key: value for key, value in conditions.items() if value}, error_message
+
+def schedule_filter(*_):
+    """ 입력이 FILTER_DELAY_MS 동안 멈추면 필터를 적용합니다. (필터 칸 변경, 필터 중 스캔 배치) """
+    if filter_state['after_id'] is not None:
+        window.after_cancel(filter_state['after_id'])
+    filter_state['after_id'] = window.after(FILTER_DELAY_MS, apply_filter)
+
+def apply_filter():
+    """ 필터 조건으로 view를 다시 만들고 트리뷰를 다시 그립니다. 펼쳐 둔 그룹은 다시 펼칩니다. """
+    if filter_state['after_id'] is not None:
+        window.after_cancel(filter_state['after_id'])
+        filter_state['after_id'] = None
+    conditions, error_message = get_filter_conditions()
+    open_keys = [key for key, node in list(camera_tree_nodes.items()) + list(lens_tree_nodes.items())
+                 if node in populated_tree_nodes and result_tree.item(node, 'open')]
+    started = time.perf_counter()
+    filter_state['view'] = library.filter(**conditions) if conditions else None
+    elapsed = time.perf_counter() - started
+    metrics.observe("filter", elapsed)
+    update_treeview()
+    for key in open_keys:
+        camera_info, lens_info = key if isinstance(key, tuple) else (key, None)
+        node = camera_tree_nodes.get(camera_info) if lens_info is None else lens_tree_nodes.get(key)
+        if node is not None:
+            if lens_info is None:
+                populate_camera_node(camera_info)
+            else:
+                populate_lens_node(camera_info, lens_info)
+            result_tree.item(node, open=True)
+    if error_message:
+        filter_status_label.config(text=error_message)
+    elif conditions:
+        filter_status_label.config(text=f"Showing {len(shown_library())} of {len(library)} files ({elapsed:.2f}s)")
+    else:
+        filter_status_label.config(text="")
+
+def clear_filter():
+    for filter_var in (filter_camera_var, filter_lens_var, filter_date_from_var, filter_date_to_var, filter_name_var):
+        filter_var.set("")
+    apply_filter()
+
 def update_treeview():
-    """ 트리뷰를 카메라 > 렌즈 2단계 계층 구조로 업데이트합니다. """
+    """ 트리뷰를 카메라 > 렌즈 2단계 계층 구조로 업데이트합니다.
+    카메라 노드만 만들고 렌즈/파일 노드는 펼칠 때 만듭니다. """
     # 기존 아이템 삭제
     for item in result_tree.get_children():
         result_tree.delete(item)
-
-    if not files_by_camera_lens:
+    camera_tree_nodes.clear()
+    lens_tree_nodes.clear()
+    file_tree_nodes.clear()
+    file_node_paths.clear()
+    tree_node_keys.clear()
+    populated_tree_nodes.clear()
+
+    if not shown_library():
         return
     
-    # 카메라별 정렬 적용
-    if current_sort_mode == 'count':
-        # 총 파일 수 기준 내림차순 정렬 (많은 것이 위로)
-        sorted_cameras = sorted(files_by_camera_lens.items(), 
-                               key=lambda x: sum(len(files) for files in x[1].values()), 
-                               reverse=True)
-    else:
-        # 카메라 이름 기준 오름차순 정렬 (ABC 순)
-        sorted_cameras = sorted(files_by_camera_lens.items(), key=lambda x: x[0].lower())
-    
-    for camera_info, lenses_dict in sorted_cameras:
-        # 카메라별 총 파일 수 계산
-        total_files = sum(len(files) for files in lenses_dict.values())
-        camera_node = result_tree.insert("", tk.END, 
-                                       text=f"{camera_info} ({total_files} files, {len(lenses_dict)} lenses)", 
-                                       open=False, tags=('camera_group',))
-        
-        # 렌즈별 정렬 적용
-        if current_sort_mode == 'count':
-            # 파일 수 기준 내림차순 정렬
-            sorted_lenses = sorted(lenses_dict.items(), key=lambda x: len(x[1]), reverse=True)
+    started = time.perf_counter()
+    for camera_info in sort_camera_groups():
+        insert_camera_node(camera_info)
+    metrics.observe("tree.rebuild", time.perf_counter() - started)
+
+def remove_files_from_results(file_paths):
+    """ 이동된 파일을 분석 결과와 트리뷰에서 제거합니다. 전체를 다시 스캔하지 않고
+    해당 파일이 속한 카메라/렌즈 그룹의 목록, 개수, 트리 노드만 갱신합니다. """
+    if filter_state['view'] is not None:
+        # 필터 중에는 필터를 다시 적용해 트리를 갱신 (view가 지운 행 번호를 가리키지 않도록 바로 적용)
+        library.remove_files(file_paths)
+        apply_filter()
+        return
+    removed_by_group = library.remove_files(file_paths)
+    for removed_paths in removed_by_group.values():
+        for file_path in removed_paths:
+            file_node = file_tree_nodes.pop(file_path, None)
+            file_node_paths.pop(file_node, None)
+            if file_node is not None and result_tree.exists(file_node):
+                result_tree.delete(file_node)
+
+    affected_cameras = set()
+    for camera_info, lens_info in removed_by_group:
+        affected_cameras.add(camera_info)
+        lens_node = lens_tree_nodes.get((camera_info, lens_info))
+        if library.has_group(camera_info, lens_info):
+            if lens_node is not None:
+                result_tree.item(lens_node, text=lens_node_text(camera_info, lens_info))
         else:
-            # 렌즈 이름 기준 오름차순 정렬
-            sorted_lenses = sorted(lenses_dict.items(), key=lambda x: x[0].lower())
-        
-        for lens_info, file_paths in sorted_lenses:
-            lens_node = result_tree.insert(camera_node, tk.END, 
-                                         text=f"{lens_info} ({len(file_paths)} files)", 
-                                         open=False, tags=('lens_group',))
-            
-            # 파일 노드들 추가 (수정 날짜 기준 정렬)
-            sorted_files = sorted(file_paths, key=lambda x: os.path.getmtime(x), reverse=True)
-            for file_path in sorted_files:
-                filename = os.path.basename(file_path)
-                result_tree.insert(lens_node, tk.END, text=filename, values=(file_path,), tags=('file_item',))
+            lens_tree_nodes.pop((camera_info, lens_info), None)
+            if lens_node is not None:
+                forget_tree_node(lens_node)
+                result_tree.delete(lens_node)
+
+    for camera_info in affected_cameras:
+        camera_node = camera_tree_nodes.get(camera_info)
+        if library.has_group(camera_info):
+            if camera_node is not None:
+                result_tree.item(camera_node, text=camera_node_text(camera_info))
+        else:
+            camera_tree_nodes.pop(camera_info, None)
+            if camera_node is not None:
+                forget_tree_node(camera_node)
+                result_tree.delete(camera_node)
 
-# --- 파일 작업 함수 ---
-def sanitize_foldername(name):
-    """ 파일명/폴더명으로 사용할 수 없는 문자를 제거하거나 대체합니다. """
-    # Windows에서 폴더명으로 사용할 수 없는 문자: < > : " / \ | ? *
-    # 그리고 NUL 문자 (보통 직접 입력되진 않음)
-    # 여기서는 간단히 언더스코어로 대체합니다.
-    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name)
+    # 개수 기준 정렬이면 영향받은 카메라의 노드 순서만 다시 맞춤
+    if current_sort_mode == 'count':
+        reorder_group_nodes([camera_info for camera_info in affected_cameras if library.has_group(camera_info)])
 
+# --- 파일 작업 함수 ---
 def process_files(action):
     global target_folder
     if not target_folder:
@@ -428,11 +814,11 @@ def process_files(action):
 
     selected_items = result_tree.selection()
     if not selected_items:
-        messagebox.showwarning("Warning", "Please select files to move or copy.\n(Camera groups, lens groups, or individual files can be selected)")
+        messagebox.showwarning("Warning", "Please select files to move, copy or link.\n(Camera groups, lens groups, or individual files can be selected)")
         return
 
     # Confirm user's action choice with special warning for move operation only
-    action_verb = "move" if action == "move" else "copy"
+    action_verb = action
     if action == "move":
         confirm_msg = f"⚠️ WARNING: MOVE OPERATION ⚠️\n\n"
         confirm_msg += f"This will PERMANENTLY MOVE files from their original location.\n"
@@ -442,15 +828,10 @@ def process_files(action):
         confirm_msg += f"Click 'Yes' only if you are certain you want to move (not copy) the files."
         if not messagebox.askyesno("⚠️ CONFIRM MOVE OPERATION", confirm_msg):
             return
-    # copy 작업은 확인 대화상자 없이 바로 진행
+    # copy/link 작업은 확인 대화상자 없이 바로 진행
 
     # Check if any camera group is selected to show folder organization dialog
-    has_camera_group = False
-    for item_id in selected_items:
-        tags = result_tree.item(item_id, "tags")
-        if 'camera_group' in tags:
-            has_camera_group = True
-            break
+    has_camera_group = any(tree_node_keys.get(item_id, (None, ''))[1] is None for item_id in selected_items)
     
     # Show folder organization dialog if camera group is selected
     organize_by_lens = False
@@ -502,108 +883,437 @@ def process_files(action):
         organize_by_lens = dialog_result['organize_by_lens']
 
     status_label.config(text=f"Processing files ({action_verb})...")
-    window.update_idletasks()
-
-    processed_count = 0
-    error_count = 0
-    files_to_process = []
-
-    # 선택된 아이템(카메라/렌즈 그룹 또는 개별 파일)으로부터 실제 파일 경로 목록 생성
-    for item_id in selected_items:
-        tags = result_tree.item(item_id, "tags")
-        if 'camera_group' in tags: # 카메라 그룹이 선택된 경우
-            camera_name_raw = result_tree.item(item_id, "text").split(' (')[0]
-            # 카메라 그룹의 모든 렌즈 그룹을 순회
-            for lens_id in result_tree.get_children(item_id):
-                lens_name_raw = result_tree.item(lens_id, "text").split(' (')[0]
-                # 각 렌즈 그룹의 모든 파일을 가져옴
-                for file_id in result_tree.get_children(lens_id):
-                    file_path = result_tree.item(file_id, "values")[0]
-                    files_to_process.append((file_path, camera_name_raw, lens_name_raw, organize_by_lens))
-        elif 'lens_group' in tags: # 렌즈 그룹이 선택된 경우
-            lens_name_raw = result_tree.item(item_id, "text").split(' (')[0]
-            parent_id = result_tree.parent(item_id)
-            camera_name_raw = result_tree.item(parent_id, "text").split(' (')[0]
-            # 해당 렌즈 그룹의 모든 파일을 가져옴
-            for file_id in result_tree.get_children(item_id):
-                file_path = result_tree.item(file_id, "values")[0]
-                files_to_process.append((file_path, camera_name_raw, lens_name_raw, True))  # 렌즈 그룹 선택시 항상 렌즈별 폴더 생성
-        elif 'file_item' in tags: # 개별 파일이 선택된 경우
-            file_path = result_tree.item(item_id, "values")[0]
-            lens_id = result_tree.parent(item_id)
-            camera_id = result_tree.parent(lens_id)
-            lens_name_raw = result_tree.item(lens_id, "text").split(' (')[0]
-            camera_name_raw = result_tree.item(camera_id, "text").split(' (')[0]
-            # 중복 추가 방지
-            if not any(f[0] == file_path for f in files_to_process):
-                files_to_process.append((file_path, camera_name_raw, lens_name_raw, True))  # 개별 파일 선택시 항상 렌즈별 폴더 생성
-
-
-    # 중복 제거 (만약 그룹과 그 안의 파일이 동시에 선택된 경우)
-    unique_files_to_process = []
-    seen_paths = set()
-    for path, camera_name, lens_name, organize_lens in files_to_process:
-        if path not in seen_paths:
-            unique_files_to_process.append((path, camera_name, lens_name, organize_lens))
-            seen_paths.add(path)
-    files_to_process = unique_files_to_process
 
+    files_to_process = resolve_selected_files(selected_items, organize_by_lens)
 
     if not files_to_process:
         messagebox.showinfo("Info", "No files selected for processing.")
         status_label.config(text="Ready")
         return
 
-    for source_path, camera_name_raw, lens_name_raw, organize_by_lens_flag in files_to_process:
-        try:
-            # 대상 폴더 구조 생성 (렌즈별 폴더 나누기 옵션에 따라)
-            sanitized_camera_name = sanitize_foldername(camera_name_raw)
-            camera_target_folder = os.path.join(target_folder, sanitized_camera_name)
-            
-            if organize_by_lens_flag:
-                # 렌즈별 폴더 나누기: 카메라 > 렌즈 2단계 폴더 구조
-                sanitized_lens_name = sanitize_foldername(lens_name_raw)
-                final_target_folder = os.path.join(camera_target_folder, sanitized_lens_name)
-            else:
-                # 렌즈별 폴더 나누지 않기: 카메라 폴더에 모든 파일
-                final_target_folder = camera_target_folder
-            
-            os.makedirs(final_target_folder, exist_ok=True)
+    start_file_jobs(action, files_to_process)
 
-            filename = os.path.basename(source_path)
-            destination_path = os.path.join(final_target_folder, filename)
+def resolve_selected_files(selected_items, organize_by_lens):
+    """ 선택된 아이템(카메라/렌즈 그룹 또는 개별 파일)을 파일 작업 목록으로 바꿉니다.
+    아이템 ID를 분석 결과에 바로 대응시키므로 트리에 묻지 않고, 중복(그룹과 그 안의 파일이
+    동시에 선택된 경우)은 집합으로 한 번에 제거합니다.
+    [(원본 경로, 카메라 이름, 렌즈 이름, 렌즈별 폴더 여부), ...]를 반환합니다. """
+    files_to_process = []
+    seen_paths = set()
 
-            # 대상 경로에 동일 파일명 존재 시 처리 (덮어쓰지 않고 (1), (2) 추가)
-            counter = 1
-            base, ext = os.path.splitext(destination_path)
-            while os.path.exists(destination_path):
-                destination_path = f"{base}({counter}){ext}"
-                counter += 1
+    def add_files(file_paths, camera_name_raw, lens_name_raw, organize_flag):
+        for file_path in file_paths:
+            if file_path not in seen_paths:
+                seen_paths.add(file_path)
+                files_to_process.append((file_path, camera_name_raw, lens_name_raw, organize_flag))
 
-            if action == "move":
-                shutil.move(source_path, destination_path)
-            elif action == "copy":
-                shutil.copy2(source_path, destination_path) # copy2는 메타데이터도 보존 시도
+    for item_id in selected_items:
+        file_path = file_node_paths.get(item_id)
+        if file_path is not None:
+            # 개별 파일 선택시 항상 렌즈별 폴더 생성
+            group_key = library.get_group_key(file_path)
+            if group_key is not None:
+                add_files((file_path,), group_key[0], group_key[1], True)
+            continue
+        group_key = tree_node_keys.get(item_id)
+        if group_key is None:
+            continue
+        camera_name_raw, lens_name_raw = group_key
+        if lens_name_raw is None:
+            # 카메라 그룹: 모든 렌즈 그룹의 파일 (트리와 같은 렌즈 순서)
+            for group_lens in sort_lens_groups(camera_name_raw):
+                add_files(shown_library().get_group_files(camera_name_raw, group_lens), camera_name_raw, group_lens, organize_by_lens)
+        else:
+            # 렌즈 그룹 선택시 항상 렌즈별 폴더 생성 (필터 중이면 보이는 파일만)
+            add_files(shown_library().get_group_files(camera_name_raw, lens_name_raw), camera_name_raw, lens_name_raw, True)
+    return files_to_process
+
+def start_file_jobs(action, jobs):
+    """ 복사/이동을 백그라운드 스레드에서 시작합니다. 진행 상황은 file_job_queue로 받습니다. """
+    cancel_event = threading.Event()
+    file_job_state.update(action=action, cancel_event=cancel_event)
+    for button in (scan_button, clear_button, copy_button, move_button, link_button):
+        button.config(state='disabled')
+    cancel_button.config(state='normal')
+    cancel_button.pack(side=tk.TOP, pady=5)
+    progress_bar.stop()
+    progress_bar.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
+    progress_bar.config(mode='determinate', maximum=max(1, len(jobs)), value=0)
+
+    # 중복 건너뛰기: 작업 스레드에서 비교하도록 크기를 미리 넘김 (분석 결과는 UI 스레드에서만 읽음)
+    file_sizes = [library.get_stat(job[0])[0] for job in jobs] if skip_duplicates_var.get() else None
+    # 동시에 처리할 파일 수, 원본 디스크마다 읽는 수, 대상 디스크마다 쓰는 수
+    worker_counts = (read_worker_count(file_workers_var, DEFAULT_FILE_WORKERS, MAX_FILE_WORKERS),
+                     read_worker_count(source_device_workers_var, DEFAULT_DEVICE_WORKERS, MAX_DEVICE_WORKERS),
+                     read_worker_count(target_device_workers_var, DEFAULT_DEVICE_WORKERS, MAX_DEVICE_WORKERS))
+    threading.Thread(target=process_files_background,
+                     args=(action, jobs, target_folder, worker_counts, cancel_event, file_sizes),
+                     daemon=True).start()
+    window.after(50, check_file_job_result)
+
+def process_files_background(action, jobs, destination_folder, worker_counts, cancel_event, file_sizes=None):
+    """ 작업 스레드: 파일 작업을 처리하고 진행 상황을 FILE_PROGRESS_INTERVAL 간격으로만 큐에 넣습니다.
+    worker_counts: (동시에 처리할 파일 수, 원본 디스크마다 읽는 수, 대상 디스크마다 쓰는 수)
+    file_sizes가 있으면 먼저 내용이 같은 파일을 찾아 묶음마다 첫 번째 파일만 처리합니다. """
+    last_report = [0.0]
+
+    def should_report(finished_count, total_count):
+        now = time.perf_counter()
+        if now - last_report[0] >= FILE_PROGRESS_INTERVAL or finished_count == total_count:
+            last_report[0] = now
+            return True
+        return False
+
+    def report_progress(filename, finished_count, total_count):
+        if should_report(finished_count, total_count):
+            file_job_queue.put(("progress", filename, finished_count, total_count))
+
+    def report_compare_progress(phase, done_count, total_count):
+        if should_report(done_count, total_count):
+            file_job_queue.put(("comparing", phase, done_count, total_count))
 
-            processed_count += 1
-            status_label.config(text=f"{action_verb.capitalize()}: {filename} ({processed_count}/{len(files_to_process)})")
-            window.update_idletasks()
+    try:
+        skipped_count = 0
+        if file_sizes is not None:
+            duplicate_groups = find_duplicates([(job[0], size) for job, size in zip(jobs, file_sizes)],
+                                               progress_callback=report_compare_progress)
+            redundant_paths = get_redundant_copies(duplicate_groups)
+            jobs = [job for job in jobs if job[0] not in redundant_paths]
+            skipped_count = len(redundant_paths)
+        worker_count, source_device_workers, target_device_workers = worker_counts
+        result = run_file_jobs(action, jobs, destination_folder, report_progress,
+                               worker_count=worker_count, source_device_workers=source_device_workers,
+                               target_device_workers=target_device_workers, cancel_event=cancel_event)
+        file_job_queue.put(("done",) + result + (skipped_count,))
+    except Exception as e:
+        file_job_queue.put(("error", str(e)))
 
-        except Exception as e:
-            error_count += 1
-            print(f"Error {action_verb}ing {source_path} to {destination_path}: {e}")
-            # 오류 발생 시 메시지 박스 (너무 많이 뜨면 불편하므로, 로그로 대체하거나 요약 보고)
+def check_file_job_result():
+    """ 파일 작업 큐의 메시지를 처리합니다. 끝날 때까지 다시 예약합니다. """
+    try:
+        while True:
+            message = file_job_queue.get_nowait()
+            if message[0] == "progress":
+                _, filename, finished_count, total_count = message
+                progress_bar.config(value=finished_count, maximum=max(1, total_count))
+                action_verb = file_job_state['action']
+                status_label.config(text=f"{action_verb.capitalize()}: {filename} ({finished_count}/{total_count})")
+            elif message[0] == "comparing":
+                _, phase, done_count, total_count = message
+                progress_bar.config(value=done_count, maximum=max(1, total_count))
+                status_label.config(text=f"Checking duplicates ({phase}): {done_count}/{total_count}")
+            else:
+                finish_file_jobs(message)
+                return
+    except queue.Empty:
+        pass
+    window.after(50, check_file_job_result)
+
+def cancel_file_jobs():
+    """ 진행 중인 파일만 마치고 나머지 복사/이동을 멈춥니다. """
+    cancel_event = file_job_state.get('cancel_event')
+    if cancel_event is not None:
+        cancel_event.set()
+        cancel_button.config(state='disabled')
+        status_label.config(text="Cancelling...")
+
+def finish_file_jobs(message):
+    action_verb = file_job_state['action']
+    cancelled = file_job_state['cancel_event'].is_set()
+    file_job_state.update(action=None, cancel_event=None)
+    progress_bar.pack_forget()
+    cancel_button.pack_forget()
+    for button in (scan_button, clear_button, copy_button, move_button, link_button):
+        button.config(state='normal')
+
+    if message[0] == "error":
+        status_label.config(text="Ready")
+        messagebox.showerror("Error", f"{action_verb.capitalize()} operation failed: {message[1]}")
+        return
+    _, processed_count, error_count, moved_paths, skipped_count = message
+
+    # 작업 완료 후, 이동된 파일만 분석 결과/Treeview/색인에서 제거 (전체 재스캔 없음)
+    if moved_paths:
+        remove_files_from_results(moved_paths)
+        remove_from_scan_index(moved_paths)
+        refresh_group_by_window()
+        cancel_image_preview()
+
+    summary_title = "Operation Cancelled" if cancelled else "Operation Complete"
+    summary_msg = f"{action_verb.capitalize()} operation {'cancelled' if cancelled else 'completed'}.\nSuccess: {processed_count} files\nFailed: {error_count} files"
+    if skipped_count:
+        summary_msg += f"\nSkipped duplicates: {skipped_count} files"
+    messagebox.showinfo(summary_title, summary_msg)
+    status_label.config(text="Ready")
 
-    # 작업 완료 후, 이동된 파일은 Treeview에서 제거 (또는 상태 업데이트)
-    if action == "move":
-        scan_and_analyze_files() # 이동 후 목록을 다시 스캔하여 갱신
 
-    summary_msg = f"{action_verb.capitalize()} operation completed.\nSuccess: {processed_count} files\nFailed: {error_count} files"
-    messagebox.showinfo("Operation Complete", summary_msg)
-    status_label.config(text="Ready")
+def find_duplicate_files():
+    """ 분석 결과 전체에서 내용이 같은 파일을 백그라운드에서 찾고 결과 창을 엽니다. """
+    if not library:
+        messagebox.showwarning("Warning", "Please scan folders first.")
+        return
+    duplicates_button.config(state='disabled')
+    status_label.config(text="Checking duplicates...")
+    files = [(file_path, size) for file_path, _, _, (size, _) in library.iter_files()]
+    threading.Thread(target=find_duplicates_background, args=(files,), daemon=True).start()
+    window.after(50, check_duplicates_result)
+
+def find_duplicates_background(files):
+    """ 작업 스레드: 중복 파일을 찾아 결과를 duplicates_queue에 넣습니다. """
+    last_report = [0.0]
+
+    def report_progress(phase, done_count, total_count):
+        now = time.perf_counter()
+        if now - last_report[0] >= FILE_PROGRESS_INTERVAL or done_count == total_count:
+            last_report[0] = now
+            duplicates_queue.put(("progress", phase, done_count, total_count))
+
+    try:
+        duplicates_queue.put(("done", find_duplicates(files, progress_callback=report_progress)))
+    except Exception as e:
+        duplicates_queue.put(("error", str(e)))
+
+def check_duplicates_result():
+    try:
+        while True:
+            message = duplicates_queue.get_nowait()
+            if message[0] == "progress":
+                _, phase, done_count, total_count = message
+                status_label.config(text=f"Checking duplicates ({phase}): {done_count}/{total_count}")
+                continue
+            duplicates_button.config(state='normal')
+            if message[0] == "error":
+                status_label.config(text="Ready")
+                messagebox.showerror("Error", f"Duplicate check failed: {message[1]}")
+            else:
+                duplicate_groups = message[1]
+                status_label.config(text=f"{len(duplicate_groups)} groups of identical files, "
+                                         f"{len(get_redundant_copies(duplicate_groups))} redundant copies.")
+                show_duplicates_window(duplicate_groups)
+            return
+    except queue.Empty:
+        pass
+    window.after(50, check_duplicates_result)
+
+def show_duplicates_window(duplicate_groups):
+    """ 중복 파일 묶음을 새 창의 트리뷰로 보여줍니다. 파일을 더블클릭하면 폴더를 엽니다. """
+    if not duplicate_groups:
+        messagebox.showinfo("Duplicates", "No identical files found.")
+        return
+    dialog = tk.Toplevel(window)
+    dialog.title("Duplicates")
+    dialog.geometry("600x400")
+    
+    redundant_count = len(get_redundant_copies(duplicate_groups))
+    ttk.Label(dialog, text=f"{len(duplicate_groups)} groups of identical files, {redundant_count} redundant copies. "
+                           f"Double-click a file to open its folder.").pack(padx=10, pady=(10, 5), anchor=tk.W)
+    
+    duplicates_frame = ttk.Frame(dialog)
+    duplicates_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    duplicates_tree = ttk.Treeview(duplicates_frame, show="tree")
+    duplicates_scrollbar = ttk.Scrollbar(duplicates_frame, orient=tk.VERTICAL, command=duplicates_tree.yview)
+    duplicates_tree.configure(yscrollcommand=duplicates_scrollbar.set)
+    duplicates_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    duplicates_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    duplicate_paths = {}
+    for group in duplicate_groups:
+        size_mb = library.get_stat(group[0])[0] / (1024 * 1024)
+        group_node = duplicates_tree.insert("", tk.END, text=f"{os.path.basename(group[0])} "
+                                                             f"({len(group)} identical files, {size_mb:.1f} MB each)")
+        for file_path in group:
+            duplicate_paths[duplicates_tree.insert(group_node, tk.END, text=file_path)] = file_path
+    
+    def on_duplicate_double_click(event):
+        file_path = duplicate_paths.get(duplicates_tree.focus())
+        if file_path:
+            open_file_folder(file_path)
+    duplicates_tree.bind("<Double-1>", on_duplicate_double_click)
+
+# --- Group By 창 ---
+def show_group_by_window():
+    """ 스캔한 필드(카메라, 렌즈, 연도, 초점 거리 등)를 최대 GROUP_BY_LEVELS 단계로 골라 묶어 보는 창을 엽니다.
+    단계를 바꾸면 파일을 다시 읽지 않고 분석 결과의 열에서 바로 다시 묶습니다. """
+    if group_by_state['window'] is not None:
+        group_by_state['window'].lift()
+        return
+    dialog = tk.Toplevel(window)
+    dialog.title("Group By")
+    dialog.geometry("600x500")
+    
+    field_keys = ('camera', 'lens') + library.extra_fields
+    field_labels = [GROUP_FIELDS[key][0] for key in field_keys]
+    levels_frame = ttk.Frame(dialog)
+    levels_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+    level_vars = []
+    for level in range(GROUP_BY_LEVELS):
+        if level:
+            ttk.Label(levels_frame, text=">").pack(side=tk.LEFT, padx=5)
+        # 첫 단계는 반드시 고르고, 나머지 단계는 "(none)"으로 뺄 수 있음
+        level_var = tk.StringVar(value=GROUP_FIELDS[GROUP_BY_DEFAULT_KEYS[level]][0]
+                                 if level < len(GROUP_BY_DEFAULT_KEYS) else "(none)")
+        level_combobox = ttk.Combobox(levels_frame, textvariable=level_var, state='readonly', width=14,
+                                      values=field_labels if level == 0 else ["(none)"] + field_labels)
+        level_combobox.bind("<<ComboboxSelected>>", lambda event: refresh_group_by_window())
+        level_combobox.pack(side=tk.LEFT)
+        level_vars.append(level_var)
+    
+    group_by_status = ttk.Label(dialog, text="")
+    group_by_status.pack(fill=tk.X, padx=10, pady=(0, 5))
+    
+    tree_frame = ttk.Frame(dialog)
+    tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    group_by_tree = ttk.Treeview(tree_frame, show="tree")
+    group_by_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=group_by_tree.yview)
+    group_by_tree.configure(yscrollcommand=group_by_scrollbar.set)
+    group_by_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    group_by_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    group_by_tree.bind("<<TreeviewOpen>>", on_group_by_open)
+    group_by_tree.bind("<Double-1>", on_group_by_double_click)
+    
+    def on_close():
+        group_by_state.update(window=None, tree=None, status=None, level_vars=[], grouping=None,
+                              node_prefixes={}, file_paths={})
+        dialog.destroy()
+    dialog.protocol("WM_DELETE_WINDOW", on_close)
+    group_by_state.update(window=dialog, tree=group_by_tree, status=group_by_status, level_vars=level_vars)
+    refresh_group_by_window()
+
+def get_group_by_keys():
+    """ 단계 선택 상자에서 고른 필드 이름 (빈 단계와 중복 단계는 뺌) """
+    keys_by_label = {GROUP_FIELDS[key][0]: key for key in ('camera', 'lens') + library.extra_fields}
+    keys = []
+    for level_var in group_by_state['level_vars']:
+        key = keys_by_label.get(level_var.get())
+        if key is not None and key not in keys:
+            keys.append(key)
+    return keys
+
+def refresh_group_by_window():
+    """ Group By 창이 열려 있으면 현재 분석 결과를 고른 단계로 다시 묶어 최상위 그룹을 표시합니다.
+    (스캔 완료, 감시 변경, 이동, 정렬 기준 변경 후 호출) """
+    group_by_tree = group_by_state['tree']
+    if group_by_tree is None:
+        return
+    keys = get_group_by_keys()
+    started = time.perf_counter()
+    grouping = library.group_by(keys)
+    elapsed = time.perf_counter() - started
+    metrics.observe("group_by", elapsed)
+    group_by_state.update(grouping=grouping, node_prefixes={}, file_paths={})
+    group_by_tree.delete(*group_by_tree.get_children())
+    top_groups = get_group_by_children(())
+    for name, count in top_groups:
+        insert_group_by_node("", (name,), count)
+    group_by_state['status'].config(text=f"{grouping.total} files in {len(top_groups)} "
+                                         f"{GROUP_FIELDS[keys[0]][0].lower()} groups "
+                                         f"(grouped by {' > '.join(GROUP_FIELDS[key][0] for key in keys)} "
+                                         f"in {elapsed:.2f}s). Double-click a file to open its folder.")
+
+def get_group_by_children(prefix):
+    """ 그룹의 하위 그룹을 메인 트리와 같은 정렬 기준(개수 또는 이름)으로 반환합니다. """
+    return group_by_state['grouping'].children(prefix, by_count=(current_sort_mode == 'count'),
+                                               sort_key=natural_sort_key)
+
+def insert_group_by_node(parent, prefix, count):
+    """ 그룹 노드를 추가합니다. 하위 노드는 처음 펼칠 때 만들고, 그 전에는 펼침 화살표용 빈 자식만 둡니다. """
+    group_by_tree = group_by_state['tree']
+    node = group_by_tree.insert(parent, tk.END, text=f"{prefix[-1]} ({count} files)")
+    group_by_state['node_prefixes'][node] = prefix
+    group_by_tree.insert(node, tk.END)
+
+def on_group_by_open(event):
+    """ 그룹을 처음 펼칠 때 하위 그룹(마지막 단계는 수정 날짜 순 파일)을 만듭니다. """
+    group_by_tree = group_by_state['tree']
+    node = group_by_tree.focus()
+    prefix = group_by_state['node_prefixes'].pop(node, None)
+    if prefix is None:
+        return
+    started = time.perf_counter()
+    group_by_tree.delete(*group_by_tree.get_children(node))
+    grouping = group_by_state['grouping']
+    if len(prefix) < len(grouping.keys):
+        for name, count in get_group_by_children(prefix):
+            insert_group_by_node(node, prefix + (name,), count)
+    else:
+        file_paths = group_by_state['file_paths']
+        for file_path in grouping.files(prefix):
+            file_paths[group_by_tree.insert(node, tk.END, text=os.path.basename(file_path))] = file_path
+    metrics.observe("tree.populate", time.perf_counter() - started)
 
+def on_group_by_double_click(event):
+    file_path = group_by_state['file_paths'].get(group_by_state['tree'].focus())
+    if file_path:
+        open_file_folder(file_path)
 
 # --- GUI 이벤트 핸들러 ---
+def show_diagnostics_window():
+    """ 단계별 계측 값(카운터, 소요 시간 분포, 처리량)과 마지막 cProfile 요약을 보여주는 창을 엽니다. """
+    if diagnostics_state['window'] is not None:
+        diagnostics_state['window'].lift()
+        return
+    dialog = tk.Toplevel(window)
+    dialog.title("Diagnostics")
+    dialog.geometry("720x500")
+    
+    buttons_frame = ttk.Frame(dialog)
+    buttons_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+    ttk.Button(buttons_frame, text="Export JSON...", command=export_diagnostics).pack(side=tk.LEFT)
+    ttk.Button(buttons_frame, text="Reset", command=reset_diagnostics).pack(side=tk.LEFT, padx=(10, 0))
+    ttk.Checkbutton(buttons_frame, text="Profile next scan (cProfile)",
+                    variable=profile_scan_var).pack(side=tk.LEFT, padx=(10, 0))
+    
+    text_frame = ttk.Frame(dialog)
+    text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    diagnostics_text = tk.Text(text_frame, wrap=tk.NONE, font=('Courier', 9))
+    text_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=diagnostics_text.yview)
+    diagnostics_text.configure(yscrollcommand=text_scrollbar.set)
+    text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    diagnostics_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    def on_close():
+        if diagnostics_state['after_id'] is not None:
+            window.after_cancel(diagnostics_state['after_id'])
+        diagnostics_state.update(window=None, text=None, after_id=None)
+        dialog.destroy()
+    dialog.protocol("WM_DELETE_WINDOW", on_close)
+    diagnostics_state.update(window=dialog, text=diagnostics_text)
+    refresh_diagnostics(schedule=True)
+
+def refresh_diagnostics(schedule=False):
+    """ 진단 창이 열려 있으면 내용을 다시 씁니다. schedule이면 창이 닫힐 때까지 주기적으로 반복합니다. """
+    diagnostics_text = diagnostics_state['text']
+    if diagnostics_text is None:
+        return
+    report = metrics.format_report()
+    if diagnostics_state['profile_report']:
+        report += "\n\n" + diagnostics_state['profile_report']
+    scroll_position = diagnostics_text.yview()[0]
+    diagnostics_text.config(state='normal')
+    diagnostics_text.delete("1.0", tk.END)
+    diagnostics_text.insert("1.0", report)
+    diagnostics_text.config(state='disabled')
+    diagnostics_text.yview_moveto(scroll_position)
+    if schedule:
+        diagnostics_state['after_id'] = window.after(DIAGNOSTICS_REFRESH_MS, refresh_diagnostics, True)
+
+def reset_diagnostics():
+    metrics.reset()
+    diagnostics_state['profile_report'] = ""
+    refresh_diagnostics()
+
+def export_diagnostics():
+    export_path = filedialog.asksaveasfilename(title="Export Diagnostics", defaultextension=".json",
+                                               filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+    if not export_path:
+        return
+    try:
+        metrics.write_json(export_path)
+    except OSError as e:
+        messagebox.showerror("Error", f"Failed to export diagnostics: {e}")
+        return
+    status_label.config(text=f"Diagnostics exported to {export_path}")
+
 def add_source_folder():
     folder_selected = filedialog.askdirectory()
     if folder_selected and folder_selected not in source_folders:
@@ -693,6 +1403,19 @@ add_source_button.pack(pady=2, fill=tk.X)
 remove_source_button = ttk.Button(source_buttons_frame, text="Remove", command=remove_source_folder)
 remove_source_button.pack(pady=2, fill=tk.X)
 
+# 폴더 탐색 옵션
+follow_symlinks_var = tk.BooleanVar(value=False)
+follow_symlinks_check = ttk.Checkbutton(source_buttons_frame, text="Follow links", variable=follow_symlinks_var)
+follow_symlinks_check.pack(pady=(6, 0), anchor=tk.W)
+skip_hidden_var = tk.BooleanVar(value=False)
+skip_hidden_check = ttk.Checkbutton(source_buttons_frame, text="Skip hidden", variable=skip_hidden_var)
+skip_hidden_check.pack(anchor=tk.W)
+# 스캔 후 소스 폴더의 새 파일/바뀐 파일/지워진 파일을 결과에 바로 반영
+watch_folders_var = tk.BooleanVar(value=False)
+watch_folders_check = ttk.Checkbutton(source_buttons_frame, text="Watch folders", variable=watch_folders_var,
+                                      command=on_watch_toggle)
+watch_folders_check.pack(anchor=tk.W)
+
 
 # --- 중간 프레임 (분석 버튼, 분류 모드 전환 버튼, 결과 트리뷰) ---
 control_buttons_frame = ttk.Frame(middle_frame)
@@ -703,13 +1426,21 @@ left_spacer = ttk.Frame(control_buttons_frame)
 left_spacer.pack(side=tk.LEFT, expand=True)
 
 # 스캔 버튼 (가운데 배치)
-scan_button = ttk.Button(control_buttons_frame, text="2. Scan and Analyze JPG Files", command=scan_and_analyze_files)
+scan_button = ttk.Button(control_buttons_frame, text="2. Scan and Analyze Photos", command=scan_and_analyze_files)
 scan_button.pack(side=tk.LEFT)
 
 # 클리어 버튼 (스캔 버튼 옆에 배치)
 clear_button = ttk.Button(control_buttons_frame, text="Clear Results", command=clear_analysis_results)
 clear_button.pack(side=tk.LEFT, padx=(10, 0))
 
+# 중복 파일 찾기 버튼 (내용이 같은 파일 묶음을 새 창에 표시)
+duplicates_button = ttk.Button(control_buttons_frame, text="Find Duplicates", command=find_duplicate_files)
+duplicates_button.pack(side=tk.LEFT, padx=(10, 0))
+
+# 다른 필드 조합(예: 렌즈 > 초점 거리 > 연도)으로 묶어 보는 창
+group_by_button = ttk.Button(control_buttons_frame, text="Group By...", command=show_group_by_window)
+group_by_button.pack(side=tk.LEFT, padx=(10, 0))
+
 # 프로그레스바 (초기에는 숨김)
 progress_bar = ttk.Progressbar(control_buttons_frame, mode='indeterminate')
 # pack은 scan_and_analyze_files 함수에서 필요할 때만 수행
@@ -718,6 +1449,17 @@ progress_bar = ttk.Progressbar(control_buttons_frame, mode='indeterminate')
 right_spacer = ttk.Frame(control_buttons_frame)
 right_spacer.pack(side=tk.LEFT, expand=True)
 
+# EXIF 분석 작업자 수 (우측 끝에 배치)
+workers_frame = ttk.Frame(control_buttons_frame)
+workers_frame.pack(side=tk.RIGHT, padx=(0, 5))
+
+workers_label = ttk.Label(workers_frame, text="Workers:")
+workers_label.pack(side=tk.LEFT, padx=(0, 5))
+
+scan_workers_var = tk.IntVar(value=DEFAULT_SCAN_WORKERS)
+workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=MAX_SCAN_WORKERS, width=4, textvariable=scan_workers_var)
+workers_spinbox.pack(side=tk.LEFT)
+
 # 정렬 모드 라디오 버튼 (우측 끝에 배치)
 sort_frame = ttk.Frame(control_buttons_frame)
 sort_frame.pack(side=tk.RIGHT, padx=10)
@@ -733,6 +1475,26 @@ count_radio.pack(side=tk.LEFT, padx=5)
 name_radio = ttk.Radiobutton(sort_frame, text="Name", variable=sort_mode_var, value='name', command=on_sort_mode_change)
 name_radio.pack(side=tk.LEFT, padx=5)
 
+# 필터 막대 (입력하는 대로 트리뷰를 조건에 맞는 파일만으로 다시 그림)
+filter_frame = ttk.Frame(middle_frame)
+filter_frame.pack(fill=tk.X, pady=(0, 5))
+filter_camera_var = tk.StringVar()
+filter_lens_var = tk.StringVar()
+filter_date_from_var = tk.StringVar()
+filter_date_to_var = tk.StringVar()
+filter_name_var = tk.StringVar()
+for filter_label_text, filter_var, filter_width in (("Camera:", filter_camera_var, 14), ("Lens:", filter_lens_var, 14),
+                                                    ("Date from:", filter_date_from_var, 10),
+                                                    ("to:", filter_date_to_var, 10),
+                                                    ("File name:", filter_name_var, 14)):
+    ttk.Label(filter_frame, text=filter_label_text).pack(side=tk.LEFT, padx=(5, 2))
+    ttk.Entry(filter_frame, textvariable=filter_var, width=filter_width).pack(side=tk.LEFT)
+    filter_var.trace_add('write', schedule_filter)
+filter_clear_button = ttk.Button(filter_frame, text="Clear Filter", command=clear_filter)
+filter_clear_button.pack(side=tk.LEFT, padx=(10, 0))
+filter_status_label = ttk.Label(filter_frame, text="")
+filter_status_label.pack(side=tk.LEFT, padx=(10, 0))
+
 result_tree_frame = ttk.Frame(middle_frame)
 result_tree_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -743,6 +1505,7 @@ result_tree.heading("#0", text="Camera > Lens > Files", anchor=tk.W)
 result_tree.bind("<Double-1>", on_tree_double_click)  # 더블클릭
 result_tree.bind("<Button-3>", on_tree_right_click)   # 우클릭
 result_tree.bind("<<TreeviewSelect>>", on_tree_single_click)  # 선택 변경 시
+result_tree.bind("<<TreeviewOpen>>", on_tree_open)  # 그룹 펼칠 때 하위 노드 생성
 
 result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
@@ -800,7 +1563,38 @@ copy_button.pack(side=tk.TOP, pady=5)
 move_button = ttk.Button(action_frame, text="Move Selected Files", command=lambda: process_files("move"))
 move_button.pack(side=tk.TOP, pady=5)
 
+# 하드 링크(다른 드라이브면 심볼릭 링크)로 같은 폴더 구조 만들기 - 다시 실행하면 새 파일만 추가
+link_button = ttk.Button(action_frame, text="Link Selected Files", command=lambda: process_files("link"))
+link_button.pack(side=tk.TOP, pady=5)
+
+# 내용이 같은 파일은 묶음마다 하나만 복사/이동/링크
+skip_duplicates_var = tk.BooleanVar(value=False)
+skip_duplicates_check = ttk.Checkbutton(action_frame, text="Skip duplicates", variable=skip_duplicates_var)
+skip_duplicates_check.pack(side=tk.TOP, pady=5)
+
+# 복사/이동/링크 작업자 수: 동시에 처리할 파일 수, 원본 디스크마다 읽는 수, 대상 디스크마다 쓰는 수
+file_workers_frame = ttk.Frame(action_frame)
+file_workers_frame.pack(side=tk.TOP, pady=5)
+file_workers_var = tk.IntVar(value=DEFAULT_FILE_WORKERS)
+source_device_workers_var = tk.IntVar(value=DEFAULT_DEVICE_WORKERS)
+target_device_workers_var = tk.IntVar(value=DEFAULT_DEVICE_WORKERS)
+for row, (workers_text, workers_var, max_workers) in enumerate((
+        ("Workers:", file_workers_var, MAX_FILE_WORKERS),
+        ("Per source disk:", source_device_workers_var, MAX_DEVICE_WORKERS),
+        ("Per target disk:", target_device_workers_var, MAX_DEVICE_WORKERS))):
+    ttk.Label(file_workers_frame, text=workers_text).grid(row=row, column=0, sticky=tk.W, padx=(0, 5))
+    ttk.Spinbox(file_workers_frame, from_=1, to=max_workers, width=4,
+                textvariable=workers_var).grid(row=row, column=1, sticky=tk.W)
+
+# 복사/이동 취소 버튼 (작업 중에만 표시)
+cancel_button = ttk.Button(action_frame, text="Cancel", command=cancel_file_jobs)
+
 # --- 상태 표시줄 ---
+# 단계별 계측 값 보기/내보내기, 다음 스캔 cProfile 기록 여부 (진단 창에서 설정)
+profile_scan_var = tk.BooleanVar(value=False)
+diagnostics_button = ttk.Button(status_frame, text="Diagnostics", command=show_diagnostics_window)
+diagnostics_button.pack(side=tk.RIGHT, padx=5)
+
 status_label = ttk.Label(status_frame, text="Ready", anchor=tk.W)
 status_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
 
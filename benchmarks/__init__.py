@@ -0,0 +1,5 @@
+"""
+GearView 성능 측정 도구 (배포 파일에는 포함되지 않음)
+
+    python -m benchmarks.run_benchmarks --files 5000 --output results.json
+"""
@@ -0,0 +1,139 @@
+"""
+벤치마크용 가짜 JPEG 폴더 트리 생성
+
+여러 카메라/렌즈 조합, 촬영 정보(날짜, 초점 거리, 조리개, ISO), 바이트/문자열 EXIF 값, 빠진 태그, 폴더마다 겹치는 파일명,
+내용이 같은 사본을 섞어 실제 사진 폴더와 비슷한 조건을 만듭니다. 같은 seed면 같은 트리가 만들어집니다.
+
+    python -m benchmarks.corpus OUTPUT_DIR --files 2000
+"""
+
+import argparse
+import io
+import os
+import random
+import shutil
+
+from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
+
+CAMERA_MODELS = [
+    ("Canon", "Canon EOS R5"), ("Canon", "Canon EOS 5D Mark IV"), ("NIKON CORPORATION", "NIKON Z 6"),
+    ("NIKON CORPORATION", "NIKON D850"), ("SONY", "ILCE-7M3"), ("SONY", "ILCE-7RM4"),
+    ("FUJIFILM", "X-T4"), ("FUJIFILM", "X100V"), ("OLYMPUS CORPORATION", "E-M1MarkIII"),
+    ("Panasonic", "DC-S5"), ("Apple", "iPhone 13 Pro"), ("RICOH IMAGING COMPANY, LTD.", "GR III"),
+]
+LENS_MODELS = [
+    "RF24-70mm F2.8 L IS USM", "EF50mm f/1.8 STM", "NIKKOR Z 24-70mm f/4 S", "AF-S NIKKOR 85mm f/1.8G",
+    "FE 35mm F1.8", "FE 24-105mm F4 G OSS", "XF23mmF2 R WR", "XF16-80mmF4 R OIS WR",
+    "OLYMPUS M.12-40mm F2.8", "LUMIX S 20-60/F3.5-5.6", "iPhone 13 Pro back triple camera 5.7mm f/1.5",
+]
+EXIF_IFD_TAG = 0x8769
+MAKE_TAG, MODEL_TAG = 0x010F, 0x0110
+LENS_MAKE_TAG, LENS_MODEL_TAG = 0xA433, 0xA434
+DATE_TIME_ORIGINAL_TAG, FOCAL_LENGTH_TAG, F_NUMBER_TAG, ISO_TAG = 0x9003, 0x920A, 0x829D, 0x8827
+# 촬영 정보 후보 (초점 거리 mm, 조리개 값 x10, ISO)
+FOCAL_LENGTHS = (14, 16, 20, 24, 28, 35, 50, 70, 85, 105, 135, 200, 400)
+F_NUMBERS = (14, 18, 20, 28, 40, 56, 80, 110, 160)
+ISO_VALUES = (100, 200, 400, 800, 1600, 3200, 6400)
+# 파일명 패턴 (카메라마다 번호가 겹치도록 작은 범위를 씀)
+FILENAME_PATTERNS = ["DSC_{:04d}.JPG", "IMG_{:04d}.JPG", "_DSC{:04d}.jpg", "P{:07d}.jpeg"]
+
+def encode_jpeg(rng, image_size, camera, lens, bytes_values, year=2020):
+    """ EXIF가 들어 있는 작은 JPEG 하나를 만듭니다. camera/lens가 None이면 해당 태그를 빼고 만듭니다.
+    촬영 정보는 카메라가 기록하는 형식(RATIONAL 등)으로 넣고, 카메라 태그가 없으면 함께 뺍니다. """
+    color = tuple(rng.randrange(256) for _ in range(3))
+    image = Image.new("RGB", image_size, color)
+    # 같은 색이라도 내용이 달라지도록 점 몇 개를 찍음
+    for _ in range(8):
+        image.putpixel((rng.randrange(image_size[0]), rng.randrange(image_size[1])),
+                       tuple(rng.randrange(256) for _ in range(3)))
+    exif = Image.Exif()
+    if camera is not None:
+        make, model = camera
+        # 일부 카메라는 Make만, 일부는 Model만 기록
+        if rng.random() > 0.03:
+            exif[MODEL_TAG] = model
+        if rng.random() > 0.1:
+            exif[MAKE_TAG] = make
+    if lens is not None:
+        exif_ifd = exif.get_ifd(EXIF_IFD_TAG)
+        # 바이트 값은 UNDEFINED 타입으로 저장되어 읽을 때 bytes로 나옴
+        exif_ifd[LENS_MODEL_TAG] = lens.encode("utf-8") if bytes_values else lens
+        if rng.random() < 0.5:
+            exif_ifd[LENS_MAKE_TAG] = lens.split()[0]
+    if camera is not None:
+        exif_ifd = exif.get_ifd(EXIF_IFD_TAG)
+        exif_ifd[DATE_TIME_ORIGINAL_TAG] = (f"{year}:{rng.randint(1, 12):02d}:{rng.randint(1, 28):02d} "
+                                            f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00")
+        exif_ifd[FOCAL_LENGTH_TAG] = IFDRational(rng.choice(FOCAL_LENGTHS), 1)
+        exif_ifd[F_NUMBER_TAG] = IFDRational(rng.choice(F_NUMBERS), 10)
+        exif_ifd[ISO_TAG] = rng.choice(ISO_VALUES)
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=80, exif=exif)
+    return output.getvalue()
+
+def generate_corpus(output_dir, file_count=2000, folder_count=None, camera_count=8, lens_count=10,
+                    image_size=(160, 120), missing_tag_ratio=0.05, bytes_ratio=0.2, duplicate_ratio=0.05,
+                    seed=1):
+    """ output_dir 아래에 file_count개의 JPEG을 만들고 생성 조건을 dict로 반환합니다.
+    폴더는 연도/날짜 2단계이고, duplicate_ratio만큼은 다른 폴더에 내용이 같은 사본(이름은 다를 수 있음)으로 만듭니다. """
+    rng = random.Random(seed)
+    folder_count = folder_count or max(1, file_count // 100)
+    cameras = CAMERA_MODELS[:max(1, min(camera_count, len(CAMERA_MODELS)))]
+    lenses = LENS_MODELS[:max(1, min(lens_count, len(LENS_MODELS)))]
+    # 카메라마다 쓰는 렌즈 몇 개
+    camera_lenses = {camera: rng.sample(lenses, min(len(lenses), rng.randint(1, 4))) for camera in cameras}
+    folders = [os.path.join(output_dir, str(2015 + index % 10), f"{index:04d}_{rng.randrange(1, 13):02d}")
+               for index in range(folder_count)]
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    written_files = []
+    duplicate_count = 0
+    for index in range(file_count):
+        folder = folders[index % folder_count]
+        pattern = rng.choice(FILENAME_PATTERNS)
+        # 번호 범위가 작아 여러 폴더에 같은 파일명이 생김
+        filename = pattern.format(rng.randrange(1, max(2, file_count // 4)))
+        file_path = os.path.join(folder, filename)
+        if os.path.exists(file_path):
+            base, ext = os.path.splitext(filename)
+            file_path = os.path.join(folder, f"{base}_{index}{ext}")
+        if written_files and rng.random() < duplicate_ratio:
+            shutil.copyfile(rng.choice(written_files), file_path)
+            duplicate_count += 1
+        else:
+            camera = rng.choice(cameras) if rng.random() >= missing_tag_ratio else None
+            lens = rng.choice(camera_lenses[camera]) if camera and rng.random() >= missing_tag_ratio else None
+            data = encode_jpeg(rng, image_size, camera, lens, rng.random() < bytes_ratio,
+                               year=2015 + index % folder_count % 10)
+            with open(file_path, "wb") as f:
+                f.write(data)
+        written_files.append(file_path)
+    return {
+        "files": file_count,
+        "folders": folder_count,
+        "cameras": len(cameras),
+        "lenses": len(lenses),
+        "image_size": list(image_size),
+        "missing_tag_ratio": missing_tag_ratio,
+        "bytes_ratio": bytes_ratio,
+        "duplicate_ratio": duplicate_ratio,
+        "duplicates_written": duplicate_count,
+        "seed": seed,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic JPEG/EXIF folder tree for benchmarks.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--folders", type=int, default=None)
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--lenses", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    info = generate_corpus(args.output_dir, args.files, args.folders, args.cameras, args.lenses, seed=args.seed)
+    print(f"{info['files']} files in {info['folders']} folders written to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+GearView 단계별 성능 측정 (화면 없이 실행)
+
+가짜 JPEG 트리(corpus.py)를 만들거나 기존 폴더를 써서 단계마다 따로 시간을 잽니다.
+결과는 JSON으로 저장하고 --compare로 이전 결과와 비교할 수 있습니다.
+
+    python -m benchmarks.run_benchmarks --files 5000 --output after.json --compare before.json
+
+디스크 캐시를 비울 수 없으므로 파일을 읽는 단계는 두 번째 반복부터 캐시된 상태로 측정됩니다.
+(최솟값 = 캐시된 상태, 첫 값 = 생성 직후 상태)
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import PIL
+
+from gearview_core import (DirectoryCrawler, PhotoLibrary, iter_scan_events, get_exif_data, get_camera_lens_exif,
+                           get_camera_info, get_lens_info, run_file_jobs, find_duplicates, load_preview_image,
+                           metrics, DEFAULT_SCAN_WORKERS, DEFAULT_FILE_WORKERS, EXTRA_FIELDS)
+from .corpus import generate_corpus
+
+# 결과 JSON 형식이 바뀌면 올림
+RESULT_FORMAT_VERSION = 1
+PREVIEW_SAMPLE_SIZE = 200
+# group_by 단계에서 차례로 만드는 단계 조합
+GROUP_BY_HIERARCHIES = [("camera", "lens"), ("lens", "focal_length", "year"), ("year", "month", "camera"),
+                        ("aperture", "iso")]
+
+class BenchmarkContext:
+    """ 단계들이 함께 쓰는 입력 (파일 목록, 읽어 둔 EXIF 등)과 임시 폴더 """
+
+    def __init__(self, corpus_dir, work_dir, worker_count, file_worker_count):
+        self.corpus_dir = corpus_dir
+        self.work_dir = work_dir
+        self.worker_count = worker_count
+        self.file_worker_count = file_worker_count
+        self.file_paths = []
+        self.exif_records = []
+        self.scan_rows = []
+        self.library = None
+
+    def fresh_dir(self, name):
+        path = os.path.join(self.work_dir, name)
+        shutil.rmtree(path, ignore_errors=True)
+        return path
+
+def phase_walk(context):
+    """ 디렉터리 탐색 (DirectoryCrawler) """
+    crawler = DirectoryCrawler(context.worker_count)
+    context.file_paths = [entry.path for entry in crawler.iter_files([context.corpus_dir])]
+    return len(context.file_paths)
+
+def phase_exif_pillow(context):
+    """ Pillow로 EXIF 전체 읽기 (get_exif_data, 직렬) """
+    context.exif_records = [get_exif_data(file_path) for file_path in context.file_paths]
+    return len(context.exif_records)
+
+def phase_exif_fast(context):
+    """ 헤더 전용 EXIF 리더로 카메라/렌즈 태그만 읽기 (get_camera_lens_exif, 직렬) """
+    for file_path in context.file_paths:
+        get_camera_lens_exif(file_path)
+    return len(context.file_paths)
+
+def phase_classify(context):
+    """ get_camera_info/get_lens_info 분류 (EXIF는 미리 읽어 둔 것 사용) """
+    for exif_data in context.exif_records:
+        get_camera_info(exif_data)
+        get_lens_info(exif_data)
+    return len(context.exif_records)
+
+def run_scan(context, index_path):
+    rows = []
+    # GUI처럼 추가 필드도 모두 읽음
+    for event in iter_scan_events([context.corpus_dir], worker_count=context.worker_count, index_path=index_path,
+                                  extra_fields=EXTRA_FIELDS):
+        if event[0] == "batch":
+            rows.extend(event[1])
+    context.scan_rows = rows
+    return len(rows)
+
+def phase_scan_cold(context):
+    """ 전체 스캔 파이프라인, 색인 없음 (목록 + 병렬 EXIF + 분류) """
+    index_path = os.path.join(context.fresh_dir("index_cold"), "scan_index.sqlite3")
+    return run_scan(context, index_path)
+
+def phase_scan_warm(context):
+    """ 전체 스캔 파이프라인, 색인이 모두 맞는 상태 (다시 스캔) """
+    index_path = os.path.join(context.work_dir, "index_warm", "scan_index.sqlite3")
+    if not os.path.exists(index_path):
+        run_scan(context, index_path)
+    started = time.perf_counter()
+    item_count = run_scan(context, index_path)
+    return item_count, time.perf_counter() - started
+
+def phase_tree_build(context):
+    """ 분석 결과 모델 만들기와 트리 표시 순서 계산 (그룹 정렬, 그룹별 수정 날짜 정렬) """
+    library = PhotoLibrary(extra_fields=EXTRA_FIELDS)
+    for file_path, camera_info, lens_info, file_stat, field_values in context.scan_rows:
+        library.add_file(file_path, camera_info, lens_info, file_stat, field_values)
+    for camera_info in library.sort_cameras(by_count=True):
+        for lens_info in library.sort_lenses(camera_info, by_count=True):
+            library.sorted_group_files(camera_info, lens_info)
+    context.library = library
+    return len(library)
+
+def phase_group_by(context):
+    """ 다른 단계 조합으로 다시 묶기 (group_by + 최상위/첫 하위 그룹 개수 + 가장 큰 그룹의 파일 목록) """
+    for keys in GROUP_BY_HIERARCHIES:
+        grouping = context.library.group_by(keys)
+        top_groups = grouping.children(by_count=True)
+        if top_groups:
+            grouping.children((top_groups[0][0],), by_count=True)
+            grouping.files((top_groups[0][0],))
+    return len(context.library) * len(GROUP_BY_HIERARCHIES)
+
+def file_jobs(context):
+    return [(file_path, camera_info, lens_info, True) for file_path, camera_info, lens_info, *_ in context.scan_rows]
+
+def phase_copy(context):
+    """ 카메라/렌즈 폴더로 복사 (run_file_jobs) """
+    target_dir = context.fresh_dir("copy_target")
+    processed_count, _, _ = run_file_jobs("copy", file_jobs(context), target_dir,
+                                          worker_count=context.file_worker_count)
+    return processed_count
+
+def phase_link(context):
+    """ 카메라/렌즈 폴더로 링크 (run_file_jobs) """
+    target_dir = context.fresh_dir("link_target")
+    processed_count, _, _ = run_file_jobs("link", file_jobs(context), target_dir,
+                                          worker_count=context.file_worker_count)
+    return processed_count
+
+def phase_move(context):
+    """ 카메라/렌즈 폴더로 이동 (같은 파일 시스템, 원본 사본을 먼저 만든 뒤 측정) """
+    staging_dir = context.fresh_dir("move_source")
+    shutil.copytree(context.corpus_dir, staging_dir)
+    jobs = [(os.path.join(staging_dir, os.path.relpath(file_path, context.corpus_dir)), camera_info, lens_info, True)
+            for file_path, camera_info, lens_info, _ in file_jobs(context)]
+    target_dir = context.fresh_dir("move_target")
+    started = time.perf_counter()
+    processed_count, _, _ = run_file_jobs("move", jobs, target_dir, worker_count=context.file_worker_count)
+    return processed_count, time.perf_counter() - started
+
+def phase_duplicates(context):
+    """ 내용 기준 중복 찾기 (find_duplicates) """
+    find_duplicates([(file_path, file_stat[0]) for file_path, _, _, file_stat, _ in context.scan_rows])
+    return len(context.scan_rows)
+
+def phase_preview(context):
+    """ 미리보기 이미지 만들기 (디스크 캐시 없이, 앞쪽 PREVIEW_SAMPLE_SIZE개) """
+    sample = context.file_paths[:PREVIEW_SAMPLE_SIZE]
+    for file_path in sample:
+        load_preview_image(file_path)
+    return len(sample)
+
+# 실행 순서대로 (뒤 단계가 앞 단계 결과를 씀)
+PHASES = {
+    "walk": phase_walk,
+    "exif_pillow": phase_exif_pillow,
+    "exif_fast": phase_exif_fast,
+    "classify": phase_classify,
+    "scan_cold": phase_scan_cold,
+    "scan_warm": phase_scan_warm,
+    "tree_build": phase_tree_build,
+    "group_by": phase_group_by,
+    "copy": phase_copy,
+    "move": phase_move,
+    "link": phase_link,
+    "duplicates": phase_duplicates,
+    "preview": phase_preview,
+}
+# 다른 단계를 고르지 않아도 입력을 만들기 위해 실행하는 단계
+PHASE_INPUTS = {
+    "exif_pillow": "walk", "exif_fast": "walk", "classify": "exif_pillow", "preview": "walk",
+    "tree_build": "scan_cold", "group_by": "tree_build", "copy": "scan_cold", "move": "scan_cold", "link": "scan_cold",
+    "duplicates": "scan_cold",
+}
+
+def time_phase(phase_function, context, repeat):
+    """ 단계를 repeat번 실행해 시간 목록과 처리 항목 수를 반환합니다. """
+    timings = []
+    item_count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = phase_function(context)
+        elapsed = time.perf_counter() - started
+        if isinstance(result, tuple):
+            # 준비 작업을 빼고 직접 잰 시간
+            item_count, elapsed = result
+        else:
+            item_count = result
+        timings.append(elapsed)
+    return timings, item_count
+
+def summarize(timings, item_count):
+    best = min(timings)
+    return {
+        "seconds": [round(t, 6) for t in timings],
+        "min": round(best, 6),
+        "median": round(statistics.median(timings), 6),
+        "items": item_count,
+        "items_per_second": round(item_count / best, 1) if best > 0 else None,
+    }
+
+def resolve_phases(selected):
+    """ 고른 단계와 그 입력 단계를 실행 순서대로 돌려줍니다. (입력 단계는 측정 결과에 넣지 않음) """
+    needed = set(selected)
+    for phase_name in selected:
+        while phase_name in PHASE_INPUTS:
+            phase_name = PHASE_INPUTS[phase_name]
+            needed.add(phase_name)
+    return [phase_name for phase_name in PHASES if phase_name in needed]
+
+def print_results(results, baseline=None, stream=sys.stdout):
+    print(f"{'phase':<12} {'min (s)':>10} {'median (s)':>11} {'items/s':>11}" + ("  vs baseline" if baseline else ""),
+          file=stream)
+    for phase_name, phase_result in results["phases"].items():
+        line = (f"{phase_name:<12} {phase_result['min']:>10.4f} {phase_result['median']:>11.4f} "
+                f"{phase_result['items_per_second'] or 0:>11.1f}")
+        base_result = (baseline or {}).get("phases", {}).get(phase_name)
+        if base_result and phase_result["min"] > 0:
+            line += f"  {base_result['min'] / phase_result['min']:.2f}x"
+        print(line, file=stream)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Time GearView's scan, grouping and export phases.")
+    parser.add_argument("--corpus", metavar="DIR", help="existing folder to benchmark (default: generate one)")
+    parser.add_argument("--files", type=int, default=2000, help="number of files to generate (default 2000)")
+    parser.add_argument("--cameras", type=int, default=8, help="number of camera models to generate")
+    parser.add_argument("--lenses", type=int, default=10, help="number of lens models to generate")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated corpus")
+    parser.add_argument("--phases", default=",".join(PHASES),
+                        help=f"comma-separated phases to time (default: all of {','.join(PHASES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per phase (default 3)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS, help="scan workers")
+    parser.add_argument("--file-workers", type=int, default=DEFAULT_FILE_WORKERS, help="copy/move/link workers")
+    parser.add_argument("--work-dir", metavar="DIR", help="folder for the corpus and export targets (default: temp)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated corpus and export targets")
+    parser.add_argument("--output", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="earlier results JSON to compare against")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    selected = [phase_name.strip() for phase_name in args.phases.split(",") if phase_name.strip()]
+    unknown = [phase_name for phase_name in selected if phase_name not in PHASES]
+    if unknown:
+        print(f"Unknown phases: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="gearview-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        corpus_info = {"path": args.corpus}
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = os.path.join(work_dir, "corpus")
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+            print(f"Generating {args.files} files...", file=sys.stderr)
+            corpus_info = generate_corpus(corpus_dir, args.files, camera_count=args.cameras,
+                                          lens_count=args.lenses, seed=args.seed)
+
+        context = BenchmarkContext(corpus_dir, work_dir, args.workers, args.file_workers)
+        metrics.reset()
+        results = {
+            "format_version": RESULT_FORMAT_VERSION,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "workers": args.workers,
+            "file_workers": args.file_workers,
+            "corpus": corpus_info,
+            "phases": {},
+        }
+        for phase_name in resolve_phases(selected):
+            print(f"Running {phase_name}...", file=sys.stderr)
+            timings, item_count = time_phase(PHASES[phase_name], context, max(1, args.repeat))
+            if phase_name in selected:
+                results["phases"][phase_name] = summarize(timings, item_count)
+        # 엔진 내부 단계별 계측 (모든 반복의 합계)
+        results["metrics"] = metrics.snapshot()
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+GearView 엔진: GUI 없이 쓸 수 있는 스캔, 카메라/렌즈 분류, 복사/이동 기능
+(Tk 없이 import 가능 - 배치 작업, 서버, 벤치마크용)
+"""
+
+from .exif import (get_exif_data, read_jpeg_exif_tags, read_exif_tags, read_jpeg_exif_thumbnail, get_camera_lens_exif,
+                   get_camera_info, get_lens_info, ExifParseError)
+from .library import PhotoLibrary, LibraryView
+from .search import SubstringIndex, check_date_bound
+from .fields import GROUP_FIELDS, EXTRA_FIELDS, UNKNOWN_VALUE, natural_sort_key
+from .grouping import Grouping
+from .scanner import (DirectoryCrawler, iter_scan_events, scan_folders, analyze_file,
+                      DEFAULT_SCAN_WORKERS, MAX_SCAN_WORKERS)
+from .index import open_scan_index, load_scan_index, update_scan_index, remove_from_scan_index
+from .fileops import (sanitize_foldername, get_target_folder, run_file_jobs,
+                      DEFAULT_FILE_WORKERS, MAX_FILE_WORKERS, DEFAULT_DEVICE_WORKERS, MAX_DEVICE_WORKERS)
+from .paths import get_app_data_dir, get_cache_dir
+from .duplicates import find_duplicates, get_redundant_copies
+from .preview import load_preview_image, PreviewLoader, PREVIEW_SIZE
+from .thumbcache import ThumbnailCache, THUMBNAIL_CACHE_MAX_BYTES
+from .metrics import Metrics, metrics, ThreadProfiler, format_profile
+from .watcher import FolderWatcher
+from .pairs import find_pair_keys, find_paired_jpeg
+
+__all__ = [
+    'get_exif_data', 'read_jpeg_exif_tags', 'read_exif_tags', 'read_jpeg_exif_thumbnail', 'get_camera_lens_exif', 'get_camera_info', 'get_lens_info',
+    'ExifParseError', 'PhotoLibrary', 'DirectoryCrawler', 'iter_scan_events', 'scan_folders', 'analyze_file',
+    'DEFAULT_SCAN_WORKERS', 'MAX_SCAN_WORKERS', 'open_scan_index', 'load_scan_index', 'update_scan_index',
+    'remove_from_scan_index', 'sanitize_foldername', 'get_target_folder', 'run_file_jobs', 'get_app_data_dir',
+    'DEFAULT_FILE_WORKERS', 'MAX_FILE_WORKERS', 'DEFAULT_DEVICE_WORKERS', 'MAX_DEVICE_WORKERS',
+    'get_cache_dir', 'find_duplicates', 'get_redundant_copies', 'load_preview_image', 'PreviewLoader', 'PREVIEW_SIZE', 'ThumbnailCache', 'THUMBNAIL_CACHE_MAX_BYTES',
+    'Metrics', 'metrics', 'ThreadProfiler', 'format_profile', 'FolderWatcher',
+    'GROUP_FIELDS', 'EXTRA_FIELDS', 'UNKNOWN_VALUE', 'natural_sort_key', 'Grouping',
+    'LibraryView', 'SubstringIndex', 'check_date_bound', 'find_pair_keys', 'find_paired_jpeg',
+]
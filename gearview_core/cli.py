@@ -0,0 +1,293 @@
+"""
+GearView 명령줄 도구 (Tk 없이 실행)
+
+    python -m gearview_core scan FOLDER... [--json OUT] [--csv OUT] [--group-by FIELD,FIELD,...]
+    python -m gearview_core copy FOLDER... --target DIR [--camera PATTERN] [--lens PATTERN]
+    python -m gearview_core move FOLDER... --target DIR [--camera PATTERN] [--lens PATTERN]
+    python -m gearview_core link FOLDER... --target DIR [--camera PATTERN] [--lens PATTERN]
+    python -m gearview_core duplicates FOLDER... [--json OUT]
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import sys
+
+from .duplicates import find_duplicates, get_redundant_copies
+from .fields import GROUP_FIELDS, check_fields, natural_sort_key
+from .fileops import (run_file_jobs, DEFAULT_FILE_WORKERS, MAX_FILE_WORKERS, DEFAULT_DEVICE_WORKERS,
+                      MAX_DEVICE_WORKERS)
+from .index import remove_from_scan_index
+from .library import PhotoLibrary
+from .metrics import metrics, ThreadProfiler, format_profile
+from .scanner import scan_folders, DEFAULT_SCAN_WORKERS, MAX_SCAN_WORKERS
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gearview",
+                                     description="Group photos (JPEG, RAW, HEIC) by camera and lens, export the grouping, "
+                                                 "or copy/move/link files by camera/lens.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan_options = argparse.ArgumentParser(add_help=False)
+    scan_options.add_argument("folders", nargs="+", metavar="FOLDER", help="source folders to scan")
+    scan_options.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                              help=f"number of scan workers (1-{MAX_SCAN_WORKERS}, default {DEFAULT_SCAN_WORKERS})")
+    scan_options.add_argument("--follow-links", action="store_true", help="follow symbolic links to folders")
+    scan_options.add_argument("--skip-hidden", action="store_true", help="skip hidden and system folders")
+    scan_options.add_argument("--no-index", action="store_true", help="do not read or update the scan index")
+    scan_options.add_argument("--index", metavar="PATH", help="scan index file (default: user config folder)")
+    scan_options.add_argument("--camera", action="append", metavar="PATTERN",
+                              help="only cameras matching this pattern (case-insensitive, * and ? allowed; repeatable)")
+    scan_options.add_argument("--lens", action="append", metavar="PATTERN",
+                              help="only lenses matching this pattern (case-insensitive, * and ? allowed; repeatable)")
+    scan_options.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+    scan_options.add_argument("--stats", metavar="PATH",
+                              help="write per-stage timings and counters as JSON ('-' for stderr)")
+    scan_options.add_argument("--profile", metavar="PATH",
+                              help="record the run with cProfile and save the stats to PATH (pstats format)")
+
+    scan_parser = subparsers.add_parser("scan", parents=[scan_options], help="scan folders and write the grouping")
+    scan_parser.add_argument("--json", metavar="PATH", help="write the grouping as JSON ('-' for stdout)")
+    scan_parser.add_argument("--csv", metavar="PATH", help="write one row per file as CSV ('-' for stdout)")
+    scan_parser.add_argument("--group-by", metavar="FIELDS",
+                             help="group by these comma-separated fields instead of camera > lens "
+                                  f"(e.g. lens,focal_length,year; available: {', '.join(GROUP_FIELDS)}); "
+                                  "--json then writes the nested groups")
+
+    duplicates_parser = subparsers.add_parser("duplicates", parents=[scan_options],
+                                              help="list files with identical content")
+    duplicates_parser.add_argument("--json", metavar="PATH", help="write the duplicate groups as JSON ('-' for stdout)")
+
+    action_help = {
+        "copy": "copy files into TARGET/<camera>/<lens>",
+        "move": "move files into TARGET/<camera>/<lens>",
+        "link": "hardlink (or symlink across volumes) files into TARGET/<camera>/<lens>; "
+                "re-running only adds new files and removes broken links",
+    }
+    for action in ("copy", "move", "link"):
+        action_parser = subparsers.add_parser(action, parents=[scan_options], help=action_help[action])
+        action_parser.add_argument("--target", required=True, metavar="DIR", help="target folder")
+        action_parser.add_argument("--flat", action="store_true",
+                                   help="put all files in the camera folder (no lens subfolders)")
+        action_parser.add_argument("--dry-run", action="store_true", help="only list the files that would be processed")
+        action_parser.add_argument("--file-workers", type=int, default=DEFAULT_FILE_WORKERS,
+                                   help=f"number of files to {action} at once (1-{MAX_FILE_WORKERS}, "
+                                        f"default {DEFAULT_FILE_WORKERS})")
+        action_parser.add_argument("--skip-duplicates", action="store_true",
+                                   help=f"{action} only the first file of each group of identical files")
+        action_parser.add_argument("--source-device-workers", type=int, default=DEFAULT_DEVICE_WORKERS,
+                                   help=f"files read at once from one source disk (1-{MAX_DEVICE_WORKERS}, "
+                                        f"default {DEFAULT_DEVICE_WORKERS})")
+        action_parser.add_argument("--target-device-workers", type=int, default=DEFAULT_DEVICE_WORKERS,
+                                   help=f"files written at once to one target disk (1-{MAX_DEVICE_WORKERS}, "
+                                        f"default {DEFAULT_DEVICE_WORKERS})")
+    return parser
+
+def matches_any(name, patterns):
+    """ 패턴이 없으면 모두 통과, 있으면 하나라도 맞는지 (대소문자 무시) """
+    if not patterns:
+        return True
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in patterns)
+
+def select_files(library, camera_patterns, lens_patterns):
+    """ 필터에 맞는 (경로, 카메라, 렌즈, (크기, 수정 시각)) 목록을 반환합니다. """
+    return [item for item in library.iter_files()
+            if matches_any(item[1], camera_patterns) and matches_any(item[2], lens_patterns)]
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="")
+
+def write_json(path, selected):
+    grouping = {}
+    for file_path, camera_info, lens_info, _ in selected:
+        grouping.setdefault(camera_info, {}).setdefault(lens_info, []).append(file_path)
+    document = {
+        "summary": {
+            "files": len(selected),
+            "cameras": len(grouping),
+            "lens_groups": sum(len(lenses) for lenses in grouping.values()),
+        },
+        "cameras": grouping,
+    }
+    output = open_output(path)
+    try:
+        json.dump(document, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+def write_grouping_json(path, grouping):
+    """ group_by 결과를 {이름: {"files": 개수, "groups": {...}}} 형태로 저장합니다. (마지막 단계는 "paths") """
+    def build(prefix):
+        groups = {}
+        for name, count in grouping.children(prefix, by_count=True):
+            group = {"files": count}
+            if len(prefix) + 1 < len(grouping.keys):
+                group["groups"] = build(prefix + (name,))
+            else:
+                group["paths"] = grouping.files(prefix + (name,))
+            groups[name] = group
+        return groups
+
+    document = {"summary": {"files": grouping.total, "group_by": list(grouping.keys)}, "groups": build(())}
+    output = open_output(path)
+    try:
+        json.dump(document, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+def print_grouping(grouping, stream, prefix=()):
+    """ group_by 결과를 단계마다 들여 써서 출력합니다. (파일 수 내림차순) """
+    depth = len(prefix)
+    for name, count in grouping.children(prefix, by_count=True, sort_key=natural_sort_key):
+        print(f"{'    ' * depth}{name} ({count} files)", file=stream)
+        print_grouping(grouping, stream, prefix + (name,))
+
+def write_csv(path, selected):
+    output = open_output(path)
+    try:
+        writer = csv.writer(output)
+        writer.writerow(["path", "camera", "lens", "size", "mtime_ns"])
+        for file_path, camera_info, lens_info, (size, mtime_ns) in selected:
+            writer.writerow([file_path, camera_info, lens_info, size, mtime_ns])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+def print_summary(selected, stream):
+    counts = {}
+    for _, camera_info, lens_info, _ in selected:
+        lens_counts = counts.setdefault(camera_info, {})
+        lens_counts[lens_info] = lens_counts.get(lens_info, 0) + 1
+    for camera_info, lens_counts in sorted(counts.items(), key=lambda x: sum(x[1].values()), reverse=True):
+        print(f"{camera_info} ({sum(lens_counts.values())} files, {len(lens_counts)} lenses)", file=stream)
+        for lens_info, count in sorted(lens_counts.items(), key=lambda x: x[1], reverse=True):
+            print(f"    {lens_info} ({count} files)", file=stream)
+
+def write_duplicates(path, duplicate_groups):
+    if path:
+        output = open_output(path)
+        try:
+            json.dump({"groups": duplicate_groups}, output, ensure_ascii=False, indent=2)
+            output.write("\n")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return
+    for group in duplicate_groups:
+        print(f"{len(group)} identical files:")
+        for file_path in group:
+            print(f"    {file_path}")
+
+def find_selected_duplicates(selected, log):
+    """ 선택된 파일 중 내용이 같은 파일 묶음을 찾습니다. """
+    def report_progress(phase, done_count, total_count):
+        if done_count % 500 == 0 or done_count == total_count:
+            log(f"Comparing ({phase}): {done_count}/{total_count}", end="\r")
+
+    duplicate_groups = find_duplicates([(file_path, size) for file_path, _, _, (size, _) in selected],
+                                       progress_callback=report_progress)
+    log("")
+    log(f"{len(duplicate_groups)} groups of identical files, "
+        f"{len(get_redundant_copies(duplicate_groups))} redundant copies.")
+    return duplicate_groups
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = (lambda *a, **k: None) if args.quiet else (lambda *a, **k: print(*a, file=sys.stderr, **k))
+
+    profiler = None
+    if args.profile:
+        profiler = ThreadProfiler()
+        profiler.start()
+    try:
+        return run_command(args, log)
+    finally:
+        if profiler is not None:
+            stats = profiler.stop()
+            stats.dump_stats(args.profile)
+            log(format_profile(stats, limit=20))
+        if args.stats == "-":
+            print(metrics.format_report(), file=sys.stderr)
+        elif args.stats:
+            metrics.write_json(args.stats)
+
+def run_command(args, log):
+    worker_count = max(1, min(MAX_SCAN_WORKERS, args.workers))
+    group_keys = []
+    if getattr(args, "group_by", None):
+        group_keys = [key.strip() for key in args.group_by.split(",") if key.strip()]
+        try:
+            check_fields(group_keys)
+        except ValueError as e:
+            print(f"gearview: error: {e}", file=sys.stderr)
+            return 2
+    library = PhotoLibrary(extra_fields=[key for key in group_keys if key not in ("camera", "lens")])
+    library, message = scan_folders(args.folders, library, worker_count=worker_count,
+                                    follow_symlinks=args.follow_links, skip_hidden=args.skip_hidden,
+                                    use_index=not args.no_index, index_path=args.index)
+    log(message)
+    selected = select_files(library, args.camera, args.lens)
+
+    if args.command == "scan" and group_keys:
+        # 필터에서 빠진 파일은 결과에서 지우고 묶음
+        if len(selected) != len(library):
+            selected_paths = {item[0] for item in selected}
+            library.remove_files([item[0] for item in library.iter_files() if item[0] not in selected_paths])
+        grouping = library.group_by(group_keys)
+        if args.json:
+            write_grouping_json(args.json, grouping)
+        if args.csv:
+            write_csv(args.csv, selected)
+        if not args.json and not args.csv:
+            print_grouping(grouping, sys.stdout)
+        return 0
+
+    if args.command == "scan":
+        if args.json:
+            write_json(args.json, selected)
+        if args.csv:
+            write_csv(args.csv, selected)
+        if not args.json and not args.csv:
+            print_summary(selected, sys.stdout)
+        return 0
+
+    if args.command == "duplicates":
+        write_duplicates(args.json, find_selected_duplicates(selected, log))
+        return 0
+
+    # copy / move / link
+    if args.skip_duplicates:
+        redundant_paths = get_redundant_copies(find_selected_duplicates(selected, log))
+        selected = [item for item in selected if item[0] not in redundant_paths]
+    jobs = [(file_path, camera_info, lens_info, not args.flat) for file_path, camera_info, lens_info, _ in selected]
+    if args.dry_run:
+        for file_path, camera_info, lens_info, _ in jobs:
+            print(f"{file_path}\t{camera_info}\t{lens_info}")
+        past_tense = {"copy": "copied", "move": "moved", "link": "linked"}[args.command]
+        log(f"{len(jobs)} files would be {past_tense}.")
+        return 0
+
+    def report_progress(filename, processed_count, total_count):
+        if processed_count % 100 == 0 or processed_count == total_count:
+            log(f"{args.command.capitalize()}: {processed_count}/{total_count}", end="\r")
+
+    file_worker_count = max(1, min(MAX_FILE_WORKERS, args.file_workers))
+    source_device_workers = max(1, min(MAX_DEVICE_WORKERS, args.source_device_workers))
+    target_device_workers = max(1, min(MAX_DEVICE_WORKERS, args.target_device_workers))
+    processed_count, error_count, moved_paths = run_file_jobs(args.command, jobs, args.target, report_progress,
+                                                              worker_count=file_worker_count,
+                                                              source_device_workers=source_device_workers,
+                                                              target_device_workers=target_device_workers)
+    log("")
+    if moved_paths and not args.no_index:
+        remove_from_scan_index(moved_paths, args.index)
+    log(f"{args.command.capitalize()} operation completed. Success: {processed_count} files, Failed: {error_count} files")
+    return 1 if error_count else 0
@@ -0,0 +1,92 @@
+"""
+내용 기준 중복 파일 찾기
+
+모든 파일을 끝까지 읽지 않도록 단계적으로 후보를 줄입니다.
+  1) 크기가 같은 파일끼리 묶고
+  2) 앞/뒤 블록의 해시가 같은 파일끼리 다시 묶은 뒤
+  3) 그래도 같은 파일만 전체 내용을 해시해 확인합니다.
+(작은 파일은 2단계에서 이미 전체 내용을 읽으므로 3단계를 건너뜀)
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_HASH_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+# 2단계에서 읽는 앞/뒤 블록 크기 (JPEG은 앞부분 EXIF가 비슷해도 끝부분 이미지 데이터가 다름)
+EDGE_BLOCK_SIZE = 64 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file_edges(file_path, size):
+    """ 파일 앞/뒤 EDGE_BLOCK_SIZE 바이트의 해시 (파일이 작으면 전체 내용) """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(EDGE_BLOCK_SIZE))
+        if size > EDGE_BLOCK_SIZE:
+            f.seek(max(EDGE_BLOCK_SIZE, size - EDGE_BLOCK_SIZE))
+            digest.update(f.read(EDGE_BLOCK_SIZE))
+    return digest.digest()
+
+def hash_file(file_path):
+    """ 파일 전체 내용의 해시 """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+def _regroup(executor, groups, key_function, phase, progress_callback):
+    """ 각 후보 묶음을 key_function(경로, 크기) 값으로 다시 나눠 2개 이상인 묶음만 남깁니다. """
+    jobs = [(file_path, size) for group in groups for file_path, size in group]
+    new_groups = {}
+    total = len(jobs)
+
+    def compute(job):
+        try:
+            return key_function(*job)
+        except OSError as e:
+            print(f"Error reading {job[0]}: {e}")
+            return None
+
+    for done_count, (job, key) in enumerate(zip(jobs, executor.map(compute, jobs)), 1):
+        if key is not None:
+            new_groups.setdefault((job[1], key), []).append(job)
+        if progress_callback is not None:
+            progress_callback(phase, done_count, total)
+    return [group for group in new_groups.values() if len(group) > 1]
+
+def find_duplicates(files, worker_count=DEFAULT_HASH_WORKERS, progress_callback=None):
+    """ 내용이 같은 파일 묶음을 찾습니다.
+    files: [(경로, 크기), ...] (크기를 모르면 0 - 직접 확인)
+    progress_callback(단계 이름, 처리한 수, 전체 수)는 이 함수를 부른 스레드에서 호출됩니다.
+    [[경로, ...], ...]를 반환합니다. 묶음은 크기가 큰 순, 묶음 안은 경로 순입니다. """
+    # 1단계: 크기
+    by_size = {}
+    seen_paths = set()
+    for file_path, size in files:
+        if file_path in seen_paths:
+            continue
+        seen_paths.add(file_path)
+        if not size:
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                continue
+        by_size.setdefault(size, []).append((file_path, size))
+    candidates = [group for group in by_size.values() if len(group) > 1]
+
+    with ThreadPoolExecutor(max_workers=max(1, worker_count)) as executor:
+        # 2단계: 앞/뒤 블록
+        candidates = _regroup(executor, candidates, hash_file_edges, "edges", progress_callback)
+        # 3단계: 앞/뒤 블록이 파일 전체를 덮지 않는 경우만 전체 해시
+        confirmed = [group for group in candidates if group[0][1] <= 2 * EDGE_BLOCK_SIZE]
+        large = [group for group in candidates if group[0][1] > 2 * EDGE_BLOCK_SIZE]
+        confirmed.extend(_regroup(executor, large, lambda file_path, size: hash_file(file_path),
+                                  "full", progress_callback))
+
+    confirmed.sort(key=lambda group: group[0][1], reverse=True)
+    return [sorted(file_path for file_path, _ in group) for group in confirmed]
+
+def get_redundant_copies(duplicate_groups):
+    """ 묶음마다 첫 번째 파일만 남기고 나머지(건너뛸 사본) 경로 집합을 반환합니다. """
+    return {file_path for group in duplicate_groups for file_path in group[1:]}
@@ -0,0 +1,523 @@
+"""
+카메라/렌즈 분류용 EXIF 읽기 및 분류 함수
+"""
+
+import os
+import struct
+import time
+
+from PIL import Image, ExifTags
+
+from .metrics import metrics
+
+def get_exif_data(filepath):
+    """ 이미지 파일에서 EXIF 데이터를 읽어옵니다. """
+    try:
+        img = Image.open(filepath)
+        exif_data_pil = img._getexif() # Pillow 내부 형식의 EXIF 데이터
+        if exif_data_pil is None:
+            return {}
+
+        exif = {}
+        for tag_id, value in exif_data_pil.items():
+            tag_name = ExifTags.TAGS.get(tag_id, tag_id)
+            exif[tag_name] = value
+        return exif
+    except Exception as e:
+        metrics.count(f"exif.errors.{type(e).__name__}")
+        print(f"Error reading EXIF for {filepath}: {e}")
+        return {}
+
+# 카메라/렌즈 정보가 없을 때의 분류 값 (get_camera_info/get_lens_info)
+NO_CAMERA_INFO = "No camera info"
+NO_LENS_INFO = "No lens info"
+
+# 카메라/렌즈 분류에 필요한 태그만 읽는 헤더 전용 EXIF 리더
+# IFD0과 Exif IFD 어느 쪽에 있어도 읽음 (Pillow와 마찬가지로 Exif IFD 값이 우선)
+CAMERA_LENS_TAGS = {
+    0x010F: 'Make',
+    0x0110: 'Model',
+    0xA433: 'LensMake',
+    0xA434: 'LensModel',
+}
+# 카메라/렌즈 외의 그룹 기준 필드(fields.py)에 쓰는 태그 (숫자 형식도 직접 변환)
+EXTENDED_TAGS = {
+    0x829D: 'FNumber',
+    0x8827: 'ISOSpeedRatings',
+    0x9003: 'DateTimeOriginal',
+    0x920A: 'FocalLength',
+    0xA431: 'BodySerialNumber',
+}
+EXIF_IFD_POINTER_TAG = 0x8769
+TIFF_TYPE_ASCII = 2
+TIFF_TYPE_SHORT = 3
+TIFF_TYPE_LONG = 4
+TIFF_TYPE_RATIONAL = 5
+TIFF_TYPE_UNDEFINED = 7
+TIFF_TYPE_SRATIONAL = 10
+TIFF_TYPE_DOUBLE = 12
+# 형식별 값 하나의 바이트 수
+TIFF_TYPE_SIZES = {TIFF_TYPE_ASCII: 1, TIFF_TYPE_SHORT: 2, TIFF_TYPE_LONG: 4, TIFF_TYPE_RATIONAL: 8,
+                   TIFF_TYPE_UNDEFINED: 1, TIFF_TYPE_SRATIONAL: 8, TIFF_TYPE_DOUBLE: 8}
+# IFD1(썸네일 IFD)의 JPEG 썸네일 위치/크기 태그
+JPEG_THUMBNAIL_OFFSET_TAG = 0x0201
+JPEG_THUMBNAIL_LENGTH_TAG = 0x0202
+
+# 형식별 확장자 (소문자). RAW/HEIC도 이미지 데이터는 읽지 않고 헤더에서 태그만 읽음
+JPEG_SUFFIXES = ('.jpg', '.jpeg')
+# 파일 전체가 TIFF 구조인 RAW (IFD0 + Exif IFD)
+TIFF_RAW_SUFFIXES = ('.cr2', '.nef', '.arw', '.dng')
+# ISO-BMFF 상자 구조 (CR3: moov 안의 Canon uuid 상자, HEIC: meta 상자의 Exif 항목)
+BMFF_SUFFIXES = ('.cr3', '.heic', '.heif')
+# 후지 RAF: 헤더가 가리키는 내장 JPEG의 Exif
+RAF_SUFFIXES = ('.raf',)
+RAW_SUFFIXES = TIFF_RAW_SUFFIXES + ('.cr3',) + RAF_SUFFIXES
+# CR3 메타데이터 상자 (CMT1: IFD0, CMT2: Exif IFD를 각각 TIFF 구조로 담음)
+CANON_CR3_UUID = bytes.fromhex('85c0b687820f11e08111f4ce462b6a48')
+CR3_TIFF_BOXES = (b'CMT1', b'CMT2')
+RAF_MAGIC = b'FUJIFILMCCD-RAW '
+# RAF 헤더에서 내장 JPEG 오프셋의 위치
+RAF_JPEG_OFFSET_POSITION = 84
+
+class ExifParseError(Exception):
+    """ 헤더 전용 리더가 처리할 수 없는 파일 (JPEG는 Pillow로 대체 처리) """
+
+def _read_tiff_ifd(f, tiff_start, endian, ifd_offset, wanted):
+    """ TIFF IFD 하나에서 원하는 태그를 읽습니다. (태그 값 dict, Exif IFD 오프셋)을 반환합니다. """
+    f.seek(tiff_start + ifd_offset)
+    count_bytes = f.read(2)
+    if len(count_bytes) < 2:
+        raise ExifParseError("truncated IFD")
+    entry_count = struct.unpack(endian + 'H', count_bytes)[0]
+    entries = f.read(entry_count * 12)
+    if len(entries) < entry_count * 12:
+        raise ExifParseError("truncated IFD entries")
+
+    found = {}
+    value_offsets = []
+    exif_ifd_offset = None
+    for i in range(entry_count):
+        tag_id, type_id, count, raw_value = struct.unpack(endian + 'HHI4s', entries[i * 12:(i + 1) * 12])
+        if tag_id == EXIF_IFD_POINTER_TAG:
+            exif_ifd_offset = struct.unpack(endian + 'I', raw_value)[0]
+        elif tag_id in wanted:
+            if type_id not in (TIFF_TYPE_ASCII, TIFF_TYPE_UNDEFINED):
+                # 카메라/렌즈 태그의 문자열 이외 형식은 Pillow의 변환 규칙을 따르도록 대체 처리
+                if tag_id in CAMERA_LENS_TAGS:
+                    raise ExifParseError(f"unexpected type {type_id} for tag {tag_id:#06x}")
+                # 그 밖의 태그는 숫자 형식만 변환하고 나머지는 없는 것으로 처리
+                if type_id not in TIFF_TYPE_SIZES:
+                    continue
+            byte_count = count * TIFF_TYPE_SIZES[type_id]
+            if byte_count <= 4:
+                data = raw_value[:byte_count]
+            else:
+                value_offsets.append((tag_id, type_id, byte_count, struct.unpack(endian + 'I', raw_value)[0]))
+                continue
+            found[wanted[tag_id]] = _decode_tiff_value(type_id, data, endian)
+
+    # 값은 IFD 항목을 다 읽은 다음 오프셋 순으로 읽어 seek를 최소화
+    for tag_id, type_id, byte_count, value_offset in sorted(value_offsets, key=lambda x: x[3]):
+        f.seek(tiff_start + value_offset)
+        data = f.read(byte_count)
+        if len(data) < byte_count:
+            raise ExifParseError("truncated tag value")
+        found[wanted[tag_id]] = _decode_tiff_value(type_id, data, endian)
+    return found, exif_ifd_offset
+
+def _decode_tiff_value(type_id, data, endian):
+    """ Pillow(TiffImagePlugin)와 같은 규칙으로 태그 값을 변환합니다.
+    숫자는 값이 하나면 그 값, 여러 개면 튜플 (RATIONAL/SRATIONAL은 float, 분모가 0이면 nan) """
+    if type_id == TIFF_TYPE_ASCII:
+        if data.endswith(b"\0"):
+            data = data[:-1]
+        return data.decode("latin-1", "replace")
+    if type_id == TIFF_TYPE_SHORT:
+        values = struct.unpack(f"{endian}{len(data) // 2}H", data)
+    elif type_id == TIFF_TYPE_LONG:
+        values = struct.unpack(f"{endian}{len(data) // 4}I", data)
+    elif type_id in (TIFF_TYPE_RATIONAL, TIFF_TYPE_SRATIONAL):
+        pairs = struct.unpack(f"{endian}{len(data) // 4}{'I' if type_id == TIFF_TYPE_RATIONAL else 'i'}", data)
+        values = tuple(numerator / denominator if denominator else float('nan')
+                       for numerator, denominator in zip(pairs[::2], pairs[1::2]))
+    elif type_id == TIFF_TYPE_DOUBLE:
+        values = struct.unpack(f"{endian}{len(data) // 8}d", data)
+    else:
+        return data
+    return values[0] if len(values) == 1 else values
+
+def _seek_exif_tiff(f):
+    """ JPEG 마커를 따라가 APP1(Exif) 세그먼트의 TIFF 헤더를 찾습니다.
+    (TIFF 시작 위치, 바이트 순서, IFD0 오프셋)을 반환하고 EXIF가 없으면 None을 반환합니다. """
+    if f.read(2) != b'\xff\xd8':
+        raise ExifParseError("not a JPEG file")
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ExifParseError("invalid JPEG marker")
+        marker_type = marker[1]
+        while marker_type == 0xFF:  # 채움 바이트
+            next_byte = f.read(1)
+            if not next_byte:
+                raise ExifParseError("truncated JPEG marker")
+            marker_type = next_byte[0]
+        if marker_type in (0xD9, 0xDA):
+            # 이미지 데이터(SOS) 전까지 Exif 세그먼트가 없음
+            return None
+        if 0xD0 <= marker_type <= 0xD7 or marker_type == 0x01:
+            continue  # 길이 필드가 없는 마커
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            raise ExifParseError("truncated JPEG segment")
+        segment_length = struct.unpack('>H', length_bytes)[0]
+        if segment_length < 2:
+            raise ExifParseError("invalid JPEG segment length")
+        # 서명을 읽은 경우에만 그만큼 덜 건너뜀 (14바이트보다 짧은 APP1은 서명을 읽지 않음)
+        signature_length = 0
+        if marker_type == 0xE1 and segment_length >= 14:
+            signature = f.read(6)
+            if signature == b'Exif\x00\x00':
+                break
+            signature_length = len(signature)  # XMP 등 다른 APP1 세그먼트
+        f.seek(segment_length - 2 - signature_length, os.SEEK_CUR)
+
+    return _read_tiff_header(f, f.tell())
+
+def _read_tiff_header(f, tiff_start):
+    """ tiff_start 위치의 TIFF 헤더를 읽어 (TIFF 시작 위치, 바이트 순서, IFD0 오프셋)을 반환합니다. """
+    f.seek(tiff_start)
+    header = f.read(8)
+    if header[:2] == b'II':
+        endian = '<'
+    elif header[:2] == b'MM':
+        endian = '>'
+    else:
+        raise ExifParseError("invalid TIFF byte order")
+    magic, ifd0_offset = struct.unpack(endian + 'HI', header[2:8])
+    if magic != 42:
+        raise ExifParseError("invalid TIFF header")
+    return tiff_start, endian, ifd0_offset
+
+def _read_located_tags(f, tiff_headers, wanted):
+    """ TIFF 구조들에서 IFD0과 Exif IFD를 따라가 원하는 태그를 읽습니다. (뒤쪽 값이 우선) """
+    exif = {}
+    for tiff_start, endian, ifd0_offset in tiff_headers:
+        values, exif_ifd_offset = _read_tiff_ifd(f, tiff_start, endian, ifd0_offset, wanted)
+        exif.update(values)
+        if exif_ifd_offset:
+            exif_ifd_values, _ = _read_tiff_ifd(f, tiff_start, endian, exif_ifd_offset, wanted)
+            exif.update(exif_ifd_values)
+    return exif
+
+def read_jpeg_exif_tags(filepath, wanted=CAMERA_LENS_TAGS):
+    """ JPEG의 APP1(Exif) 세그먼트에서 IFD0과 Exif IFD만 따라가 원하는 태그를 읽습니다.
+    이미지 데이터나 썸네일은 읽지 않습니다. EXIF가 없으면 빈 dict를 반환하고,
+    형식을 해석할 수 없으면 ExifParseError를 발생시킵니다. """
+    started = time.perf_counter()
+    with open(filepath, 'rb') as f:
+        metrics.observe("exif.open", time.perf_counter() - started)
+        try:
+            located = _seek_exif_tiff(f)
+            return _read_located_tags(f, [located] if located else [], wanted)
+        finally:
+            # 값은 오프셋 순으로 읽으므로 마지막 위치가 해석한 헤더 크기
+            metrics.count("exif.bytes", f.tell())
+
+def _locate_tiff_raw(f):
+    """ TIFF 기반 RAW(CR2, NEF, ARW, DNG)는 파일 처음이 TIFF 헤더 """
+    return [_read_tiff_header(f, 0)]
+
+def _locate_raf(f):
+    """ RAF 헤더가 가리키는 내장 JPEG의 Exif (RAF 자체의 CFA 헤더에는 렌즈 정보가 없음) """
+    header = f.read(RAF_JPEG_OFFSET_POSITION + 4)
+    if not header.startswith(RAF_MAGIC) or len(header) < RAF_JPEG_OFFSET_POSITION + 4:
+        raise ExifParseError("not a RAF file")
+    jpeg_offset = struct.unpack('>I', header[RAF_JPEG_OFFSET_POSITION:])[0]
+    f.seek(jpeg_offset)
+    located = _seek_exif_tiff(f)
+    return [located] if located else []
+
+def _iter_boxes(f, start, end):
+    """ ISO-BMFF 상자를 (종류, 내용 시작 위치, 끝 위치)로 차례로 돌려줍니다. (end가 None이면 파일 끝까지)
+    내용은 읽지 않고 상자 머리만 읽으므로 mdat처럼 큰 상자도 건너뛰기만 합니다. """
+    offset = start
+    while end is None or offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            if end is None and not header:
+                return
+            raise ExifParseError("truncated box header")
+        box_size, box_type = struct.unpack('>I4s', header)
+        content_start = offset + 8
+        if box_size == 1:
+            large_size = f.read(8)
+            if len(large_size) < 8:
+                raise ExifParseError("truncated box header")
+            box_size = struct.unpack('>Q', large_size)[0]
+            content_start += 8
+        elif box_size == 0:
+            # 파일(상위 상자) 끝까지 이어지는 마지막 상자
+            yield box_type, content_start, end
+            return
+        if box_size < content_start - offset:
+            raise ExifParseError("invalid box size")
+        yield box_type, content_start, offset + box_size
+        offset += box_size
+
+def _find_box(f, start, end, box_type):
+    """ 같은 단계에서 box_type 상자의 (내용 시작, 끝)을 찾습니다. 없으면 None """
+    for found_type, content_start, box_end in _iter_boxes(f, start, end):
+        if found_type == box_type:
+            return content_start, box_end
+    return None
+
+def _read_box_content(f, start, end, max_size=1 << 20):
+    """ 작은 상자(iinf, iloc 등)의 내용을 한 번에 읽습니다. """
+    if end is None or end - start > max_size:
+        raise ExifParseError("box too large")
+    f.seek(start)
+    data = f.read(end - start)
+    if len(data) < end - start:
+        raise ExifParseError("truncated box")
+    return data
+
+def _locate_bmff(f):
+    """ CR3는 moov 안의 Canon uuid 상자에 든 CMT1/CMT2, HEIC는 meta 상자가 가리키는 Exif 항목 """
+    if f.read(8)[4:] != b'ftyp':
+        raise ExifParseError("not an ISO-BMFF file")
+    for box_type, content_start, box_end in _iter_boxes(f, 0, None):
+        if box_type == b'moov':
+            return _locate_cr3_boxes(f, content_start, box_end)
+        if box_type == b'meta':
+            # meta는 FullBox (버전 1바이트 + 플래그 3바이트)
+            return _locate_heif_exif(f, content_start + 4, box_end)
+    return []
+
+def _locate_cr3_boxes(f, start, end):
+    for box_type, content_start, box_end in _iter_boxes(f, start, end):
+        if box_type != b'uuid':
+            continue
+        f.seek(content_start)
+        if f.read(16) != CANON_CR3_UUID:
+            continue
+        return [_read_tiff_header(f, child_start)
+                for child_type, child_start, _ in _iter_boxes(f, content_start + 16, box_end)
+                if child_type in CR3_TIFF_BOXES]
+    return []
+
+def _locate_heif_exif(f, start, end):
+    iinf = _find_box(f, start, end, b'iinf')
+    iloc = _find_box(f, start, end, b'iloc')
+    if iinf is None or iloc is None:
+        return []
+    exif_item_id = _find_exif_item_id(f, *iinf)
+    if exif_item_id is None:
+        return []
+    item_offset = _find_item_offset(_read_box_content(f, *iloc), exif_item_id)
+    # Exif 항목은 TIFF 헤더까지의 거리(4바이트) 뒤에 "Exif\0\0"과 TIFF 구조가 옴
+    f.seek(item_offset)
+    header_offset = f.read(4)
+    if len(header_offset) < 4:
+        raise ExifParseError("truncated Exif item")
+    return [_read_tiff_header(f, item_offset + 4 + struct.unpack('>I', header_offset)[0])]
+
+def _find_exif_item_id(f, start, end):
+    """ iinf 상자의 항목 정보(infe)에서 종류가 Exif인 항목 번호를 찾습니다. """
+    f.seek(start)
+    version = f.read(1)
+    if not version:
+        raise ExifParseError("truncated iinf box")
+    # FullBox 머리 4바이트 + 항목 수 (버전 0이면 2바이트, 아니면 4바이트)
+    entries_start = start + 4 + (2 if version[0] == 0 else 4)
+    for box_type, content_start, box_end in _iter_boxes(f, entries_start, end):
+        if box_type != b'infe':
+            continue
+        f.seek(content_start)
+        entry = f.read(14)
+        if len(entry) < 12:
+            raise ExifParseError("truncated infe box")
+        # 버전 2 이상만 항목 종류가 있음 (버전 2: 번호 2바이트, 3: 4바이트)
+        if entry[0] == 2:
+            item_id, _, item_type = struct.unpack('>HH4s', entry[4:12])
+        elif entry[0] == 3 and len(entry) == 14:
+            item_id, _, item_type = struct.unpack('>IH4s', entry[4:14])
+        else:
+            continue
+        if item_type == b'Exif':
+            return item_id
+    return None
+
+def _find_item_offset(data, wanted_item_id):
+    """ iloc 상자 내용에서 항목의 파일 내 위치(첫 구간)를 찾습니다. """
+    position = 4
+
+    def read_uint(size):
+        nonlocal position
+        if position + size > len(data):
+            raise ExifParseError("truncated iloc box")
+        value = int.from_bytes(data[position:position + size], 'big')
+        position += size
+        return value
+
+    version = data[0] if data else 0
+    sizes = read_uint(2)
+    offset_size, length_size = sizes >> 12, (sizes >> 8) & 0xF
+    base_offset_size, index_size = (sizes >> 4) & 0xF, (sizes & 0xF if version in (1, 2) else 0)
+    item_count = read_uint(2 if version < 2 else 4)
+    for _ in range(item_count):
+        item_id = read_uint(2 if version < 2 else 4)
+        construction_method = read_uint(2) & 0xF if version in (1, 2) else 0
+        read_uint(2)  # data_reference_index
+        base_offset = read_uint(base_offset_size)
+        extents = []
+        for _ in range(read_uint(2)):
+            read_uint(index_size)
+            extents.append(read_uint(offset_size))
+            read_uint(length_size)
+        if item_id == wanted_item_id:
+            # 파일 안의 위치로 저장된 경우만 지원 (idat 상자 안에 둔 경우 등은 EXIF 없음으로 처리)
+            if construction_method != 0 or not extents:
+                raise ExifParseError("unsupported Exif item location")
+            return base_offset + extents[0]
+    raise ExifParseError("Exif item has no location")
+
+# 확장자별 TIFF 구조 찾기 함수 (없는 확장자는 JPEG)
+TIFF_LOCATORS = {}
+TIFF_LOCATORS.update(dict.fromkeys(TIFF_RAW_SUFFIXES, _locate_tiff_raw))
+TIFF_LOCATORS.update(dict.fromkeys(BMFF_SUFFIXES, _locate_bmff))
+TIFF_LOCATORS.update(dict.fromkeys(RAF_SUFFIXES, _locate_raf))
+
+def read_exif_tags(filepath, wanted=CAMERA_LENS_TAGS):
+    """ 확장자에 맞는 헤더 전용 리더로 원하는 태그를 읽습니다. JPEG는 read_jpeg_exif_tags와 같고,
+    RAW/HEIC는 TIFF 헤더, ISO-BMFF 상자, RAF 헤더를 따라가 태그가 있는 몇 KB만 읽습니다. """
+    locate = TIFF_LOCATORS.get(os.path.splitext(filepath)[1].lower())
+    if locate is None:
+        return read_jpeg_exif_tags(filepath, wanted)
+    started = time.perf_counter()
+    with open(filepath, 'rb') as f:
+        metrics.observe("exif.open", time.perf_counter() - started)
+        return _read_located_tags(f, locate(f), wanted)
+
+def _read_ifd_offsets(f, tiff_start, endian, ifd_offset):
+    """ IFD의 정수형(SHORT/LONG) 태그 값과 다음 IFD 오프셋을 읽습니다. """
+    f.seek(tiff_start + ifd_offset)
+    count_bytes = f.read(2)
+    if len(count_bytes) < 2:
+        raise ExifParseError("truncated IFD")
+    entry_count = struct.unpack(endian + 'H', count_bytes)[0]
+    entries = f.read(entry_count * 12 + 4)
+    if len(entries) < entry_count * 12 + 4:
+        raise ExifParseError("truncated IFD entries")
+    values = {}
+    for i in range(entry_count):
+        tag_id, type_id, count, raw_value = struct.unpack(endian + 'HHI4s', entries[i * 12:(i + 1) * 12])
+        if type_id == TIFF_TYPE_SHORT:
+            values[tag_id] = struct.unpack(endian + 'H', raw_value[:2])[0]
+        elif type_id == TIFF_TYPE_LONG:
+            values[tag_id] = struct.unpack(endian + 'I', raw_value)[0]
+    next_ifd_offset = struct.unpack(endian + 'I', entries[entry_count * 12:])[0]
+    return values, next_ifd_offset
+
+def read_jpeg_exif_thumbnail(filepath):
+    """ EXIF IFD1에 들어 있는 JPEG 썸네일(보통 160x120)의 바이트를 읽습니다.
+    썸네일이 없으면 None을 반환하고, 형식을 해석할 수 없으면 ExifParseError를 발생시킵니다. """
+    with open(filepath, 'rb') as f:
+        located = _seek_exif_tiff(f)
+        if located is None:
+            return None
+        tiff_start, endian, ifd0_offset = located
+        _, ifd1_offset = _read_ifd_offsets(f, tiff_start, endian, ifd0_offset)
+        if not ifd1_offset:
+            return None
+        ifd1_values, _ = _read_ifd_offsets(f, tiff_start, endian, ifd1_offset)
+        thumbnail_offset = ifd1_values.get(JPEG_THUMBNAIL_OFFSET_TAG)
+        thumbnail_length = ifd1_values.get(JPEG_THUMBNAIL_LENGTH_TAG)
+        if not thumbnail_offset or not thumbnail_length:
+            return None
+        f.seek(tiff_start + thumbnail_offset)
+        data = f.read(thumbnail_length)
+        if len(data) < thumbnail_length or not data.startswith(b'\xff\xd8'):
+            raise ExifParseError("invalid EXIF thumbnail")
+        return data
+
+def get_camera_lens_exif(filepath, wanted=CAMERA_LENS_TAGS):
+    """ 카메라/렌즈 분류용 EXIF 태그(와 wanted에 더한 태그)를 읽습니다. 헤더 전용 리더로 먼저 시도하고,
+    해석할 수 없는 JPEG는 Pillow 기반 get_exif_data로 대체합니다. (RAW/HEIC는 EXIF 없음으로 처리) """
+    try:
+        return read_exif_tags(filepath, wanted)
+    except (ExifParseError, struct.error) as e:
+        if filepath.lower().endswith(tuple(TIFF_LOCATORS)):
+            metrics.count(f"exif.errors.{type(e).__name__}")
+            print(f"Error reading EXIF for {filepath}: {e}")
+            return {}
+        metrics.count("exif.pillow_fallback")
+        return get_exif_data(filepath)
+
+def get_lens_info(exif_data):
+    """ EXIF 데이터에서 렌즈 모델 정보를 추출합니다. """
+    lens_model = exif_data.get('LensModel')
+    if lens_model:
+        # 간혹 바이트 문자열로 반환되는 경우 디코딩
+        if isinstance(lens_model, bytes):
+            try:
+                lens_model = lens_model.decode('utf-8', errors='replace').strip()
+            except UnicodeDecodeError:
+                lens_model = str(lens_model) # 디코딩 실패 시 문자열로 강제 변환
+        return str(lens_model).strip() # 공백 제거
+
+    lens_make = exif_data.get('LensMake')
+    # 다른 렌즈 관련 태그들을 조합하여 정보를 만들 수도 있습니다.
+    # 예: FocalLength, FNumber 등
+    # 여기서는 LensModel이 없으면 LensMake라도 반환하거나, 더 복잡한 로직을 추가할 수 있습니다.
+    if lens_make:
+        if isinstance(lens_make, bytes):
+            try:
+                lens_make = lens_make.decode('utf-8', errors='replace').strip()
+            except UnicodeDecodeError:
+                lens_make = str(lens_make)
+        return f"Make: {str(lens_make).strip()}"
+
+    return NO_LENS_INFO
+
+def get_camera_info(exif_data):
+    """ EXIF 데이터에서 카메라 모델 정보를 추출합니다. """
+    camera_model = exif_data.get('Model')
+    camera_make = exif_data.get('Make')
+    
+    if camera_model:
+        # 간혹 바이트 문자열로 반환되는 경우 디코딩
+        if isinstance(camera_model, bytes):
+            try:
+                camera_model = camera_model.decode('utf-8', errors='replace').strip()
+            except UnicodeDecodeError:
+                camera_model = str(camera_model)
+        
+        camera_model = str(camera_model).strip()
+        
+        # 제조사 정보가 있고 모델명에 제조사가 포함되지 않은 경우 조합
+        if camera_make:
+            if isinstance(camera_make, bytes):
+                try:
+                    camera_make = camera_make.decode('utf-8', errors='replace').strip()
+                except UnicodeDecodeError:
+                    camera_make = str(camera_make)
+            
+            camera_make = str(camera_make).strip()
+            
+            # 모델명에 제조사명이 이미 포함되어 있는지 확인
+            if camera_make.lower() not in camera_model.lower():
+                return f"{camera_make} {camera_model}"
+        
+        return camera_model
+    
+    # 모델 정보가 없으면 제조사라도 반환
+    if camera_make:
+        if isinstance(camera_make, bytes):
+            try:
+                camera_make = camera_make.decode('utf-8', errors='replace').strip()
+            except UnicodeDecodeError:
+                camera_make = str(camera_make)
+        return f"Make: {str(camera_make).strip()}"
+    
+    return NO_CAMERA_INFO
@@ -0,0 +1,116 @@
+"""
+그룹 기준 필드: EXIF 값을 그룹 이름(문자열)으로 바꾸는 규칙
+
+카메라/렌즈는 항상 분류하고, 나머지 필드는 스캔할 때 고른 것만 읽어 PhotoLibrary의 열로 저장합니다.
+값을 읽을 수 없으면 UNKNOWN_VALUE 그룹에 넣습니다.
+"""
+
+import re
+from functools import lru_cache
+
+from .exif import get_camera_info, get_lens_info, CAMERA_LENS_TAGS, EXTENDED_TAGS
+
+UNKNOWN_VALUE = "Unknown"
+# 초점 거리 구간 상한 (mm), 마지막 구간은 그보다 긴 초점 거리
+FOCAL_LENGTH_BUCKETS = (16, 24, 35, 50, 85, 135, 200, 300, 400, 600)
+# EXIF 날짜 "YYYY:MM:DD HH:MM:SS"
+EXIF_DATE_PATTERN = re.compile(r'(\d{4}):(\d{2}):(\d{2})')
+
+def _text(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='replace')
+    return str(value).strip().strip('\0') if value is not None else ""
+
+def _number(value):
+    """ 숫자 태그 값 (Pillow의 IFDRational, 여러 값이면 첫 값) -> float, 없거나 0 이하면 None """
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    try:
+        number = float(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return number if number > 0 else None  # nan도 제외
+
+def _date_parts(exif_data):
+    match = EXIF_DATE_PATTERN.match(_text(exif_data.get('DateTimeOriginal')))
+    if not match or match.group(1) == "0000":
+        return None
+    return match.groups()
+
+def get_year(exif_data):
+    date_parts = _date_parts(exif_data)
+    return date_parts[0] if date_parts else UNKNOWN_VALUE
+
+def get_month(exif_data):
+    date_parts = _date_parts(exif_data)
+    return f"{date_parts[0]}-{date_parts[1]}" if date_parts else UNKNOWN_VALUE
+
+def get_date(exif_data):
+    date_parts = _date_parts(exif_data)
+    return "-".join(date_parts) if date_parts else UNKNOWN_VALUE
+
+def get_focal_length_bucket(exif_data):
+    """ 초점 거리 구간 ("≤16 mm", "17-24 mm", ..., ">600 mm") """
+    focal_length = _number(exif_data.get('FocalLength'))
+    if focal_length is None:
+        return UNKNOWN_VALUE
+    focal_length = round(focal_length)
+    lower = 0
+    for upper in FOCAL_LENGTH_BUCKETS:
+        if focal_length <= upper:
+            return f"≤{upper} mm" if lower == 0 else f"{lower + 1}-{upper} mm"
+        lower = upper
+    return f">{FOCAL_LENGTH_BUCKETS[-1]} mm"
+
+def get_aperture(exif_data):
+    f_number = _number(exif_data.get('FNumber'))
+    return f"f/{f_number:.1f}".replace(".0", "") if f_number is not None else UNKNOWN_VALUE
+
+def get_iso(exif_data):
+    iso = _number(exif_data.get('ISOSpeedRatings'))
+    return f"ISO {iso:.0f}" if iso is not None else UNKNOWN_VALUE
+
+def get_body_serial(exif_data):
+    return _text(exif_data.get('BodySerialNumber')) or UNKNOWN_VALUE
+
+# 필드 이름 -> (표시 이름, 필요한 EXIF 태그 이름, EXIF dict -> 그룹 이름)
+GROUP_FIELDS = {
+    'camera': ("Camera", ('Make', 'Model'), get_camera_info),
+    'lens': ("Lens", ('LensMake', 'LensModel'), get_lens_info),
+    'year': ("Year", ('DateTimeOriginal',), get_year),
+    'month': ("Month", ('DateTimeOriginal',), get_month),
+    'date': ("Date", ('DateTimeOriginal',), get_date),
+    'focal_length': ("Focal length", ('FocalLength',), get_focal_length_bucket),
+    'aperture': ("Aperture", ('FNumber',), get_aperture),
+    'iso': ("ISO", ('ISOSpeedRatings',), get_iso),
+    'serial': ("Body serial", ('BodySerialNumber',), get_body_serial),
+}
+# 카메라/렌즈 외에 스캔 때 골라서 읽는 필드
+EXTRA_FIELDS = tuple(field for field in GROUP_FIELDS if field not in ('camera', 'lens'))
+_TAG_IDS = {tag_name: tag_id for tag_id, tag_name in {**CAMERA_LENS_TAGS, **EXTENDED_TAGS}.items()}
+
+def check_fields(fields):
+    """ 알 수 없는 필드 이름이 있으면 ValueError """
+    unknown = [field for field in fields if field not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown group field(s): {', '.join(unknown)} "
+                         f"(available: {', '.join(GROUP_FIELDS)})")
+
+@lru_cache(maxsize=None)
+def get_wanted_tags(extra_fields):
+    """ 카메라/렌즈와 extra_fields(튜플)를 계산하는 데 필요한 태그 {태그 번호: 이름}
+    파일마다 불리므로 결과를 캐시합니다. 반환한 dict는 고치지 마세요. """
+    wanted = dict(CAMERA_LENS_TAGS)
+    for field in extra_fields:
+        for tag_name in GROUP_FIELDS[field][1]:
+            wanted[_TAG_IDS[tag_name]] = tag_name
+    return wanted
+
+def get_field_values(exif_data, extra_fields):
+    """ extra_fields 순서대로 그룹 이름 튜플 """
+    return tuple(GROUP_FIELDS[field][2](exif_data) for field in extra_fields)
+
+def natural_sort_key(text):
+    """ 숫자 부분은 숫자로 비교하는 정렬 키 ("f/2.8" < "f/11", "≤16 mm" < "17-24 mm" < ">600 mm") """
+    text = text.lstrip("≤<>")
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part.lower()) for part in re.split(r'(\d+)', text)]
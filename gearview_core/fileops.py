@@ -0,0 +1,360 @@
+"""
+파일 복사/이동/링크: 대상 폴더 구조(카메라 > 렌즈) 생성과 파일명 충돌 처리
+여러 작업자가 병렬로 처리하며, 같은 장치(디스크)에 동시에 접근하는 작업 수는 따로 제한합니다.
+"""
+
+import errno
+import os
+import re # 파일명으로 부적합한 문자 제거용
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .metrics import metrics
+
+DEFAULT_FILE_WORKERS = 8
+MAX_FILE_WORKERS = 32
+# 장치 하나에 동시에 읽는(원본) / 쓰는(대상) 작업 수 (HDD에서 탐색 경합 방지), 원본과 대상은 따로 제한
+DEFAULT_DEVICE_WORKERS = 4
+MAX_DEVICE_WORKERS = MAX_FILE_WORKERS
+# 대상 폴더의 파일명 충돌을 대소문자 구분 없이 판단할지 (Windows NTFS, macOS APFS 기본값)
+CASE_INSENSITIVE_NAMES = sys.platform in ('win32', 'darwin')
+# linux/fs.h의 FICLONE = _IOW(0x94, 9, int): 데이터 블록을 공유하는 복사본(reflink) 생성 (btrfs, XFS 등)
+FICLONE = 0x40049409
+# 커널 복사 중 이 오류가 나면 지원하지 않는 것으로 보고 다음 방법으로 넘어감
+UNSUPPORTED_COPY_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+                           errno.EBADF, errno.EPERM, errno.ENOTSUP}
+# 방법별로 지원하지 않는 것이 확인된 (원본 장치, 대상 장치) - 같은 장치 쌍에서 매번 실패하지 않도록
+_unsupported_copy_methods = {'clone': set(), 'copy_file_range': set(), 'sendfile': set()}
+
+def sanitize_foldername(name):
+    """ 파일명/폴더명으로 사용할 수 없는 문자를 제거하거나 대체합니다. """
+    # Windows에서 폴더명으로 사용할 수 없는 문자: < > : " / \ | ? *
+    # 그리고 NUL 문자 (보통 직접 입력되진 않음)
+    # 여기서는 간단히 언더스코어로 대체합니다.
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name)
+
+def get_target_folder(target_folder, camera_name, lens_name, organize_by_lens):
+    """ 카메라(와 렌즈) 이름으로 파일을 넣을 대상 폴더 경로를 만듭니다. """
+    camera_target_folder = os.path.join(target_folder, sanitize_foldername(camera_name))
+    if organize_by_lens:
+        # 렌즈별 폴더 나누기: 카메라 > 렌즈 2단계 폴더 구조
+        return os.path.join(camera_target_folder, sanitize_foldername(lens_name))
+    # 렌즈별 폴더 나누지 않기: 카메라 폴더에 모든 파일
+    return camera_target_folder
+
+def _name_key(filename):
+    """ 파일명 비교용 키 (Windows/macOS 기본 파일 시스템은 대소문자를 구분하지 않음) """
+    return filename.lower() if CASE_INSENSITIVE_NAMES else filename
+
+class DestinationIndex:
+    """ 대상 폴더마다 목록을 한 번만 읽어 두고, 메모리의 파일명 색인으로 겹치지 않는 이름을 고릅니다.
+    (같은 이름 파일이 많아도 os.path.exists를 반복하지 않음) 폴더도 처음 쓸 때 한 번만 만듭니다.
+    find_linked=True이면 기존 파일의 (장치, inode)도 색인해 이미 링크된 원본을 찾습니다.
+    여러 작업자 스레드가 함께 씁니다. """
+
+    def __init__(self, find_linked=False):
+        self.find_linked = find_linked
+        # 폴더 경로 -> {'names': 파일명 키 집합, 'counters': 다음 (n) 번호, 'files': (장치, inode) -> 경로, 'device': st_dev}
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    def folders(self):
+        with self._lock:
+            return list(self._folders)
+
+    def _load_folder(self, folder):
+        state = self._folders.get(folder)
+        if state is not None:
+            return state
+        os.makedirs(folder, exist_ok=True)
+        names = set()
+        files = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                names.add(_name_key(entry.name))
+                if self.find_linked:
+                    try:
+                        entry_stat = entry.stat()  # 심볼릭 링크는 원본 기준
+                    except OSError:
+                        continue  # 깨진 심볼릭 링크
+                    files.setdefault((entry_stat.st_dev, entry_stat.st_ino), entry.path)
+        state = {'names': names, 'counters': {}, 'files': files, 'device': os.stat(folder).st_dev}
+        self._folders[folder] = state
+        return state
+
+    def reserve(self, folder, filename, source_stat=None):
+        """ folder 안에서 filename으로 쓸 경로를 골라 예약합니다. 이미 있으면 (1), (2)...를 붙입니다.
+        (경로, 대상 폴더 장치, 이미 원본을 가리키는 파일인지)를 반환합니다. """
+        with self._lock:
+            state = self._load_folder(folder)
+            if source_stat is not None and self.find_linked:
+                file_id = (source_stat.st_dev, source_stat.st_ino)
+                existing_path = state['files'].get(file_id)
+                if existing_path is not None:
+                    return existing_path, state['device'], True
+            names = state['names']
+            key = _name_key(filename)
+            if key in names:
+                # 같은 이름이 여러 번 나오면 지난번 번호부터 이어서 찾음
+                base, ext = os.path.splitext(filename)
+                counter = state['counters'].get(key, 1)
+                while _name_key(f"{base}({counter}){ext}") in names:
+                    counter += 1
+                state['counters'][key] = counter + 1
+                filename = f"{base}({counter}){ext}"
+                key = _name_key(filename)
+            names.add(key)
+            destination_path = os.path.join(folder, filename)
+            if source_stat is not None and self.find_linked:
+                state['files'][file_id] = destination_path
+            return destination_path, state['device'], False
+
+def remove_broken_links(folders):
+    """ 폴더 안의 깨진 심볼릭 링크(원본이 삭제/이동된 링크)를 지웁니다. 지운 수를 반환합니다.
+    하드 링크는 원본이 사라지면 마지막 사본이 되므로 지우지 않습니다. """
+    removed_count = 0
+    for folder in folders:
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_symlink() and not os.path.exists(entry.path):
+                try:
+                    os.remove(entry.path)
+                    removed_count += 1
+                except OSError as e:
+                    print(f"Error removing broken link {entry.path}: {e}")
+    return removed_count
+
+# 커널 복사 함수는 복사한 바이트 수를 반환 (size보다 적으면 copy_file_fast가 다음 방법으로 다시 복사)
+def _clone_file(source_fd, destination_fd, size):
+    """ FICLONE으로 데이터를 복사하지 않고 블록을 공유합니다. """
+    fcntl.ioctl(destination_fd, FICLONE, source_fd)
+    return size
+
+def _copy_file_range_all(source_fd, destination_fd, size):
+    """ copy_file_range로 커널 안에서 복사합니다 (파일 시스템에 따라 reflink/서버 측 복사). """
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(source_fd, destination_fd, size - offset)
+        if copied == 0:
+            break  # 일부 파일 시스템은 지원하지 않을 때 오류 대신 0을 반환
+        offset += copied
+    return offset
+
+def _sendfile_all(source_fd, destination_fd, size):
+    """ sendfile로 사용자 공간 버퍼 없이 복사합니다. """
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(destination_fd, source_fd, offset, min(size - offset, 1 << 30))
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+def _kernel_copy_methods():
+    methods = []
+    if fcntl is not None:
+        methods.append(('clone', _clone_file))
+    if hasattr(os, 'copy_file_range'):
+        methods.append(('copy_file_range', _copy_file_range_all))
+    if hasattr(os, 'sendfile'):
+        methods.append(('sendfile', _sendfile_all))
+    return methods
+
+def copy_file_fast(source_path, destination_path):
+    """ shutil.copy2처럼 내용과 메타데이터(수정 시각, 권한)를 복사합니다.
+    리눅스에서는 reflink(FICLONE) -> copy_file_range -> sendfile 순으로 커널 안에서 복사하고
+    모두 지원하지 않으면 일반 복사를 합니다. 다른 OS는 shutil.copy2를 그대로 씁니다
+    (macOS는 fcopyfile, Windows는 CopyFile 경로를 shutil이 이미 사용). """
+    if not sys.platform.startswith('linux'):
+        shutil.copy2(source_path, destination_path)
+        return
+    with open(source_path, 'rb') as source_file, open(destination_path, 'wb') as destination_file:
+        source_fd = source_file.fileno()
+        destination_fd = destination_file.fileno()
+        source_stat = os.fstat(source_fd)
+        device_pair = (source_stat.st_dev, os.fstat(destination_fd).st_dev)
+        for method_name, copy_method in _kernel_copy_methods():
+            if device_pair in _unsupported_copy_methods[method_name]:
+                continue
+            try:
+                if copy_method(source_fd, destination_fd, source_stat.st_size) >= source_stat.st_size:
+                    break
+                # 끝까지 복사하지 못함 (파일마다 다를 수 있으므로 장치 쌍은 기록하지 않음)
+                metrics.count(f"files.short_copy.{method_name}")
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_COPY_ERRNOS:
+                    raise
+                _unsupported_copy_methods[method_name].add(device_pair)
+            # 일부만 복사된 상태일 수 있으므로 처음부터 다시 (copy_file_range는 원본 위치도 옮김)
+            os.ftruncate(destination_fd, 0)
+            os.lseek(destination_fd, 0, os.SEEK_SET)
+            os.lseek(source_fd, 0, os.SEEK_SET)
+        else:
+            shutil.copyfileobj(source_file, destination_file)
+            destination_file.flush()
+            # 복사 중에 원본이 줄어든 경우 등 - 잘린 파일을 성공으로 처리하면 이동 시 원본이 지워짐
+            copied_size = os.fstat(destination_fd).st_size
+            if copied_size < source_stat.st_size:
+                raise OSError(errno.EIO, f"Copied only {copied_size} of {source_stat.st_size} bytes", source_path)
+    shutil.copystat(source_path, destination_path)
+
+def _remove_partial_copy(destination_path):
+    """ 실패한 복사/이동이 남긴 대상 파일을 지웁니다. (다음 실행에서 잘린 파일이 이름을 차지하지 않도록) """
+    try:
+        os.remove(destination_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error removing incomplete copy {destination_path}: {e}")
+
+def transfer_file(action, source_path, destination_path, same_device=None):
+    """ 파일 하나를 복사, 이동하거나 링크합니다.
+    same_device: 원본과 대상 폴더가 같은 파일 시스템인지 (None이면 직접 확인) """
+    if action not in ("move", "copy", "link"):
+        raise ValueError(f"Unknown action: {action}")
+    if same_device is None and action != "copy":
+        same_device = os.stat(source_path).st_dev == os.stat(os.path.dirname(destination_path)).st_dev
+    if action == "move":
+        if same_device:
+            # 같은 파일 시스템이면 이름만 바꿈 (데이터 복사 없음)
+            try:
+                os.rename(source_path, destination_path)
+                return
+            except OSError:
+                pass  # 권한, 바인드 마운트 등 - shutil.move가 복사 후 삭제로 처리
+        try:
+            shutil.move(source_path, destination_path, copy_function=copy_file_fast)
+        except BaseException:
+            # 복사 중에 실패했거나 원본을 지우지 못한 경우 - 원본은 그대로 두고 대상의 사본을 지움
+            _remove_partial_copy(destination_path)
+            raise
+    elif action == "copy":
+        try:
+            copy_file_fast(source_path, destination_path)
+        except BaseException:
+            _remove_partial_copy(destination_path)
+            raise
+    else:
+        # 같은 볼륨이면 하드 링크 (데이터 복사 없음), 다른 볼륨이거나 하드 링크를 못 만들면 심볼릭 링크
+        if same_device:
+            try:
+                os.link(source_path, destination_path)
+                return
+            except OSError:
+                pass  # FAT/exFAT 등 하드 링크 미지원
+        os.symlink(os.path.abspath(source_path), destination_path)
+
+class DeviceLimiter:
+    """ 장치(st_dev)별 동시 작업 수를 원본으로 읽는 쪽과 대상으로 쓰는 쪽으로 나눠 제한합니다.
+    (예: 느린 HDD에서 빠른 SSD로 복사할 때 원본은 적게, 대상은 많이) """
+
+    def __init__(self, source_limit, target_limit):
+        self.limits = {'source': source_limit, 'target': target_limit}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, source_device, target_device):
+        """ 원본 장치와 대상 장치에 자리를 하나씩 잡습니다. 교착을 피하려고 항상 같은 순서로 잡습니다. """
+        keys = sorted({('source', source_device), ('target', target_device)})
+        with self._lock:
+            semaphores = [self._semaphores.setdefault(key, threading.Semaphore(self.limits[key[0]]))
+                          for key in keys]
+        for semaphore in semaphores:
+            semaphore.acquire()
+        return semaphores
+
+    def release(self, semaphores):
+        for semaphore in reversed(semaphores):
+            semaphore.release()
+
+def run_file_jobs(action, jobs, target_folder, progress_callback=None, worker_count=1,
+                  source_device_workers=DEFAULT_DEVICE_WORKERS, target_device_workers=DEFAULT_DEVICE_WORKERS,
+                  cancel_event=None):
+    """ 파일 작업 목록을 worker_count개 작업자로 병렬 처리합니다.
+    action: "copy", "move" 또는 "link" (하드/심볼릭 링크로 같은 폴더 구조를 만들고, 이미 링크된 파일은
+    건너뛰며, 대상 폴더의 깨진 심볼릭 링크는 지움 - 다시 실행하면 증분 동기화)
+    jobs: [(원본 경로, 카메라 이름, 렌즈 이름, 렌즈별 폴더 여부), ...]
+    progress_callback(파일명, 끝난 수(실패 포함), 전체 수)는 파일마다 이 함수를 부른 스레드에서 호출됩니다.
+    source_device_workers/target_device_workers: 원본 장치마다 동시에 읽는 / 대상 장치마다 동시에 쓰는 파일 수
+    cancel_event(threading.Event)가 설정되면 진행 중인 파일만 마치고 나머지는 처리하지 않습니다.
+    (성공 수, 실패 수, 이동된 원본 경로 목록)을 반환합니다. """
+    action_verb = action
+    limiter = DeviceLimiter(max(1, source_device_workers), max(1, target_device_workers))
+    # 병렬로 처리해도 같은 대상 파일명을 두 번 고르지 않도록 폴더별 파일명 색인에서 예약
+    destinations = DestinationIndex(find_linked=(action == "link"))
+
+    def process_job(job):
+        source_path, camera_name_raw, lens_name_raw, organize_by_lens_flag = job
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        destination_path = None
+        try:
+            # 대상 폴더 구조 (렌즈별 폴더 나누기 옵션에 따라), 폴더는 색인이 처음 쓸 때 만듦
+            final_target_folder = get_target_folder(target_folder, camera_name_raw, lens_name_raw, organize_by_lens_flag)
+            source_stat = os.stat(source_path)
+            destination_path, target_device, already_linked = destinations.reserve(
+                final_target_folder, os.path.basename(source_path), source_stat)
+            if already_linked:
+                return True
+            slots = limiter.acquire(source_stat.st_dev, target_device)
+            started = time.perf_counter()
+            try:
+                transfer_file(action, source_path, destination_path, same_device=source_stat.st_dev == target_device)
+            finally:
+                limiter.release(slots)
+            metrics.observe(f"files.{action}.file", time.perf_counter() - started)
+            if action != "link":
+                metrics.count(f"files.{action}.bytes", source_stat.st_size)
+            return True
+        except Exception as e:
+            metrics.count(f"files.{action}.errors.{type(e).__name__}")
+            print(f"Error {action_verb}ing {source_path} to {destination_path}: {e}")
+            return False
+
+    results = {'processed': 0, 'errors': 0, 'finished': 0}
+    moved_paths = []
+
+    def record_result(future, job):
+        succeeded = future.result()
+        if succeeded is None:
+            return  # 취소되어 시작하지 않은 작업
+        results['finished'] += 1
+        if succeeded:
+            results['processed'] += 1
+            if action == "move":
+                moved_paths.append(job[0])
+        else:
+            results['errors'] += 1
+        if progress_callback is not None:
+            progress_callback(os.path.basename(job[0]), results['finished'], len(jobs))
+
+    run_started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, worker_count))
+    futures = {}
+    try:
+        futures = {executor.submit(process_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            record_result(future, futures.pop(future))
+            if cancel_event is not None and cancel_event.is_set():
+                break
+    finally:
+        # 취소 시 시작하지 않은 작업은 버리고 진행 중인 파일은 끝날 때까지 기다림
+        executor.shutdown(wait=True, cancel_futures=True)
+    # 취소 중에 끝난 파일도 결과에 반영 (이동된 파일 목록이 빠지지 않도록)
+    for future, job in futures.items():
+        if not future.cancelled():
+            record_result(future, job)
+    if action == "link" and not (cancel_event is not None and cancel_event.is_set()):
+        remove_broken_links(destinations.folders())
+    metrics.observe(f"files.{action}.run", time.perf_counter() - run_started)
+    return results['processed'], results['errors'], moved_paths
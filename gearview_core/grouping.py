@@ -0,0 +1,108 @@
+"""
+여러 단계 그룹 (예: 렌즈 > 초점 거리 > 연도)
+
+PhotoLibrary의 열(필드 번호 배열)을 파일을 다시 읽지 않고 원하는 순서로 묶습니다.
+행마다 파이썬 반복문을 돌지 않도록, 단계별 번호를 혼합 기수(mixed radix) 정수 하나로 합쳐
+(map/compress/Counter는 C 수준에서 반복) 가장 깊은 그룹의 개수를 한 번에 세고,
+상위 단계의 개수는 처음 필요할 때 그룹 수만큼만 반복해 합산합니다.
+"""
+
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import add, mul, floordiv, eq, is_not
+
+# array('q')에 담을 수 있는 그룹 번호 상한 (넘으면 list 사용)
+MAX_ARRAY_CODE = 2 ** 63
+
+class Grouping:
+    """ PhotoLibrary.group_by()의 결과. 만든 시점의 스냅숏이며 라이브러리가 바뀌면 다시 만들어야 합니다.
+    prefix는 상위 단계부터의 그룹 이름 튜플입니다. (빈 튜플은 전체) """
+
+    def __init__(self, keys, columns, row_names, row_path, row_mtimes):
+        """ columns: 단계별 (이름 목록, {이름: 번호}, 행별 번호 배열)
+        row_names: 행별 파일명 (제거된 행은 None), row_path: 행 번호 -> 경로 """
+        self.keys = tuple(keys)
+        self._names = [names for names, _, _ in columns]
+        self._ids = [ids for _, ids, _ in columns]
+        self._radices = [max(len(names), 1) for names in self._names]
+        self._row_path = row_path
+        self._row_mtimes = row_mtimes
+
+        # 행별 그룹 번호 = ((번호1 * 기수2 + 번호2) * 기수3 + 번호3) ...
+        code_limit = 1
+        for radix in self._radices:
+            code_limit *= radix
+        codes = columns[0][2]
+        for radix, (_, _, column) in zip(self._radices[1:], columns[1:]):
+            codes = map(add, map(mul, codes, repeat(radix)), column)
+        self._codes = array('q', codes) if code_limit <= MAX_ARRAY_CODE else list(codes)
+        self._alive = bytes(map(is_not, row_names, repeat(None)))
+
+        # 단계(prefix 길이)별 {그룹 번호: 파일 수}, 가장 깊은 단계만 바로 세고 나머지는 필요할 때 합산
+        self._level_counts = [None] * len(self.keys) + [Counter(compress(self._codes, self._alive))]
+        self._level_counts[0] = {0: sum(self._level_counts[-1].values())}
+        # 단계별 {상위 그룹 번호: [(하위 번호, 파일 수), ...]}
+        self._child_lists = [None] * len(self.keys)
+        self.total = self._level_counts[0][0]
+
+    def _suffix_product(self, depth):
+        """ depth 단계 그룹 번호 = 그룹 번호 // (depth 이후 단계 기수의 곱) """
+        product = 1
+        for radix in self._radices[depth:]:
+            product *= radix
+        return product
+
+    def _counts(self, depth):
+        counts = self._level_counts[depth]
+        if counts is None:
+            divisor = self._suffix_product(depth)
+            counts = Counter()
+            for code, count in self._level_counts[-1].items():
+                counts[code // divisor] += count
+            self._level_counts[depth] = counts
+        return counts
+
+    def _prefix_code(self, prefix):
+        """ 그룹 이름 튜플 -> 그룹 번호, 없는 이름이면 None """
+        code = 0
+        for depth, name in enumerate(prefix):
+            group_id = self._ids[depth].get(name)
+            if group_id is None:
+                return None
+            code = code * self._radices[depth] + group_id
+        return code
+
+    def children(self, prefix=(), by_count=False, sort_key=None):
+        """ prefix 바로 아래 그룹의 [(이름, 파일 수)], 파일 수 내림차순(by_count) 또는 이름순(sort_key) """
+        depth = len(prefix)
+        if depth >= len(self.keys):
+            return []
+        child_lists = self._child_lists[depth]
+        if child_lists is None:
+            child_lists = self._child_lists[depth] = {}
+            radix = self._radices[depth]
+            for code, count in self._counts(depth + 1).items():
+                parent_code, group_id = divmod(code, radix)
+                child_lists.setdefault(parent_code, []).append((group_id, count))
+        names = self._names[depth]
+        groups = [(names[group_id], count) for group_id, count in child_lists.get(self._prefix_code(prefix), ())]
+        if by_count:
+            groups.sort(key=lambda group: group[1], reverse=True)
+        else:
+            groups.sort(key=lambda group: (sort_key or str.lower)(group[0]))
+        return groups
+
+    def count(self, prefix=()):
+        return self._counts(len(prefix)).get(self._prefix_code(prefix), 0)
+
+    def files(self, prefix=()):
+        """ prefix 그룹의 파일을 수정 날짜 내림차순으로 반환합니다. """
+        prefix_code = self._prefix_code(prefix)
+        if not self.count(prefix):
+            return []
+        divisor = self._suffix_product(len(prefix))
+        matches = map(eq, map(floordiv, self._codes, repeat(divisor)), repeat(prefix_code))
+        rows = compress(range(len(self._codes)), map(mul, matches, self._alive))
+        rows = sorted(rows, key=self._row_mtimes.__getitem__, reverse=True)
+        return [self._row_path(row) for row in rows]
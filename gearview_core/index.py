@@ -0,0 +1,72 @@
+"""
+스캔 색인: 경로, 크기, 수정 시각별로 분류 결과를 SQLite에 저장해
+변경되지 않은 파일은 다시 스캔할 때 EXIF를 읽지 않습니다.
+"""
+
+import json
+import os
+import sqlite3
+
+from .paths import get_app_data_dir
+
+SCAN_INDEX_PATH = os.path.join(get_app_data_dir(), 'scan_index.sqlite3')
+# 분류 규칙(get_camera_info/get_lens_info)이나 테이블 구조가 바뀌면 올려서 기존 색인을 버림
+SCAN_INDEX_VERSION = 2
+
+def open_scan_index(index_path=None):
+    """ 스캔 색인 DB를 엽니다. 버전이 다르면 테이블을 새로 만듭니다. """
+    index_path = index_path or SCAN_INDEX_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCAN_INDEX_VERSION:
+        conn.execute("DROP TABLE IF EXISTS files")
+        # fields: 카메라/렌즈 외에 읽은 그룹 기준 필드 값 (JSON 객체, fields.py)
+        conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                     "mtime_ns INTEGER NOT NULL, camera TEXT NOT NULL, lens TEXT NOT NULL, "
+                     "fields TEXT NOT NULL DEFAULT '{}') WITHOUT ROWID")
+        conn.execute(f"PRAGMA user_version = {SCAN_INDEX_VERSION}")
+        conn.commit()
+    return conn
+
+def _folder_path_range(folder_path):
+    """ 폴더 아래 모든 경로를 포함하는 [하한, 상한) 문자열 범위 (기본 키 범위 검색용) """
+    prefix = os.path.join(folder_path, '')
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def load_scan_index(conn, folders):
+    """ 폴더 아래의 색인 항목을 {경로: (크기, 수정 시각, 카메라, 렌즈, {필드: 값})}로 읽어옵니다. """
+    entries = {}
+    names = {}  # 같은 카메라/렌즈 이름은 문자열 객체 하나를 공유
+    decoded_fields = {}  # 같은 필드 값 조합은 JSON을 한 번만 해석
+    for folder_path in folders:
+        low, high = _folder_path_range(folder_path)
+        rows = conn.execute("SELECT path, size, mtime_ns, camera, lens, fields FROM files "
+                            "WHERE path >= ? AND path < ?", (low, high))
+        for path, size, mtime_ns, camera, lens, fields_json in rows:
+            field_values = decoded_fields.get(fields_json)
+            if field_values is None:
+                field_values = decoded_fields[fields_json] = json.loads(fields_json)
+            entries[path] = (size, mtime_ns, names.setdefault(camera, camera), names.setdefault(lens, lens),
+                             field_values)
+    return entries
+
+def remove_from_scan_index(paths, index_path=None):
+    """ 이동 등으로 원본 위치에서 사라진 파일을 색인에서 삭제합니다. """
+    try:
+        conn = open_scan_index(index_path)
+        try:
+            update_scan_index(conn, [], paths)
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Failed to update scan index: {e}")
+
+def update_scan_index(conn, new_entries, removed_paths):
+    """ 새로 분석한 항목을 저장하고 디스크에서 사라진 항목을 삭제합니다.
+    new_entries: [(경로, 크기, 수정 시각, 카메라, 렌즈, {필드: 값}), ...] """
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO files (path, size, mtime_ns, camera, lens, fields) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         ((path, size, mtime_ns, camera, lens, json.dumps(field_values, ensure_ascii=False))
+                          for path, size, mtime_ns, camera, lens, field_values in new_entries))
+        conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in removed_paths))
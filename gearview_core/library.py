@@ -0,0 +1,393 @@
+"""
+스캔 결과 데이터 모델 (카메라 > 렌즈 > 파일)
+
+파일마다 객체를 만들지 않도록 열(column) 단위 배열에 저장합니다.
+  - 경로: 폴더 경로는 한 번만 저장하고(폴더 번호) 파일마다 (폴더 번호, 파일명)만 보관
+  - 카메라/렌즈: 이름마다 작은 정수 번호
+  - 크기/수정 시각: array('q')
+  - 추가 필드(연도, 초점 거리 등, fields.py): 필드마다 값 번호 열
+그룹(카메라 > 렌즈)은 행 번호 배열이고, 개수는 배열 길이와 카메라별 합계로 미리 계산되어 있습니다.
+다른 단계 조합은 group_by()가 열에서 바로 계산합니다. (grouping.py)
+필터(filter())는 그룹, 날짜별 행 목록, 파일명 trigram 역색인으로 맞는 행만 찾습니다. (search.py)
+"""
+
+import os
+from array import array
+from itertools import compress, repeat
+from operator import contains
+
+from .fields import check_fields, UNKNOWN_VALUE
+from .grouping import Grouping
+from .search import SubstringIndex, check_date_bound, date_in_range
+
+# 필터에 맞는 행이 전체의 1/이 값보다 적으면 그룹 배열을 훑지 않고 맞는 행만 나눔
+FILTER_SCAN_RATIO = 8
+
+class _CameraLensGroups:
+    """ 카메라 > 렌즈 그룹 조회 (PhotoLibrary와 필터 결과 LibraryView가 함께 씀)
+    _groups, _camera_totals, 카메라/렌즈 이름 <-> 번호 표, _row_path, _row_mtimes가 있어야 합니다. """
+
+    def cameras(self):
+        """ 파일이 있는 카메라 이름 (처음 나온 순서) """
+        return [self._camera_names[camera_id] for camera_id in self._groups]
+
+    def lenses(self, camera_info):
+        """ 카메라의 렌즈 그룹 이름 (처음 나온 순서) """
+        camera_id = self._camera_ids.get(camera_info)
+        return [self._lens_names[lens_id] for lens_id in self._groups.get(camera_id, ())]
+
+    def has_group(self, camera_info, lens_info=None):
+        camera_id = self._camera_ids.get(camera_info)
+        if camera_id not in self._groups:
+            return False
+        return lens_info is None or self._lens_ids.get(lens_info) in self._groups[camera_id]
+
+    def _group_rows(self, camera_info, lens_info=None):
+        lenses = self._groups.get(self._camera_ids.get(camera_info), {})
+        if lens_info is None:
+            return [row for rows in lenses.values() for row in rows]
+        return lenses.get(self._lens_ids.get(lens_info), ())
+
+    def get_group_files(self, camera_info, lens_info=None):
+        """ 카메라 그룹(lens_info가 None) 또는 렌즈 그룹의 파일 목록을 반환합니다. """
+        return [self._row_path(row) for row in self._group_rows(camera_info, lens_info)]
+
+    def camera_file_count(self, camera_info):
+        return self._camera_totals.get(self._camera_ids.get(camera_info), 0)
+
+    def lens_file_count(self, camera_info, lens_info):
+        return len(self._group_rows(camera_info, lens_info))
+
+    def camera_lens_count(self, camera_info):
+        return len(self._groups.get(self._camera_ids.get(camera_info), ()))
+
+    def lens_group_count(self):
+        return sum(len(lenses) for lenses in self._groups.values())
+
+    def sort_cameras(self, by_count):
+        """ 카메라 이름을 파일 수 내림차순(by_count) 또는 이름순으로 정렬합니다. """
+        if by_count:
+            camera_ids = sorted(self._groups, key=self._camera_totals.__getitem__, reverse=True)
+            return [self._camera_names[camera_id] for camera_id in camera_ids]
+        return sorted(self.cameras(), key=str.lower)
+
+    def sort_lenses(self, camera_info, by_count):
+        """ 카메라의 렌즈 이름을 파일 수 내림차순(by_count) 또는 이름순으로 정렬합니다. """
+        lenses = self._groups.get(self._camera_ids.get(camera_info), {})
+        if by_count:
+            lens_ids = sorted(lenses, key=lambda lens_id: len(lenses[lens_id]), reverse=True)
+            return [self._lens_names[lens_id] for lens_id in lens_ids]
+        return sorted((self._lens_names[lens_id] for lens_id in lenses), key=str.lower)
+
+    def sorted_group_files(self, camera_info, lens_info=None):
+        """ 그룹의 파일을 수정 날짜 내림차순으로 반환합니다. (수정 시각 열로 행 번호를 정렬) """
+        rows = sorted(self._group_rows(camera_info, lens_info), key=self._row_mtimes.__getitem__, reverse=True)
+        return [self._row_path(row) for row in rows]
+
+class LibraryView(_CameraLensGroups):
+    """ PhotoLibrary.filter()의 결과: 조건에 맞는 파일만 담은 카메라 > 렌즈 그룹
+    만든 시점의 스냅숏이며, 라이브러리에서 파일을 지우면 다시 만들어야 합니다. (행 번호가 재사용되므로) """
+
+    def __init__(self, library, groups):
+        """ groups: 카메라 번호 -> {렌즈 번호: 행 번호 배열} (라이브러리와 같은 순서) """
+        self._camera_names = library._camera_names
+        self._camera_ids = library._camera_ids
+        self._lens_names = library._lens_names
+        self._lens_ids = library._lens_ids
+        self._row_path = library._row_path
+        self._row_mtimes = library._row_mtimes
+        self._groups = groups
+        self._camera_totals = {camera_id: sum(map(len, lenses.values())) for camera_id, lenses in groups.items()}
+
+    def __len__(self):
+        return sum(self._camera_totals.values())
+
+class PhotoLibrary(_CameraLensGroups):
+    """ 스캔한 파일을 카메라 > 렌즈 2단계로 분류해 보관합니다.
+    GUI와 명령줄 도구가 함께 쓰며, 파일 추가/제거 시 그룹과 개수도 같이 갱신합니다.
+    extra_fields: 카메라/렌즈 외에 열로 보관할 필드 (group_by에 쓸 수 있음) """
+
+    def __init__(self, extra_fields=()):
+        check_fields(extra_fields)
+        self.extra_fields = tuple(extra_fields)
+        # 폴더 경로 <-> 폴더 번호
+        self._dirs = []
+        self._dir_ids = {}
+        # 카메라/렌즈 이름 <-> 번호
+        self._camera_names = []
+        self._camera_ids = {}
+        self._lens_names = []
+        self._lens_ids = {}
+        # 행(파일)별 열: 폴더 번호, 파일명, 카메라 번호, 렌즈 번호, 크기, 수정 시각(ns)
+        self._row_dirs = array('I')
+        self._row_names = []
+        self._row_cameras = array('I')
+        self._row_lenses = array('I')
+        self._row_sizes = array('q')
+        self._row_mtimes = array('q')
+        # 추가 필드별 값 이름 <-> 번호, 행별 값 번호
+        self._field_names = [[] for _ in self.extra_fields]
+        self._field_ids = [{} for _ in self.extra_fields]
+        self._row_fields = [array('I') for _ in self.extra_fields]
+        # 제거된 행 번호 (다음 추가 때 재사용)
+        self._free_rows = []
+        # 폴더 번호 -> {파일명: 행 번호} (경로로 행 찾기)
+        self._rows_by_dir = {}
+        # 카메라 번호 -> {렌즈 번호: 행 번호 배열} (처음 나온 순서 유지), 카메라 번호 -> 파일 수
+        self._groups = {}
+        self._camera_totals = {}
+        # 필터용 역색인: 파일명 trigram -> 행 번호, 날짜 값 번호 -> 행 번호 배열 ('date' 필드를 읽을 때만)
+        self._name_index = SubstringIndex()
+        self._date_field = self.extra_fields.index('date') if 'date' in self.extra_fields else None
+        self._rows_by_date = {}
+
+    def __len__(self):
+        return len(self._row_names) - len(self._free_rows)
+
+    def __contains__(self, file_path):
+        return self._find_row(file_path) is not None
+
+    def clear(self):
+        self.__init__(self.extra_fields)
+
+    def _find_row(self, file_path):
+        folder, filename = os.path.split(file_path)
+        dir_id = self._dir_ids.get(folder)
+        if dir_id is None:
+            return None
+        return self._rows_by_dir[dir_id].get(filename)
+
+    def _row_path(self, row):
+        return os.path.join(self._dirs[self._row_dirs[row]], self._row_names[row])
+
+    def _intern(self, names, ids, name):
+        name_id = ids.get(name)
+        if name_id is None:
+            name_id = ids[name] = len(names)
+            names.append(name)
+        return name_id
+
+    def add_file(self, file_path, camera_info, lens_info, file_stat=(0, 0), field_values=()):
+        """ 파일 하나를 카메라/렌즈 그룹에 추가합니다. (이미 있으면 그룹과 정보를 새로 씀)
+        field_values: extra_fields 순서의 값 (없는 값은 UNKNOWN_VALUE) """
+        if file_path in self:
+            self.remove_files([file_path])
+        folder, filename = os.path.split(file_path)
+        dir_id = self._intern(self._dirs, self._dir_ids, folder)
+        camera_id = self._intern(self._camera_names, self._camera_ids, camera_info)
+        lens_id = self._intern(self._lens_names, self._lens_ids, lens_info)
+        size, mtime_ns = file_stat
+        field_ids = [self._intern(names, ids, value)
+                     for names, ids, value in zip(self._field_names, self._field_ids,
+                                                  tuple(field_values) + (UNKNOWN_VALUE,) * len(self.extra_fields))]
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._row_dirs[row] = dir_id
+            self._row_names[row] = filename
+            self._row_cameras[row] = camera_id
+            self._row_lenses[row] = lens_id
+            self._row_sizes[row] = size
+            self._row_mtimes[row] = mtime_ns
+            for column, field_id in zip(self._row_fields, field_ids):
+                column[row] = field_id
+        else:
+            row = len(self._row_names)
+            self._row_dirs.append(dir_id)
+            self._row_names.append(filename)
+            self._row_cameras.append(camera_id)
+            self._row_lenses.append(lens_id)
+            self._row_sizes.append(size)
+            self._row_mtimes.append(mtime_ns)
+            for column, field_id in zip(self._row_fields, field_ids):
+                column.append(field_id)
+        self._rows_by_dir.setdefault(dir_id, {})[filename] = row
+        self._groups.setdefault(camera_id, {}).setdefault(lens_id, array('I')).append(row)
+        self._camera_totals[camera_id] = self._camera_totals.get(camera_id, 0) + 1
+        self._name_index.add(row, filename)
+        if self._date_field is not None:
+            self._rows_by_date.setdefault(field_ids[self._date_field], array('I')).append(row)
+
+    def remove_files(self, file_paths):
+        """ 파일을 결과에서 제거합니다. 비게 된 렌즈/카메라 그룹도 제거합니다.
+        {(카메라, 렌즈): 제거된 경로 집합}을 반환합니다. """
+        removed_by_group = {}
+        removed_rows = {}
+        for file_path in file_paths:
+            row = self._find_row(file_path)
+            if row is None:
+                continue
+            del self._rows_by_dir[self._row_dirs[row]][self._row_names[row]]
+            group_id = (self._row_cameras[row], self._row_lenses[row])
+            removed_rows.setdefault(group_id, set()).add(row)
+            group_key = (self._camera_names[group_id[0]], self._lens_names[group_id[1]])
+            removed_by_group.setdefault(group_key, set()).add(file_path)
+
+        # 날짜별 행 목록은 바로 갱신, 파일명 역색인은 지운 행을 남겨 두고 검색 때 확인 (많이 쌓이면 다시 만듦)
+        if self._date_field is not None:
+            date_column = self._row_fields[self._date_field]
+            removed_by_date = {}
+            for rows in removed_rows.values():
+                for row in rows:
+                    removed_by_date.setdefault(date_column[row], set()).add(row)
+            for date_id, rows in removed_by_date.items():
+                remaining = array('I', (row for row in self._rows_by_date[date_id] if row not in rows))
+                if remaining:
+                    self._rows_by_date[date_id] = remaining
+                else:
+                    del self._rows_by_date[date_id]
+        self._name_index.stale_count += sum(map(len, removed_rows.values()))
+
+        for (camera_id, lens_id), rows in removed_rows.items():
+            lenses = self._groups[camera_id]
+            remaining = array('I', (row for row in lenses[lens_id] if row not in rows))
+            if remaining:
+                lenses[lens_id] = remaining
+            else:
+                del lenses[lens_id]
+            self._camera_totals[camera_id] -= len(rows)
+            if not lenses:
+                del self._groups[camera_id]
+                del self._camera_totals[camera_id]
+            for row in rows:
+                self._row_names[row] = None
+                self._free_rows.append(row)
+        if self._name_index.stale_count > len(self):
+            self._rebuild_name_index()
+        return removed_by_group
+
+    def _rebuild_name_index(self):
+        self._name_index = SubstringIndex()
+        for row, filename in enumerate(self._row_names):
+            if filename is not None:
+                self._name_index.add(row, filename)
+
+    def filter(self, camera="", lens="", date_from="", date_to="", name=""):
+        """ 조건에 맞는 파일만 담은 LibraryView를 반환합니다. 빈 조건은 무시합니다.
+        camera/lens/name: 대소문자를 무시한 부분 문자열
+        date_from/date_to: 촬영 날짜 범위 ("YYYY", "YYYY-MM", "YYYY-MM-DD", 양 끝 포함, 날짜를 모르는 파일은 제외) """
+        check_date_bound(date_from)
+        check_date_bound(date_to)
+        if (date_from or date_to) and self._date_field is None:
+            raise ValueError("Date filter needs the 'date' field in this scan")
+        # 이름이 맞는 카메라/렌즈 번호 (이름 수만큼만 확인)
+        camera_ids = set(self._groups)
+        if camera:
+            camera = camera.lower()
+            camera_ids = {camera_id for camera_id in camera_ids if camera in self._camera_names[camera_id].lower()}
+        lens_ids = None
+        if lens:
+            lens = lens.lower()
+            lens_ids = {lens_id for lens_id, lens_name in enumerate(self._lens_names) if lens in lens_name.lower()}
+
+        # 날짜/파일명 조건에 맞는 행 집합 (역색인 후보의 교집합, 파일명은 실제 이름으로 확인)
+        row_sets = []
+        if date_from or date_to:
+            date_names = self._field_names[self._date_field]
+            date_rows = set()
+            for date_id, rows in self._rows_by_date.items():
+                date = date_names[date_id]
+                if date != UNKNOWN_VALUE and date_in_range(date, date_from, date_to):
+                    date_rows.update(rows)
+            row_sets.append(date_rows)
+        if name:
+            name = name.lower()
+            candidates = self._name_index.candidates(name)
+            if self._name_index.stale_count or len(name) > 3:
+                # 지운 행을 빼고 실제 파일명으로 확인 (map/compress로 C 수준에서 반복)
+                # 지운 행이 없으면 3글자 이하 검색어의 후보는 그대로 정답
+                candidates.difference_update(self._free_rows)
+                candidates = list(candidates)
+                lower_names = map(str.lower, map(self._row_names.__getitem__, candidates))
+                candidates = set(compress(candidates, map(contains, lower_names, repeat(name))))
+            row_sets.append(candidates)
+        matching_rows = None
+        for rows in sorted(row_sets, key=len):
+            matching_rows = rows if matching_rows is None else matching_rows & rows
+        if matching_rows is not None and len(matching_rows) == len(self):
+            matching_rows = None  # 모두 맞으면 그룹 배열을 그대로 복사
+
+        groups = {}
+        if matching_rows is not None and len(matching_rows) * FILTER_SCAN_RATIO < len(self):
+            # 맞는 행이 적으면 그 행만 카메라/렌즈별로 나눔
+            for row in sorted(matching_rows):
+                camera_id, lens_id = self._row_cameras[row], self._row_lenses[row]
+                if camera_id in camera_ids and (lens_ids is None or lens_id in lens_ids):
+                    groups.setdefault(camera_id, {}).setdefault(lens_id, array('I')).append(row)
+            return LibraryView(self, groups)
+        for camera_id, lenses in self._groups.items():
+            if camera_id not in camera_ids:
+                continue
+            for lens_id, rows in lenses.items():
+                if lens_ids is not None and lens_id not in lens_ids:
+                    continue
+                # 라이브러리의 배열은 파일을 추가할 때 늘어나므로 복사해 둠
+                rows = array('I', rows if matching_rows is None else filter(matching_rows.__contains__, rows))
+                if rows:
+                    groups.setdefault(camera_id, {})[lens_id] = rows
+        return LibraryView(self, groups)
+
+    def get_group_key(self, file_path):
+        """ 파일의 (카메라, 렌즈), 없으면 None """
+        row = self._find_row(file_path)
+        if row is None:
+            return None
+        return self._camera_names[self._row_cameras[row]], self._lens_names[self._row_lenses[row]]
+
+    def get_stat(self, file_path):
+        """ 스캔 때 저장한 (크기, 수정 시각) """
+        row = self._find_row(file_path)
+        if row is None:
+            return 0, 0
+        return self._row_sizes[row], self._row_mtimes[row]
+
+    def set_stat(self, file_path, file_stat):
+        """ 저장된 (크기, 수정 시각)을 바꿉니다. 바뀌었으면 True를 반환합니다. """
+        row = self._find_row(file_path)
+        if row is None or (self._row_sizes[row], self._row_mtimes[row]) == tuple(file_stat):
+            return False
+        self._row_sizes[row], self._row_mtimes[row] = file_stat
+        return True
+
+    def get_mtime(self, file_path):
+        return self.get_stat(file_path)[1]
+
+    def sort_by_mtime(self, file_paths):
+        """ 파일 목록을 수정 날짜 기준 내림차순(최신 파일이 위로)으로 정렬합니다.
+        스캔 때 저장한 수정 시각을 사용하므로 파일 시스템에 접근하지 않습니다. """
+        return sorted(file_paths, key=self.get_mtime, reverse=True)
+
+    def get_field_values(self, file_path):
+        """ 파일의 extra_fields 값 튜플, 없으면 None """
+        row = self._find_row(file_path)
+        if row is None:
+            return None
+        return tuple(names[column[row]] for names, column in zip(self._field_names, self._row_fields))
+
+    def group_by(self, keys):
+        """ keys(예: ('lens', 'focal_length', 'year')) 순서의 여러 단계 그룹을 만듭니다.
+        'camera', 'lens'와 extra_fields에 있는 필드를 쓸 수 있습니다. """
+        columns = []
+        for key in keys:
+            if key == 'camera':
+                columns.append((self._camera_names, self._camera_ids, self._row_cameras))
+            elif key == 'lens':
+                columns.append((self._lens_names, self._lens_ids, self._row_lenses))
+            elif key in self.extra_fields:
+                field_index = self.extra_fields.index(key)
+                columns.append((self._field_names[field_index], self._field_ids[field_index],
+                                self._row_fields[field_index]))
+            else:
+                raise ValueError(f"Field '{key}' was not read in this scan "
+                                 f"(available: {', '.join(('camera', 'lens') + self.extra_fields)})")
+        if not columns:
+            raise ValueError("At least one group field is required")
+        return Grouping(keys, columns, self._row_names, self._row_path, self._row_mtimes)
+
+    def iter_files(self):
+        """ (경로, 카메라, 렌즈, (크기, 수정 시각))을 그룹 순서대로 돌려줍니다. """
+        for camera_id, lenses in self._groups.items():
+            camera_info = self._camera_names[camera_id]
+            for lens_id, rows in lenses.items():
+                lens_info = self._lens_names[lens_id]
+                for row in rows:
+                    yield self._row_path(row), camera_info, lens_info, (self._row_sizes[row], self._row_mtimes[row])
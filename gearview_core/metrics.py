@@ -0,0 +1,208 @@
+"""
+단계별 성능 계측 (카운터, 소요 시간 히스토그램)과 cProfile 수집
+
+스캔/파일 작업의 각 단계가 전역 metrics에 기록하고, GUI 진단 창과 명령줄 --stats가 JSON으로 내보냅니다.
+기록 한 번은 잠금과 dict 갱신뿐이라 항상 켜 둡니다.
+  walk.*      폴더 목록 (폴더별 시간, 폴더/파일 수)
+  exif.*      파일 열기 시간, 읽은 헤더 바이트, EXIF 해석 시간, 읽지 못한 파일 수 (오류 종류별)
+  classify    카메라/렌즈 이름 분류
+  scan.*      파일 목록 수집, 색인 읽기/쓰기, 전체 스캔
+  tree.*      트리뷰 노드 추가 (GUI)
+  files.*     복사/이동/링크 (파일별 시간, 바이트 수, 전체 시간 -> 처리량)
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 히스토그램 구간 상한 (초), 마지막 구간은 그보다 큰 값
+HISTOGRAM_BOUNDS = (0.0001, 0.0003, 0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0)
+
+class Histogram:
+    """ 소요 시간 분포 (개수, 합계, 최소/최대, 구간별 개수) """
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+
+    def percentile(self, fraction):
+        """ 값의 fraction 비율이 들어가는 구간의 상한 (최댓값을 넘지 않음) """
+        rank = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(HISTOGRAM_BOUNDS, self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min or 0.0, 6),
+            "max": round(self.max, 6),
+            "p50": round(self.percentile(0.5), 6),
+            "p90": round(self.percentile(0.9), 6),
+            "p99": round(self.percentile(0.99), 6),
+            "buckets": {f"<={bound:g}s": bucket_count for bound, bucket_count in zip(HISTOGRAM_BOUNDS, self.buckets)}
+                       | {f">{HISTOGRAM_BOUNDS[-1]:g}s": self.buckets[-1]},
+        }
+
+class Metrics:
+    """ 여러 스레드에서 기록하는 카운터와 소요 시간 히스토그램 """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._since = time.time()
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._timings.get(name)
+            if histogram is None:
+                histogram = self._timings[name] = Histogram()
+            histogram.add(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """ with 블록의 소요 시간을 name 히스토그램에 기록합니다. """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._since = time.time()
+
+    def snapshot(self):
+        """ 현재 값을 JSON으로 저장할 수 있는 dict로 반환합니다.
+        "<이름>.bytes" 카운터와 "<이름>.run" 시간이 함께 있으면 처리량(MB/s)도 계산합니다. """
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: histogram.to_dict() for name, histogram in self._timings.items()}
+            since = self._since
+        throughput = {}
+        for name, byte_count in counters.items():
+            if name.endswith(".bytes"):
+                run = timings.get(name[:-len(".bytes")] + ".run")
+                if run and run["total"] > 0:
+                    throughput[name[:-len(".bytes")]] = round(byte_count / run["total"] / (1024 * 1024), 2)
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(since)),
+            "counters": dict(sorted(counters.items())),
+            "timings": dict(sorted(timings.items())),
+            "throughput_mb_per_s": throughput,
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+            f.write("\n")
+
+    def format_report(self):
+        """ 진단 창/명령줄 출력용 표 """
+        snapshot = self.snapshot()
+        lines = [f"Since {snapshot['since']}", "",
+                 f"{'timing':<24} {'count':>8} {'total s':>9} {'mean ms':>9} {'p90 ms':>9} {'max ms':>9}"]
+        for name, timing in snapshot["timings"].items():
+            lines.append(f"{name:<24} {timing['count']:>8} {timing['total']:>9.3f} {timing['mean'] * 1000:>9.3f} "
+                         f"{timing['p90'] * 1000:>9.3f} {timing['max'] * 1000:>9.3f}")
+        lines += ["", f"{'counter':<40} {'value':>12}"]
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name:<40} {value:>12}")
+        if snapshot["throughput_mb_per_s"]:
+            lines += ["", "Throughput"]
+            for name, mb_per_s in snapshot["throughput_mb_per_s"].items():
+                lines.append(f"{name:<40} {mb_per_s:>9.2f} MB/s")
+        return "\n".join(lines)
+
+# 엔진 전체가 함께 쓰는 계측 값
+metrics = Metrics()
+
+class ThreadProfiler:
+    """ 한 번의 작업을 cProfile로 기록합니다.
+    cProfile은 켠 스레드만 기록하므로, 켜져 있는 동안 새로 시작한 스레드(스캔 작업자, 폴더 목록 작업자)의
+    threading.Thread.run을 감싸 스레드마다 프로파일러를 켜고, 스레드가 끝날 때 그 스레드 안에서 끈 뒤에 모읍니다.
+    (다른 스레드에서 켜져 있는 프로파일러를 끄거나 합치면 호출한 스레드의 기록이 꺼지고 통계가 어긋남)
+    stop() 때까지 끝나지 않은 스레드는 결과에 넣지 않습니다. run을 재정의한 Thread 하위 클래스는 기록하지 않습니다.
+    (Python 3.12 이상은 프로파일러 하나가 모든 스레드를 기록하므로 스레드별 프로파일러는 켜지지 않음)
+    start()와 stop()은 같은 스레드에서 불러야 합니다. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._profile = None
+        self._original_run = None
+        self._stopped = False
+
+    def _profiled_run(self, thread):
+        """ 감싼 Thread.run: 이 스레드의 프로파일러를 켜고 끝나면 이 스레드에서 끈 뒤 모음 """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None  # 이미 다른 프로파일러가 모든 스레드를 기록 중
+        try:
+            self._original_run(thread)
+        finally:
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    if not self._stopped:
+                        self._profiles.append(profile)
+
+    def start(self):
+        self._original_run = threading.Thread.run
+        profiler = self
+        def profiled_run(thread):
+            profiler._profiled_run(thread)
+        threading.Thread.run = profiled_run
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        """ 기록을 멈추고 합친 pstats.Stats를 반환합니다. """
+        threading.Thread.run = self._original_run
+        self._profile.disable()
+        with self._lock:
+            self._stopped = True
+            profiles = list(self._profiles)
+        stats = pstats.Stats(self._profile)
+        for profile in profiles:
+            stats.add(profile)
+        return stats
+
+def format_profile(stats, limit=30):
+    """ 누적 시간 상위 limit개 함수 """
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,62 @@
+"""
+RAW+JPEG 쌍: 같은 폴더에서 확장자만 다른 RAW와 JPEG (카메라의 RAW+JPEG 촬영)
+
+RAW 헤더에는 렌즈 정보가 제조사 메이커노트에만 있는 경우가 있어 같은 사진인데 JPEG와 다른 그룹으로
+갈 수 있으므로, 쌍은 한 그룹(JPEG의 분류 우선)으로 묶어 그룹을 복사/이동하면 두 파일이 함께 옮겨지게 합니다.
+"""
+
+import os
+from itertools import groupby
+
+from .exif import JPEG_SUFFIXES, NO_CAMERA_INFO, NO_LENS_INFO, RAW_SUFFIXES
+
+def find_pair_keys(file_paths):
+    """ RAW와 JPEG가 모두 있는 쌍의 파일만 {경로: 쌍 키(확장자를 뺀 경로)}로 반환합니다.
+    확장자만 대소문자를 구분하지 않고 나머지 경로는 그대로 비교합니다. (A/IMG_1.CR2와 a/img_1.jpg는 다른 사진)
+    RAW가 없는 대부분의 경우 확장자(RAW는 모두 네 글자)만 보고 끝나도록 RAW의 키를 먼저 모읍니다. """
+    raw_keys = {}
+    for file_path in file_paths:
+        if file_path[-4:].lower() in RAW_SUFFIXES:
+            raw_keys.setdefault(file_path[:-4], []).append(file_path)
+    if not raw_keys:
+        return {}
+    pair_keys = {}
+    for file_path in file_paths:
+        pair_key, _, suffix = file_path.rpartition('.')
+        if ('.' + suffix).lower() in JPEG_SUFFIXES:
+            raw_paths = raw_keys.get(pair_key)
+            if raw_paths:
+                pair_keys[file_path] = pair_key
+                pair_keys.update(dict.fromkeys(raw_paths, pair_key))
+    return pair_keys
+
+def resolve_pair_rows(rows):
+    """ 한 쌍의 행 [(경로, 카메라, 렌즈, (크기, 수정 시각), 필드 값 튜플), ...]에 같은 카메라/렌즈를 지정합니다.
+    카메라 정보가 있는 쪽, 렌즈 정보가 있는 쪽을 고르고 같으면 JPEG의 분류를 씁니다. (필드 값은 파일마다 그대로) """
+    def preference(row):
+        return (row[1] != NO_CAMERA_INFO, row[2] != NO_LENS_INFO, row[0].lower().endswith(JPEG_SUFFIXES))
+    _, camera_info, lens_info, _, _ = max(rows, key=preference)
+    return [(file_path, camera_info, lens_info, file_stat, field_values)
+            for file_path, _, _, file_stat, field_values in rows]
+
+def group_pair_rows(rows):
+    """ 행 목록 안에서 RAW+JPEG 쌍을 찾아 같은 그룹으로 맞춘 새 목록을 반환합니다. (순서는 쌍끼리 붙여 둠) """
+    pair_keys = find_pair_keys([row[0] for row in rows])
+    if not pair_keys:
+        return rows
+    grouped = [row for row in rows if row[0] not in pair_keys]
+    paired = sorted((row for row in rows if row[0] in pair_keys), key=lambda row: pair_keys[row[0]])
+    for _, pair_rows in groupby(paired, key=lambda row: pair_keys[row[0]]):
+        grouped.extend(resolve_pair_rows(list(pair_rows)))
+    return grouped
+
+def find_paired_jpeg(file_path):
+    """ RAW 파일과 쌍인 JPEG 경로를 디스크에서 찾습니다. (RAW 미리보기용) 없으면 None """
+    if not file_path.lower().endswith(RAW_SUFFIXES):
+        return None
+    stem = os.path.splitext(file_path)[0]
+    for suffix in JPEG_SUFFIXES:
+        for candidate in (stem + suffix.upper(), stem + suffix):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
@@ -0,0 +1,31 @@
+"""
+사용자 설정/색인 파일과 캐시 위치
+"""
+
+import os
+import platform
+
+def get_app_data_dir():
+    """ 사용자 설정/색인 파일을 저장할 폴더 경로를 반환합니다. """
+    if platform.system() == 'Windows':
+        base_dir = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif platform.system() == 'Darwin':
+        base_dir = os.path.expanduser('~/Library/Application Support')
+    else:
+        base_dir = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base_dir, 'GearView')
+
+def get_cache_dir():
+    """ 지워도 다시 만들 수 있는 캐시(썸네일 등)를 저장할 폴더 경로를 반환합니다. """
+    if platform.system() == 'Windows':
+        base_dir = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+        return os.path.join(base_dir, 'GearView', 'Cache')
+    if platform.system() == 'Darwin':
+        base_dir = os.path.expanduser('~/Library/Caches')
+    else:
+        base_dir = get_xdg_cache_home()
+    return os.path.join(base_dir, 'GearView')
+
+def get_xdg_cache_home():
+    """ freedesktop 규격의 사용자 캐시 폴더 ($XDG_CACHE_HOME 또는 ~/.cache) """
+    return os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
@@ -0,0 +1,152 @@
+"""
+미리보기 이미지 생성: 원본 전체를 디코딩하지 않고 디스크 썸네일 캐시, EXIF 썸네일, JPEG 축소 디코딩 순으로 사용
+"""
+
+import io
+import struct
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from .exif import read_jpeg_exif_thumbnail, ExifParseError
+from .pairs import find_paired_jpeg
+from .thumbcache import THUMBNAIL_SIZE
+
+PREVIEW_SIZE = (200, 150)
+# EXIF 썸네일이 미리보기 영역의 이 비율 이상을 채우면 그대로 사용 (DCF 표준 썸네일 160x120 포함)
+EXIF_THUMBNAIL_MIN_COVERAGE = 0.75
+# 메모리에 보관할 미리보기 수 (200x150 RGB 하나에 약 90KB)
+PREVIEW_CACHE_SIZE = 256
+PREVIEW_WORKERS = 2
+
+def load_exif_thumbnail(file_path, size=PREVIEW_SIZE):
+    """ 내장 EXIF 썸네일을 미리보기 크기로 엽니다. 없거나 너무 작으면 None을 반환합니다. """
+    try:
+        data = read_jpeg_exif_thumbnail(file_path)
+    except (ExifParseError, struct.error, OSError):
+        return None
+    if not data:
+        return None
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, SyntaxError, ValueError):
+        return None
+    if image.width < size[0] * EXIF_THUMBNAIL_MIN_COVERAGE and image.height < size[1] * EXIF_THUMBNAIL_MIN_COVERAGE:
+        return None
+    return image
+
+def load_preview_image(file_path, size=PREVIEW_SIZE, thumbnail_cache=None):
+    """ 미리보기용 작은 RGB 이미지를 만듭니다.
+    1) 디스크 썸네일 캐시에 있으면 그것을 쓰고
+    2) 내장 EXIF 썸네일이 있으면 그것을 쓰고 (원본 이미지 데이터는 읽지 않음, 캐시에도 저장 안 함)
+    3) 없으면 JPEG draft 모드로 1/2, 1/4, 1/8 축소 디코딩한 뒤 크기를 맞춥니다. (캐시에 저장)
+    RAW 파일은 쌍인 JPEG가 있으면 그 JPEG로 만듭니다. """
+    image = thumbnail_cache.get(file_path) if thumbnail_cache is not None else None
+    source_path = file_path
+    if image is None:
+        source_path = find_paired_jpeg(file_path) or file_path
+        image = load_exif_thumbnail(source_path, size)
+    if image is None:
+        decode_size = size if thumbnail_cache is None else THUMBNAIL_SIZE
+        with Image.open(source_path) as source:
+            # JPEG이면 DCT 단계에서 미리보기 크기 이상인 가장 작은 배율로 디코딩
+            source.draft('RGB', decode_size)
+            source.load()
+            image = source.copy()
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        if thumbnail_cache is not None:
+            image.thumbnail(decode_size, Image.Resampling.LANCZOS, reducing_gap=None)
+            thumbnail_cache.put(file_path, image)
+    # 미리보기 크기에 맞게 조정 (비율 유지, 확대는 하지 않음)
+    image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=None)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    return image
+
+class PreviewLoader:
+    """ 미리보기를 백그라운드 스레드에서 만들고 (경로, 수정 시각) 기준 LRU 캐시에 보관합니다.
+    request()를 새로 호출하면 아직 시작하지 않은 이전 요청(선택이 지나간 파일)은 버립니다.
+    완료 콜백은 작업 스레드에서 호출되므로 GUI에서는 큐에 넣기만 하고 메인 스레드에서 꺼내야 합니다. """
+
+    def __init__(self, worker_count=PREVIEW_WORKERS, cache_size=PREVIEW_CACHE_SIZE, size=PREVIEW_SIZE,
+                 thumbnail_cache=None):
+        self.size = size
+        self.thumbnail_cache = thumbnail_cache  # 디스크 썸네일 캐시 (ThumbnailCache 또는 None)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (경로, 수정 시각) -> PIL Image
+        self._pending = []  # 아직 시작하지 않은 [(경로, 수정 시각)], 앞쪽이 우선
+        self._in_progress = set()
+        self._wanted = None  # 지금 화면에 보여줄 (경로, 수정 시각)
+        self._callback = None
+        self._condition = threading.Condition()
+        for _ in range(worker_count):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def get_cached(self, file_path, mtime_ns):
+        """ 캐시에 있으면 이미지를, 없으면 None을 반환합니다. """
+        key = (file_path, mtime_ns)
+        with self._condition:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def request(self, file_path, mtime_ns, prefetch=(), callback=None):
+        """ file_path의 미리보기를 요청하고 prefetch [(경로, 수정 시각)]를 미리 만들어 둡니다.
+        준비되면 callback(경로, 이미지, 오류)를 호출합니다 (캐시에 이미 있으면 바로 호출). """
+        key = (file_path, mtime_ns)
+        with self._condition:
+            self._wanted = key
+            self._callback = callback
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            pending = [] if image is not None else [key]
+            pending.extend(k for k in prefetch if k not in self._cache and k != key)
+            # 이전 선택에서 남은 요청은 버림
+            self._pending = [k for k in pending if k not in self._in_progress]
+            if image is not None:
+                self._wanted = None
+            self._condition.notify_all()
+        if image is not None and callback is not None:
+            callback(file_path, image, None)
+
+    def is_waiting(self):
+        """ 요청한 미리보기가 아직 전달되지 않았는지 """
+        with self._condition:
+            return self._wanted is not None
+
+    def cancel(self):
+        """ 대기 중인 요청을 모두 버리고 완료 콜백도 호출하지 않습니다. """
+        with self._condition:
+            self._wanted = None
+            self._callback = None
+            self._pending = []
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                key = self._pending.pop(0)
+                self._in_progress.add(key)
+            image = error = None
+            try:
+                image = load_preview_image(key[0], self.size, self.thumbnail_cache)
+            except Exception as e:
+                error = e
+            with self._condition:
+                self._in_progress.discard(key)
+                if image is not None:
+                    self._cache[key] = image
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                # 콜백이 끝난 뒤에 is_waiting()이 False가 되도록 잠금 안에서 호출 (콜백은 짧아야 함)
+                if key == self._wanted:
+                    self._wanted = None
+                    if self._callback is not None:
+                        self._callback(key[0], image, error)
@@ -0,0 +1,352 @@
+"""
+폴더 스캔 파이프라인: 병렬 폴더 탐색, 작업자 풀 EXIF 분석, 스캔 색인 활용
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .exif import (get_camera_lens_exif, get_camera_info, get_lens_info, JPEG_SUFFIXES, TIFF_RAW_SUFFIXES,
+                   BMFF_SUFFIXES, RAF_SUFFIXES)
+from .fields import get_wanted_tags, get_field_values, check_fields
+from .index import open_scan_index, load_scan_index, update_scan_index
+from .library import PhotoLibrary
+from .metrics import metrics
+from .pairs import find_pair_keys, resolve_pair_rows
+
+# EXIF 분석 작업자 수 기본값 (네트워크 저장소는 I/O 대기가 길어서 코어 수보다 넉넉하게 잡음)
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+MAX_SCAN_WORKERS = 64
+# 스캔 결과를 보내는 단위 (파일 수 또는 시간 중 먼저 도달하는 쪽)
+SCAN_BATCH_SIZE = 500
+SCAN_BATCH_INTERVAL = 0.25
+# 스캔 대상 확장자 (소문자) - RAW/HEIC도 헤더 전용 리더로 읽음 (exif.py)
+SCAN_SUFFIXES = JPEG_SUFFIXES + TIFF_RAW_SUFFIXES + BMFF_SUFFIXES + RAF_SUFFIXES
+
+def analyze_file(file_path, extra_fields=()):
+    """ 파일 하나의 EXIF를 읽어 (카메라, 렌즈, extra_fields 값 튜플, 읽기 성공 여부)를 반환합니다.
+    작업자 스레드에서 실행됩니다. """
+    started = time.perf_counter()
+    try:
+        exif = get_camera_lens_exif(file_path, get_wanted_tags(tuple(extra_fields)))
+        readable = True
+    except Exception as e:
+        # 일시적인 네트워크 오류나 손상된 태그 값 등으로 읽지 못한 파일은 색인에 저장하지 않음
+        # (파일 하나의 오류로 스캔 전체가 멈추지 않도록 모든 예외를 처리)
+        metrics.count(f"exif.errors.{type(e).__name__}")
+        print(f"Error reading EXIF for {file_path}: {e}")
+        exif = {}
+        readable = False
+    parsed = time.perf_counter()
+    metrics.observe("exif.read", parsed - started)
+    camera_info, lens_info = get_camera_info(exif), get_lens_info(exif)
+    field_values = get_field_values(exif, extra_fields)
+    metrics.observe("classify", time.perf_counter() - parsed)
+    return camera_info, lens_info, field_values, readable
+
+def map_in_order(executor, func, items, max_pending):
+    """ executor.map과 같이 입력 순서대로 결과를 돌려주되, 동시에 대기 중인 작업 수를 제한합니다.
+    (수십만 개 파일을 한 번에 submit하면 Future 객체만으로 메모리를 많이 차지함) """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+SYSTEM_FOLDER_NAMES = {'$RECYCLE.BIN', 'System Volume Information', '@eaDir', '#recycle', '#snapshot'}
+FILE_ATTRIBUTE_HIDDEN = 0x2
+FILE_ATTRIBUTE_SYSTEM = 0x4
+
+def is_hidden_folder(entry):
+    """ 숨김 폴더(점으로 시작, Windows 숨김/시스템 속성) 또는 시스템 폴더인지 확인합니다. """
+    if entry.name.startswith('.') or entry.name in SYSTEM_FOLDER_NAMES:
+        return True
+    try:
+        # Windows에서는 디렉터리 목록에 포함된 속성 값이라 추가 호출이 없음
+        attributes = getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0)
+    except OSError:
+        return False
+    return bool(attributes & (FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM))
+
+class DirectoryCrawler:
+    """ 하위 폴더를 여러 스레드에서 동시에 os.scandir로 읽는 폴더 탐색기.
+    네트워크 공유에서는 폴더 목록 왕복 시간이 대부분이므로 폴더 여러 개를 동시에 요청합니다.
+    결과는 os.walk와 같은 순서(상위 폴더의 파일 먼저, 하위 폴더는 목록 순서대로)로 돌려주므로
+    파일명 기준 중복 처리와 그룹 내 순서가 직렬 탐색과 같습니다.
+    탐색이 끝나면 listed_dirs에 목록을 읽은 폴더 경로(os.path.normpath)가 남습니다. (읽지 못했거나 건너뛴 폴더는 없음) """
+
+    def __init__(self, max_workers=8, follow_symlinks=False, skip_hidden=False, suffixes=SCAN_SUFFIXES):
+        self.max_workers = max(1, max_workers)
+        self.follow_symlinks = follow_symlinks
+        self.skip_hidden = skip_hidden
+        self.suffixes = suffixes
+        self._executor = None
+        self._stopped = False
+        # 심볼릭 링크를 따라갈 때 같은 폴더를 두 번 읽지 않도록 (st_dev, st_ino) 기록
+        self._visited = set()
+        self._visited_lock = threading.Lock()
+        self.listed_dirs = set()
+
+    def iter_files(self, folder_paths):
+        """ 폴더들 아래의 대상 파일 os.DirEntry를 돌려줍니다. DirEntry.stat()은 Windows에서
+        디렉터리 목록에 포함된 값을 쓰므로 파일마다 별도의 stat 호출이 필요 없습니다. """
+        self._stopped = False
+        self._visited.clear()
+        self.listed_dirs = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            root_futures = [self._submit(folder_path) for folder_path in folder_paths]
+            pending = [future for future in reversed(root_futures) if future is not None]
+            while pending:
+                files, child_futures = pending.pop().result()
+                yield from files
+                pending.extend(reversed(child_futures))
+        finally:
+            # 중간에 멈춘 경우 남은 폴더 목록 작업은 버림
+            self._stopped = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, dir_path):
+        """ 폴더 목록 작업을 예약합니다. 이미 읽은 폴더(링크 순환)이거나 중단된 경우 None을 반환합니다. """
+        if self._stopped:
+            return None
+        if self.follow_symlinks:
+            try:
+                stat = os.stat(dir_path)
+            except OSError:
+                return None
+            with self._visited_lock:
+                dir_key = (stat.st_dev, stat.st_ino)
+                if dir_key in self._visited:
+                    return None
+                self._visited.add(dir_key)
+        try:
+            return self._executor.submit(self._list_directory, dir_path)
+        except RuntimeError:
+            # 탐색이 끝나 executor가 종료된 뒤의 요청
+            return None
+
+    def _list_directory(self, dir_path):
+        """ 폴더 하나를 읽어 (대상 파일 목록, 하위 폴더 작업 목록)을 반환합니다. 작업자 스레드에서 실행됩니다. """
+        files = []
+        subdirs = []
+        started = time.perf_counter()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        is_link = entry.is_symlink() or getattr(entry, 'is_junction', lambda: False)()
+                        if is_link and not self.follow_symlinks:
+                            continue
+                        if self.skip_hidden and is_hidden_folder(entry):
+                            continue
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(self.suffixes):
+                        files.append(entry)
+        except OSError:
+            # 읽을 수 없는 폴더는 os.walk와 같이 건너뜀
+            metrics.count("walk.errors")
+            return files, []
+        with self._visited_lock:
+            self.listed_dirs.add(os.path.normpath(dir_path))
+        metrics.observe("walk.list_dir", time.perf_counter() - started)
+        metrics.count("walk.dirs")
+        metrics.count("walk.files", len(files))
+        child_futures = [self._submit(subdir) for subdir in subdirs]
+        return files, [future for future in child_futures if future is not None]
+
+def find_removed_paths(missing_paths, listed_dirs):
+    """ 탐색에서 나오지 않은 경로 중 실제로 지워진 것만 골라 반환합니다.
+    부모 폴더의 목록을 읽었거나, 부모 폴더가 없어졌고 그 위로 목록을 읽은 폴더가 있을 때만 지워진 것으로 봅니다.
+    (읽을 수 없는 폴더, 숨김 폴더 건너뛰기, 연결이 끊긴 네트워크 공유 아래의 파일은 남겨 둠) """
+    dir_states = {}
+
+    def is_removed_dir(dir_path):
+        removed = dir_states.get(dir_path)
+        if removed is None:
+            if dir_path in listed_dirs:
+                removed = True
+            elif os.path.isdir(dir_path):
+                removed = False  # 있지만 읽지 못했거나 건너뛴 폴더
+            else:
+                parent_path = os.path.dirname(dir_path)
+                removed = parent_path != dir_path and is_removed_dir(parent_path)
+            dir_states[dir_path] = removed
+        return removed
+
+    return [path for path in missing_paths if is_removed_dir(os.path.normpath(os.path.dirname(path)))]
+
+def iter_scan_events(folders, worker_count=DEFAULT_SCAN_WORKERS, follow_symlinks=False, skip_hidden=False,
+                     use_index=True, index_path=None, extra_fields=()):
+    """ 스캔 파이프라인. 진행 상황을 이벤트로 돌려줍니다.
+    1) 파일 목록을 먼저 수집해 (수집 중에는 ("listing", 개수)) ("total", 개수)를 보내고
+    2) 색인 결과와 EXIF 분석 결과를 입력 순서대로
+       ("batch", [(경로, 카메라, 렌즈, (크기, 수정 시각), extra_fields 값 튜플), ...])로 보낸 뒤
+    3) ("success", 메시지)로 끝납니다. 오류는 예외로 전달됩니다.
+    extra_fields: 카메라/렌즈 외에 읽을 그룹 기준 필드 (fields.EXTRA_FIELDS 중에서)
+    분석 결과에는 손대지 않으므로 받는 쪽(GUI 스레드, 명령줄 도구)에서 batch를 병합합니다. """
+    start_time = time.perf_counter()
+    extra_fields = tuple(extra_fields)
+    check_fields(extra_fields)
+    
+    # 이전 스캔 색인 읽기 (색인을 쓸 수 없어도 스캔은 계속 진행)
+    index_conn = None
+    index_entries = {}
+    try:
+        if use_index:
+            with metrics.timer("scan.index_load"):
+                index_conn = open_scan_index(index_path)
+                index_entries = load_scan_index(index_conn, folders)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Scan index unavailable, reading all files: {e}")
+        if index_conn is not None:
+            index_conn.close()
+            index_conn = None
+    
+    # 1단계: 파일 목록 수집 (순서는 기존 직렬 스캔과 동일)
+    # 크기와 수정 시각이 색인과 같으면 저장된 분류 결과를 그대로 사용
+    # 이름이 같은 다른 파일은 모두 포함 (내용이 같은 파일은 duplicates.find_duplicates로 찾음)
+    file_paths = []
+    path_stats = []
+    cached_results = []
+    paths_to_read = []
+    # 크기/수정 시각은 같지만 이번에 고른 필드가 색인에 없는 파일의 기존 필드 값 (다시 읽은 값과 합쳐 저장)
+    stored_fields = {}
+    seen_paths = set()
+    crawler = DirectoryCrawler(worker_count, follow_symlinks=follow_symlinks, skip_hidden=skip_hidden)
+    listing_started = last_report = time.perf_counter()
+    for entry in crawler.iter_files(folders):
+        file_path = entry.path
+        # 겹치는 소스 폴더(상위/하위 폴더를 모두 추가한 경우)에서 같은 경로가 다시 나오면 건너뜀
+        if file_path not in seen_paths:
+            seen_paths.add(file_path)
+            file_paths.append(file_path)
+            try:
+                stat = entry.stat()
+                file_stat = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                file_stat = None
+            path_stats.append(file_stat)
+            cached = index_entries.get(file_path)
+            if cached is not None and file_stat is not None and cached[:2] == file_stat:
+                cached_fields = cached[4]
+                if all(field in cached_fields for field in extra_fields):
+                    cached_results.append((cached[2], cached[3], tuple(cached_fields[field] for field in extra_fields)))
+                    continue
+                stored_fields[file_path] = cached_fields
+            cached_results.append(None)
+            paths_to_read.append(file_path)
+        now = time.perf_counter()
+        if now - last_report >= SCAN_BATCH_INTERVAL:
+            yield ("listing", len(file_paths))
+            last_report = now
+    metrics.observe("scan.listing", time.perf_counter() - listing_started)
+    # RAW+JPEG 쌍은 한 그룹으로 묶도록 맨 뒤로 옮겨 쌍끼리 붙여 둠 (쌍 안에서는 JPEG 먼저)
+    pair_keys = find_pair_keys(file_paths)
+    if pair_keys:
+        def pair_order(i):
+            pair_key = pair_keys.get(file_paths[i])
+            if pair_key is None:
+                return (False, '', False)
+            return (True, pair_key, not file_paths[i].lower().endswith(JPEG_SUFFIXES))
+        order = sorted(range(len(file_paths)), key=pair_order)
+        file_paths = [file_paths[i] for i in order]
+        path_stats = [path_stats[i] for i in order]
+        cached_results = [cached_results[i] for i in order]
+        paths_to_read = [file_path for file_path, cached in zip(file_paths, cached_results) if cached is None]
+    pair_sizes = Counter(pair_keys.values())
+    metrics.count("scan.files", len(file_paths))
+    metrics.count("scan.from_index", len(file_paths) - len(paths_to_read))
+    yield ("total", len(file_paths))
+    
+    # 2단계: 새 파일과 변경된 파일만 작업자 풀에서 EXIF 분석
+    # 결과는 입력 순서대로 배치에 담으므로 그룹 내 파일 순서까지 직렬 스캔과 같음
+    new_index_entries = []
+    group_keys = set()
+    batch = []
+    pair_rows = []
+    last_flush = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        read_results = map_in_order(executor, partial(analyze_file, extra_fields=extra_fields),
+                                    paths_to_read, worker_count * 16)
+        for file_path, file_stat, cached in zip(file_paths, path_stats, cached_results):
+            if cached is not None:
+                camera_info, lens_info, field_values = cached
+            else:
+                camera_info, lens_info, field_values, readable = next(read_results)
+                if readable and file_stat is not None:
+                    # 다른 필드 조합으로 읽어 둔 값은 남겨서 필드를 바꿔 가며 스캔해도 다시 읽지 않음
+                    stored = {**stored_fields.get(file_path, {}), **dict(zip(extra_fields, field_values))}
+                    new_index_entries.append((file_path, file_stat[0], file_stat[1], camera_info, lens_info, stored))
+            row = (file_path, camera_info, lens_info, file_stat or (0, 0), field_values)
+            pair_key = pair_keys.get(file_path)
+            if pair_key is None:
+                rows = (row,)
+            else:
+                # 쌍의 마지막 파일까지 분석한 뒤 한 그룹으로 맞춰 함께 보냄 (색인에는 파일별 분류를 저장)
+                pair_rows.append(row)
+                if len(pair_rows) < pair_sizes[pair_key]:
+                    continue
+                rows = resolve_pair_rows(pair_rows)
+                pair_rows = []
+            for row in rows:
+                group_keys.add(row[1:3])
+                batch.append(row)
+            
+            now = time.perf_counter()
+            if len(batch) >= SCAN_BATCH_SIZE or now - last_flush >= SCAN_BATCH_INTERVAL:
+                yield ("batch", batch)
+                batch = []
+                last_flush = now
+    if batch:
+        yield ("batch", batch)
+    
+    # 색인 갱신
+    if index_conn is not None:
+        try:
+            removed_paths = find_removed_paths((path for path in index_entries if path not in seen_paths),
+                                               crawler.listed_dirs)
+            with metrics.timer("scan.index_update"):
+                update_scan_index(index_conn, new_index_entries, removed_paths)
+        except sqlite3.Error as e:
+            print(f"Failed to update scan index: {e}")
+        finally:
+            index_conn.close()
+    
+    elapsed = time.perf_counter() - start_time
+    metrics.observe("scan.total", elapsed)
+    files_per_second = len(file_paths) / elapsed if elapsed > 0 else 0
+    
+    # 완료 메시지
+    camera_count = len({camera_info for camera_info, _ in group_keys})
+    result_message = (f"Analysis complete: {len(file_paths)} photos processed "
+                      f"({len(file_paths) - len(paths_to_read)} from index, {len(paths_to_read)} read). "
+                      f"{camera_count} cameras, {len(group_keys)} lens groups. "
+                      f"({elapsed:.1f}s, {files_per_second:.0f} files/s, {worker_count} workers)")
+    yield ("success", result_message)
+
+def scan_folders(folders, library=None, **scan_options):
+    """ 폴더를 스캔해 PhotoLibrary에 채웁니다. (명령줄 도구 등 GUI 없이 쓰는 경우)
+    scan_options는 iter_scan_events의 인자와 같고, extra_fields는 라이브러리의 필드를 씁니다.
+    (라이브러리, 완료 메시지)를 반환합니다. """
+    if library is None:
+        library = PhotoLibrary()
+    message = ""
+    for event in iter_scan_events(folders, extra_fields=library.extra_fields, **scan_options):
+        if event[0] == "batch":
+            for file_path, camera_info, lens_info, file_stat, field_values in event[1]:
+                library.add_file(file_path, camera_info, lens_info, file_stat, field_values)
+        elif event[0] == "success":
+            message = event[1]
+    return library, message
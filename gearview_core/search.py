@@ -0,0 +1,60 @@
+"""
+필터/검색: 스캔 결과를 카메라, 렌즈, 촬영 날짜 범위, 파일명 부분 문자열로 거릅니다.
+
+행을 하나씩 훑지 않도록 PhotoLibrary가 역색인을 유지합니다.
+  - 카메라/렌즈: 이름 번호별 그룹 (카메라 > 렌즈 > 행 번호 배열)에서 이름이 맞는 그룹만 고름
+  - 촬영 날짜: 날짜 값 번호 -> 행 번호 배열, 범위에 드는 날짜 값만 고름
+  - 파일명: 3글자 조각(trigram) -> 행 번호 배열 (SubstringIndex)
+검색 결과는 PhotoLibrary.filter()가 돌려주는 LibraryView입니다. (library.py)
+"""
+
+import re
+from array import array
+from collections import defaultdict
+from functools import partial
+
+# 날짜 범위 경계: "YYYY", "YYYY-MM", "YYYY-MM-DD"
+DATE_BOUND_PATTERN = re.compile(r'\d{4}(-\d{2}(-\d{2})?)?')
+
+def check_date_bound(bound):
+    """ 잘못된 날짜 경계면 ValueError """
+    if bound and not DATE_BOUND_PATTERN.fullmatch(bound):
+        raise ValueError(f"Invalid date '{bound}' (use YYYY, YYYY-MM or YYYY-MM-DD)")
+
+def date_in_range(date, date_from, date_to):
+    """ "YYYY-MM-DD" 날짜가 범위에 드는지. 경계는 앞부분만 비교하므로 date_to="2019"는 2019년 말까지 포함 """
+    return (not date_from or date >= date_from) and (not date_to or date[:len(date_to)] <= date_to)
+
+class SubstringIndex:
+    """ 부분 문자열 검색용 trigram 역색인 (대소문자 무시)
+    지운 항목은 바로 빼지 않고(stale_count만 셈) 후보에 남으므로, 호출하는 쪽에서 실제 문자열로 확인합니다. """
+
+    def __init__(self):
+        self._postings = defaultdict(partial(array, 'I'))
+        self.stale_count = 0
+
+    def add(self, item_id, text):
+        text = text.lower()
+        postings = self._postings
+        # 3글자보다 짧은 문자열은 통째로 한 조각
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)} or (text,):
+            postings[gram].append(item_id)
+
+    def candidates(self, query):
+        """ query를 포함할 수 있는 항목 번호 집합 """
+        query = query.lower()
+        if len(query) < 3:
+            # 짧은 검색어는 그것을 포함하는 조각들의 합집합
+            candidates = set()
+            for gram, posting in self._postings.items():
+                if query in gram:
+                    candidates.update(posting)
+            return candidates
+        # 모든 조각의 교집합 (가장 짧은 목록부터)
+        postings = sorted((self._postings.get(query[i:i + 3], ()) for i in range(len(query) - 2)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
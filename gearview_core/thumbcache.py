@@ -0,0 +1,179 @@
+"""
+디스크 썸네일 캐시: 세션이 바뀌어도 미리보기를 원본에서 다시 만들지 않도록 저장
+
+freedesktop 썸네일 규격과 같은 형식을 씁니다.
+  <캐시 폴더>/thumbnails/large/<파일 URI의 MD5>.png  (긴 변 256px, Thumb::URI/MTime/Size 포함)
+원본의 수정 시각이나 크기가 저장된 값과 다르면 무효입니다.
+리눅스에서는 파일 관리자가 ~/.cache/thumbnails 에 만들어 둔 썸네일도 읽기만 합니다
+(다른 프로그램과 공유하는 폴더이므로 쓰거나 지우지 않음).
+"""
+
+import hashlib
+import os
+import pathlib
+import platform
+import tempfile
+import threading
+
+from PIL import Image, PngImagePlugin
+
+from .paths import get_cache_dir, get_xdg_cache_home
+
+# freedesktop 'large' 썸네일 크기 (미리보기 200x150보다 큼)
+THUMBNAIL_SIZE = (256, 256)
+THUMBNAIL_FLAVOR = 'large'
+# 캐시 폴더 최대 크기, 넘으면 오래 안 쓴 썸네일부터 지움 (256px PNG 하나에 약 100KB)
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# 정리할 때 최대 크기의 이 비율까지 줄임 (썸네일을 만들 때마다 정리하지 않도록)
+THUMBNAIL_CACHE_TRIM_RATIO = 0.9
+
+def get_file_uri(file_path):
+    return pathlib.Path(os.path.abspath(file_path)).as_uri()
+
+def get_thumbnail_name(file_path):
+    """ freedesktop 규격의 썸네일 파일명 (파일 URI의 MD5 + .png) """
+    return hashlib.md5(get_file_uri(file_path).encode('utf-8')).hexdigest() + '.png'
+
+def get_shared_thumbnail_dirs():
+    """ 다른 프로그램이 만든 freedesktop 썸네일 폴더 (리눅스 등에서만, 읽기 전용) """
+    if platform.system() in ('Windows', 'Darwin'):
+        return []
+    base_dir = os.path.join(get_xdg_cache_home(), 'thumbnails')
+    return [os.path.join(base_dir, flavor) for flavor in ('large', 'x-large', 'xx-large')]
+
+class ThumbnailCache:
+    """ 원본 경로/크기/수정 시각으로 검증하는 디스크 썸네일 캐시 (LRU 방식 크기 제한).
+    파일 단위로 원자적으로 쓰므로 여러 스레드와 프로세스가 함께 써도 됩니다. """
+
+    def __init__(self, cache_dir=None, max_bytes=THUMBNAIL_CACHE_MAX_BYTES, read_shared=True):
+        cache_dir = cache_dir or get_cache_dir()
+        self.thumbnail_dir = os.path.join(cache_dir, 'thumbnails', THUMBNAIL_FLAVOR)
+        self.max_bytes = max_bytes
+        self.shared_dirs = get_shared_thumbnail_dirs() if read_shared else []
+        self._total_bytes = None  # 처음 쓸 때 폴더를 한 번 훑어 계산
+        self._lock = threading.Lock()
+
+    def get(self, file_path):
+        """ 원본이 바뀌지 않았으면 저장된 썸네일(PIL Image)을, 없으면 None을 반환합니다. """
+        try:
+            source_stat = os.stat(file_path)
+        except OSError:
+            return None
+        name = get_thumbnail_name(file_path)
+        for thumbnail_dir in [self.thumbnail_dir] + self.shared_dirs:
+            thumbnail_path = os.path.join(thumbnail_dir, name)
+            image = self._load_valid(thumbnail_path, source_stat)
+            if image is not None:
+                if thumbnail_dir == self.thumbnail_dir:
+                    self._touch(thumbnail_path)
+                return image
+        return None
+
+    def put(self, file_path, image):
+        """ 썸네일을 저장합니다. image는 THUMBNAIL_SIZE 이하로 줄여서 저장됩니다. """
+        try:
+            source_stat = os.stat(file_path)
+        except OSError:
+            return
+        image = image.copy()
+        image.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        info = PngImagePlugin.PngInfo()
+        info.add_text('Thumb::URI', get_file_uri(file_path))
+        info.add_text('Thumb::MTime', str(int(source_stat.st_mtime)))
+        info.add_text('Thumb::Size', str(source_stat.st_size))
+        info.add_text('Thumb::Image::Width', str(image.width))
+        info.add_text('Thumb::Image::Height', str(image.height))
+        info.add_text('Software', 'GearView')
+
+        # 같은 폴더의 임시 파일에 쓰고 이름을 바꿔 반쯤 쓴 썸네일이 읽히지 않게 함
+        thumbnail_path = os.path.join(self.thumbnail_dir, get_thumbnail_name(file_path))
+        try:
+            os.makedirs(self.thumbnail_dir, mode=0o700, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.png', dir=self.thumbnail_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, 'PNG', pnginfo=info)
+                os.replace(temp_path, thumbnail_path)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            thumbnail_bytes = os.path.getsize(thumbnail_path)
+        except Exception as e:
+            # 디스크 오류뿐 아니라 PNG로 저장할 수 없는 이미지(ValueError 등)도 미리보기를 멈추지 않도록 기록만 함
+            print(f"Error writing thumbnail for {file_path}: {e}")
+            return
+        self._add_bytes(thumbnail_bytes)
+
+    def clear(self):
+        """ 이 프로그램의 캐시 폴더에 있는 썸네일을 모두 지웁니다. """
+        with self._lock:
+            for entry in self._list_thumbnails():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def _load_valid(self, thumbnail_path, source_stat):
+        try:
+            image = Image.open(thumbnail_path)
+            image.load()
+        except (OSError, SyntaxError, ValueError):
+            return None
+        text = getattr(image, 'text', {})
+        try:
+            if int(float(text['Thumb::MTime'])) != int(source_stat.st_mtime):
+                return None
+            if 'Thumb::Size' in text and int(text['Thumb::Size']) != source_stat.st_size:
+                return None
+        except (KeyError, ValueError):
+            return None
+        return image
+
+    def _touch(self, thumbnail_path):
+        """ 썸네일 파일의 수정 시각을 최근 사용 시각으로 씀 (LRU 정리 기준) """
+        try:
+            os.utime(thumbnail_path)
+        except OSError:
+            pass
+
+    def _list_thumbnails(self):
+        try:
+            with os.scandir(self.thumbnail_dir) as entries:
+                return [entry for entry in entries if entry.name.endswith('.png') and entry.is_file()]
+        except OSError:
+            return []
+
+    def _add_bytes(self, added_bytes):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry.stat().st_size for entry in self._list_thumbnails())
+            else:
+                self._total_bytes += added_bytes
+            if self._total_bytes > self.max_bytes:
+                self._trim()
+
+    def _trim(self):
+        """ 오래 안 쓴 썸네일부터 지워 최대 크기의 THUMBNAIL_CACHE_TRIM_RATIO 이하로 줄입니다. """
+        thumbnails = []
+        for entry in self._list_thumbnails():
+            try:
+                entry_stat = entry.stat()
+            except OSError:
+                continue
+            thumbnails.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+        thumbnails.sort()
+        total_bytes = sum(size for _, size, _ in thumbnails)
+        limit = self.max_bytes * THUMBNAIL_CACHE_TRIM_RATIO
+        for _, size, path in thumbnails:
+            if total_bytes <= limit:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                pass
+        self._total_bytes = total_bytes
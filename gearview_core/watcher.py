@@ -0,0 +1,409 @@
+"""
+소스 폴더 감시: 스캔이 끝난 뒤 새로 생기거나 바뀌거나 지워진 파일만 분석해 알려줍니다.
+
+Linux는 inotify(ctypes로 libc 호출, 추가 패키지 없음)로 폴더마다 감시를 걸고,
+그 밖의 OS이거나 감시 수 한도(fs.inotify.max_user_watches)를 넘으면 주기적으로 폴더 목록을 비교하는 폴링을 씁니다.
+이벤트는 WATCH_SETTLE_TIME 동안 모아서 처리하므로 복사 중인 파일을 여러 번 읽지 않습니다.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .exif import JPEG_SUFFIXES, RAW_SUFFIXES
+from .index import open_scan_index, update_scan_index
+from .metrics import metrics
+from .pairs import find_pair_keys, group_pair_rows
+from .scanner import DirectoryCrawler, analyze_file, find_removed_paths, SCAN_SUFFIXES, SYSTEM_FOLDER_NAMES
+
+# linux/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+              | IN_MOVE_SELF | IN_ONLYDIR)
+# struct inotify_event 헤더 (wd, mask, cookie, len) 뒤에 len 바이트의 파일명
+INOTIFY_EVENT = struct.Struct('iIII')
+INOTIFY_READ_SIZE = 64 * 1024
+
+# 마지막 이벤트 후 이 시간 동안 조용하면 모은 변경을 처리 (초), 이벤트가 계속 와도 WATCH_MAX_DELAY마다 처리
+WATCH_SETTLE_TIME = 0.5
+WATCH_MAX_DELAY = 2.0
+# 폴링 방식에서 폴더 목록을 다시 비교하는 간격 (초)
+DEFAULT_POLL_INTERVAL = 10.0
+# 바뀐 파일의 EXIF를 읽는 작업자 수
+DEFAULT_WATCH_WORKERS = 4
+
+class Inotify:
+    """ libc의 inotify 호출 래퍼 (Linux 전용) """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+    def add_watch(self, path, mask):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number), path)
+        return wd
+
+    def remove_watch(self, wd):
+        # 이미 지워진 폴더면 커널이 감시를 먼저 없애므로 실패는 무시
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """ 쌓인 이벤트를 [(wd, mask, 파일명), ...]로 읽습니다. 없으면 빈 목록 """
+        try:
+            data = os.read(self.fd, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """ 소스 폴더를 감시해 바뀐 파일만 분석하고 on_changes(rows, removed_paths)를 감시 스레드에서 호출합니다.
+    rows: 새 파일과 바뀐 파일의 [(경로, 카메라, 렌즈, (크기, 수정 시각), extra_fields 값 튜플), ...],
+    removed_paths: 사라진 경로 목록
+    (받는 쪽은 removed_paths를 먼저 반영한 뒤 rows를 반영합니다.)
+    known_files: 스캔 결과 [(경로, (크기, 수정 시각)), ...] - 감시 시작 전에 바뀐 파일을 찾고, 크기/수정 시각이
+    그대로인 파일은 이벤트가 와도 다시 읽지 않는 데 씁니다. 분석한 결과는 스캔 색인에도 저장합니다. """
+
+    def __init__(self, folders, on_changes, known_files=(), follow_symlinks=False, skip_hidden=False,
+                 use_inotify=True, poll_interval=DEFAULT_POLL_INTERVAL, worker_count=DEFAULT_WATCH_WORKERS,
+                 use_index=True, index_path=None, suffixes=SCAN_SUFFIXES, extra_fields=()):
+        self.folders = list(folders)
+        self.on_changes = on_changes
+        self.follow_symlinks = follow_symlinks
+        self.skip_hidden = skip_hidden
+        self.use_inotify = use_inotify and sys.platform.startswith('linux')
+        self.poll_interval = poll_interval
+        self.worker_count = max(1, worker_count)
+        self.use_index = use_index
+        self.index_path = index_path
+        self.suffixes = suffixes
+        self.extra_fields = tuple(extra_fields)
+        # 감시 방식: 시작 전 None, 감시 스레드가 "inotify" 또는 "polling"으로 정함
+        self.mode = None
+        self._known_files = known_files
+        self._known = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._index_conn = None
+        # inotify 감시 번호 <-> 폴더 경로
+        self._watch_paths = {}
+        self._watch_ids = {}
+        self._visited = set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ 감시를 멈춥니다. (처리 중인 변경이 있으면 그것까지만 마치고 스레드가 끝남) """
+        self._stop_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        # 감시하지 않는 폴더(스캔 뒤 목록에서 뺀 소스 폴더)의 파일은 사라진 것으로 보지 않도록 제외
+        prefixes = tuple(os.path.join(folder_path, '') for folder_path in self.folders)
+        self._known = {file_path: tuple(file_stat) for file_path, file_stat in self._known_files
+                       if file_path.startswith(prefixes)}
+        self._known_files = None
+        if self.use_index:
+            try:
+                self._index_conn = open_scan_index(self.index_path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Scan index unavailable, watching without it: {e}")
+        try:
+            with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
+                self._executor = executor
+                inotify = self._start_inotify() if self.use_inotify else None
+                if inotify is not None:
+                    try:
+                        self._run_inotify(inotify)
+                    finally:
+                        inotify.close()
+                else:
+                    self.mode = "polling"
+                    self._run_polling()
+        finally:
+            if self._index_conn is not None:
+                self._index_conn.close()
+
+    def _start_inotify(self):
+        """ 모든 폴더에 감시를 겁니다. inotify를 쓸 수 없으면 None (폴링으로 대체) """
+        try:
+            inotify = Inotify()
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable, polling for changes instead: {e}")
+            return None
+        try:
+            for folder_path in self.folders:
+                self._watch_tree(inotify, folder_path)
+        except OSError as e:
+            # 대부분 감시 수 한도 (ENOSPC)
+            print(f"Cannot watch all folders with inotify, polling for changes instead: {e}")
+            inotify.close()
+            self._watch_paths.clear()
+            self._watch_ids.clear()
+            return None
+        self.mode = "inotify"
+        return inotify
+
+    def _is_skipped_folder(self, name):
+        return self.skip_hidden and (name.startswith('.') or name in SYSTEM_FOLDER_NAMES)
+
+    def _watch_tree(self, inotify, root_path):
+        """ 폴더와 하위 폴더에 감시를 걸고, 그 안에 이미 있는 대상 파일 경로 목록을 반환합니다.
+        감시를 걸 수 없으면(한도 초과 등) OSError가 발생합니다. 폴더가 그사이 사라진 경우는 건너뜁니다. """
+        file_paths = []
+        pending_dirs = [root_path]
+        mask = WATCH_MASK if self.follow_symlinks else WATCH_MASK | IN_DONT_FOLLOW
+        while pending_dirs:
+            dir_path = pending_dirs.pop()
+            if self.follow_symlinks:
+                # 링크 순환 방지
+                try:
+                    stat = os.stat(dir_path)
+                except OSError:
+                    continue
+                if (stat.st_dev, stat.st_ino) in self._visited:
+                    continue
+                self._visited.add((stat.st_dev, stat.st_ino))
+            try:
+                wd = inotify.add_watch(dir_path, mask)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            self._watch_paths[wd] = dir_path
+            self._watch_ids[dir_path] = wd
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            if (entry.is_symlink() and not self.follow_symlinks) or self._is_skipped_folder(entry.name):
+                                continue
+                            pending_dirs.append(entry.path)
+                        elif entry.name.lower().endswith(self.suffixes):
+                            file_paths.append(entry.path)
+            except OSError:
+                continue
+        return file_paths
+
+    def _unwatch_tree(self, inotify, root_path):
+        """ 옮겨졌거나 지워진 폴더와 하위 폴더의 감시를 해제합니다. """
+        prefix = os.path.join(root_path, '')
+        for dir_path in [path for path in self._watch_ids if path == root_path or path.startswith(prefix)]:
+            wd = self._watch_ids.pop(dir_path)
+            self._watch_paths.pop(wd, None)
+            inotify.remove_watch(wd)
+        self._visited.clear()  # 다시 만들어진 폴더를 감시할 수 있도록
+
+    def _run_inotify(self, inotify):
+        # 스캔이 끝난 뒤 감시를 걸기 전까지 바뀐 파일
+        self._resync()
+        pending_paths = set()
+        removed_dirs = []
+        first_event_time = last_event_time = None
+        while not self._stop_event.is_set():
+            timeout = WATCH_SETTLE_TIME if first_event_time is not None else 0.5
+            readable, _, _ = select.select([inotify.fd], [], [], timeout)
+            overflowed = False
+            if readable:
+                for wd, mask, name in inotify.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        overflowed = True
+                        continue
+                    dir_path = self._watch_paths.get(wd)
+                    if dir_path is None:
+                        continue
+                    if mask & IN_IGNORED:
+                        self._watch_paths.pop(wd, None)
+                        if self._watch_ids.get(dir_path) == wd:
+                            del self._watch_ids[dir_path]
+                        continue
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        # 소스 폴더 자체가 지워지거나 옮겨진 경우 (하위 폴더는 상위 폴더 이벤트로도 처리됨)
+                        removed_dirs.append(dir_path)
+                        self._unwatch_tree(inotify, dir_path)
+                        continue
+                    path = os.path.join(dir_path, name)
+                    if mask & IN_ISDIR:
+                        if mask & (IN_MOVED_FROM | IN_DELETE):
+                            removed_dirs.append(path)
+                            self._unwatch_tree(inotify, path)
+                        elif mask & (IN_CREATE | IN_MOVED_TO) and not self._is_skipped_folder(name):
+                            # 새 폴더 (또는 옮겨 온 폴더): 감시를 걸고 이미 들어 있는 파일도 처리
+                            try:
+                                pending_paths.update(self._watch_tree(inotify, path))
+                            except OSError as e:
+                                print(f"Cannot watch {path}: {e}")
+                    elif name.lower().endswith(self.suffixes):
+                        pending_paths.add(path)
+                now = time.perf_counter()
+                if first_event_time is None:
+                    first_event_time = now
+                last_event_time = now
+            if overflowed:
+                # 놓친 이벤트가 있으므로 폴더 목록 전체를 비교
+                metrics.count("watch.overflows")
+                pending_paths.clear()
+                removed_dirs.clear()
+                first_event_time = None
+                self._resync()
+                continue
+            if first_event_time is None:
+                continue
+            now = time.perf_counter()
+            if now - last_event_time >= WATCH_SETTLE_TIME or now - first_event_time >= WATCH_MAX_DELAY:
+                self._flush(pending_paths, removed_dirs)
+                pending_paths = set()
+                removed_dirs = []
+                first_event_time = None
+
+    def _run_polling(self):
+        self._resync()
+        while not self._stop_event.wait(self.poll_interval):
+            self._resync()
+
+    def _resync(self):
+        """ 폴더 목록을 다시 읽어 알고 있는 파일 목록과 비교합니다. (폴링, 감시 시작, inotify 큐 넘침) """
+        started = time.perf_counter()
+        crawler = DirectoryCrawler(self.worker_count, follow_symlinks=self.follow_symlinks,
+                                   skip_hidden=self.skip_hidden, suffixes=self.suffixes)
+        current_paths = set()
+        changed = []
+        for entry in crawler.iter_files(self.folders):
+            if self._stop_event.is_set():
+                return
+            if entry.path in current_paths:
+                continue  # 겹치는 소스 폴더
+            current_paths.add(entry.path)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            file_stat = (stat.st_size, stat.st_mtime_ns)
+            if self._known.get(entry.path) != file_stat:
+                changed.append((entry.path, file_stat))
+        # 읽지 못한 폴더(권한, 연결이 끊긴 공유)의 파일은 사라진 것으로 보지 않음
+        removed_paths = find_removed_paths([file_path for file_path in self._known if file_path not in current_paths],
+                                           crawler.listed_dirs)
+        metrics.observe("watch.resync", time.perf_counter() - started)
+        self._apply(changed, removed_paths)
+
+    def _flush(self, pending_paths, removed_dirs):
+        """ 모아 둔 inotify 이벤트를 처리합니다. 경로마다 지금 상태를 확인하므로 이벤트 순서는 따지지 않습니다. """
+        removed_paths = set()
+        for dir_path in removed_dirs:
+            prefix = os.path.join(dir_path, '')
+            removed_paths.update(file_path for file_path in self._known if file_path.startswith(prefix))
+        changed = []
+        for file_path in pending_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                if file_path in self._known:
+                    removed_paths.add(file_path)
+                continue
+            file_stat = (stat.st_size, stat.st_mtime_ns)
+            if self._known.get(file_path) != file_stat:
+                changed.append((file_path, file_stat))
+        # 옮겨진 폴더가 다시 들어온 경우 등 지금 있는 파일은 제거 대상에서 뺌
+        removed_paths.difference_update(file_path for file_path, _ in changed)
+        removed_paths = [file_path for file_path in removed_paths if not os.path.exists(file_path)]
+        self._apply(changed, removed_paths)
+
+    def _find_pair_partners(self, changed, removed_paths):
+        """ 바뀌거나 지워진 파일과 RAW+JPEG 쌍인(이었던), 바뀌지 않은 파일을 [(경로, (크기, 수정 시각)), ...]로 찾습니다.
+        쌍은 한 파일만 이벤트가 와도 같은 폴더의 알고 있는 파일과 맞춰 보아야 다른 쪽이 이전 그룹에 남지 않습니다. """
+        changed_paths = [file_path for file_path, _ in changed] + list(removed_paths)
+        pair_paths = [file_path for file_path in changed_paths
+                      if file_path.lower().endswith(RAW_SUFFIXES + JPEG_SUFFIXES)]
+        if not pair_paths:
+            return []
+        dir_paths = {os.path.dirname(file_path) for file_path in pair_paths}
+        skipped_paths = set(changed_paths)
+        sibling_paths = [file_path for file_path in self._known
+                         if file_path not in skipped_paths and os.path.dirname(file_path) in dir_paths]
+        pair_keys = find_pair_keys(pair_paths + sibling_paths)
+        changed_keys = {pair_keys[file_path] for file_path in pair_paths if file_path in pair_keys}
+        return [(file_path, self._known[file_path]) for file_path in sibling_paths
+                if pair_keys.get(file_path) in changed_keys]
+
+    def _apply(self, changed, removed_paths):
+        """ 바뀐 파일의 EXIF만 읽어 알고 있는 목록과 색인을 갱신하고 on_changes를 호출합니다. """
+        if not changed and not removed_paths:
+            return
+        started = time.perf_counter()
+        rows = []
+        index_entries = []
+        # 바뀌지 않은 쌍의 다른 파일도 다시 읽어 함께 보냄 (색인과 알고 있는 목록은 그대로)
+        partners = self._find_pair_partners(changed, removed_paths)
+        results = self._executor.map(partial(analyze_file, extra_fields=self.extra_fields),
+                                     [file_path for file_path, _ in changed + partners])
+        for i, ((file_path, file_stat), (camera_info, lens_info, field_values, readable)) in enumerate(
+                zip(changed + partners, results)):
+            rows.append((file_path, camera_info, lens_info, file_stat, field_values))
+            if i >= len(changed):
+                continue
+            self._known[file_path] = file_stat
+            if readable:
+                index_entries.append((file_path, file_stat[0], file_stat[1], camera_info, lens_info,
+                                      dict(zip(self.extra_fields, field_values))))
+        for file_path in removed_paths:
+            self._known.pop(file_path, None)
+        if self._index_conn is not None:
+            try:
+                update_scan_index(self._index_conn, index_entries, removed_paths)
+            except sqlite3.Error as e:
+                print(f"Failed to update scan index: {e}")
+        metrics.count("watch.changed", len(rows))
+        metrics.count("watch.removed", len(removed_paths))
+        metrics.observe("watch.apply", time.perf_counter() - started)
+        if not self._stop_event.is_set():
+            # 함께 들어온 RAW+JPEG 쌍은 스캔과 같이 한 그룹으로 (색인에는 파일별 분류를 저장)
+            self.on_changes(group_pair_rows(rows), list(removed_paths))
@@ -0,0 +1,57 @@
+import os
+import sys
+import types
+
+import pytest
+from PIL import Image, ExifTags
+
+# 저장소 루트에서 import (설치하지 않고 테스트)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# GearView.py는 실행하자마자 창을 만들고 mainloop에 들어가므로 이 줄 앞까지만 실행
+GUI_MARKER = "# --- GUI 생성 ---"
+
+@pytest.fixture
+def gearview(tmp_path, monkeypatch):
+    """ GearView.py의 함수와 전역 상태만 담은 모듈 (창과 위젯은 만들지 않음) """
+    # 설정/색인 파일이 실제 사용자 폴더에 쓰이지 않도록 홈 폴더를 임시 폴더로 바꿈
+    home_dir = str(tmp_path / 'home')
+    for name in ('HOME', 'APPDATA', 'LOCALAPPDATA', 'XDG_CONFIG_HOME', 'XDG_CACHE_HOME'):
+        monkeypatch.setenv(name, home_dir)
+    script_path = os.path.join(REPO_ROOT, 'GearView.py')
+    with open(script_path, encoding='utf-8') as f:
+        source = f.read()
+    module = types.ModuleType('gearview_gui')
+    module.__file__ = script_path
+    exec(compile(source[:source.index(GUI_MARKER)], script_path, 'exec'), module.__dict__)
+    # 엔진의 기본 색인 경로는 처음 import할 때 정해지므로 따로 바꿈
+    from gearview_core import index
+    monkeypatch.setattr(index, 'SCAN_INDEX_PATH', os.path.join(home_dir, 'scan_index.sqlite3'))
+    return module
+
+
+def write_photo(file_path, model, lens=None):
+    exif = Image.Exif()
+    exif[0x0110] = model
+    if lens:
+        exif.get_ifd(ExifTags.IFD.Exif)[0xA434] = lens
+    Image.new('RGB', (16, 16), 'blue').save(file_path, 'JPEG', exif=exif)
+
+
+@pytest.fixture
+def photo_folders(tmp_path):
+    """ 폴더 두 개짜리 사진 트리. 첫 번째 폴더의 IMG_0..IMG_11.jpg는 홀수 번호가 Camera A,
+    짝수 번호가 Camera B이고 4의 배수가 아니면 렌즈가 있음. 두 번째 폴더의 IMG_0.jpg는
+    파일명만 겹치는 다른 파일이라 그대로 남으므로 Camera C는 IMG_0.jpg와 IMG_20.JPEG 두 개 """
+    first = tmp_path / 'first'
+    (first / 'sub').mkdir(parents=True)
+    second = tmp_path / 'second'
+    second.mkdir()
+    for i in range(12):
+        folder = first / 'sub' if i % 3 == 0 else first
+        write_photo(str(folder / f'IMG_{i}.jpg'), "Camera A" if i % 2 else "Camera B", "Lens 50mm" if i % 4 else None)
+    write_photo(str(second / 'IMG_0.jpg'), "Camera C")
+    write_photo(str(second / 'IMG_20.JPEG'), "Camera C")
+    (second / 'notes.txt').write_text('not a photo')
+    return [str(first), str(second)]
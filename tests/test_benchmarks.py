@@ -0,0 +1,56 @@
+import io
+import json
+import os
+
+from benchmarks import run_benchmarks
+from benchmarks.corpus import CAMERA_MODELS, LENS_MODELS, generate_corpus
+from gearview_core import find_duplicates, scanner
+
+
+def read_tree(top):
+    contents = {}
+    for root, _, files in os.walk(top):
+        for file in files:
+            with open(os.path.join(root, file), 'rb') as f:
+                contents[os.path.relpath(os.path.join(root, file), top)] = f.read()
+    return contents
+
+
+def test_corpus_is_reproducible_and_scans_to_generated_models(tmp_path):
+    """ 같은 seed면 같은 트리, 스캔하면 생성한 카메라/렌즈(또는 정보 없음)로만 분류되고 겹치는 이름과 사본이 있음 """
+    info = generate_corpus(str(tmp_path / 'a'), file_count=120, folder_count=4, camera_count=3, lens_count=4,
+                           missing_tag_ratio=0.1, duplicate_ratio=0.1)
+    generate_corpus(str(tmp_path / 'b'), file_count=120, folder_count=4, camera_count=3, lens_count=4,
+                    missing_tag_ratio=0.1, duplicate_ratio=0.1)
+    files = read_tree(tmp_path / 'a')
+    assert len(files) == 120 and files == read_tree(tmp_path / 'b')
+    assert info['duplicates_written'] > 0
+    assert len({os.path.basename(path) for path in files}) < len(files)
+
+    library, _ = scanner.scan_folders([str(tmp_path / 'a')], worker_count=4, use_index=False)
+    assert len(library) == 120
+    generated_names = [name for camera in CAMERA_MODELS[:3] for name in camera]
+    assert all(camera == "No camera info" or any(name in camera for name in generated_names)
+               for camera in library.cameras())
+    assert "No camera info" in library.cameras()
+    lens_names = {lens for camera in library.cameras() for lens in library.lenses(camera)}
+    assert lens_names - {"No lens info"} and lens_names <= set(LENS_MODELS[:4]) | {"No lens info"}
+    file_sizes = [(file_path, file_stat[0]) for file_path, _, _, file_stat in library.iter_files()]
+    assert sum(len(group) - 1 for group in find_duplicates(file_sizes)) >= info['duplicates_written']
+
+
+def test_run_benchmarks_writes_selected_phases(tmp_path):
+    """ 고른 단계만 결과에 넣고 (입력 단계는 실행만 함), 결과 JSON을 저장하고 기준 결과와의 배율을 출력 """
+    output_path = str(tmp_path / 'result.json')
+    argv = ['--files', '30', '--phases', 'classify,copy', '--repeat', '1', '--work-dir', str(tmp_path / 'work'),
+            '--output', output_path]
+    assert run_benchmarks.main(argv) == 0
+    with open(output_path, encoding='utf-8') as f:
+        results = json.load(f)
+    assert list(results['phases']) == ['classify', 'copy']
+    assert results['phases']['classify']['items'] == 30 and results['phases']['copy']['items'] == 30
+    assert results['corpus']['files'] == 30
+    report = io.StringIO()
+    run_benchmarks.print_results(results, baseline=results, stream=report)
+    assert report.getvalue().splitlines()[-1].endswith("1.00x")
+    assert run_benchmarks.main(['--phases', 'walk,nope']) == 2
@@ -0,0 +1,98 @@
+import io
+import json
+import os
+
+from PIL import Image
+
+from gearview_core import cli
+from gearview_core.index import load_scan_index, open_scan_index
+
+PHOTOS = {
+    # 파일명: (카메라 모델, 렌즈, 촬영 날짜, 픽셀 색)
+    'a/IMG_0001.JPG': ("Canon EOS R6", "RF24-105mm F4 L IS USM", "2021:05:06 07:08:09", 'red'),
+    'a/IMG_0002.JPG': ("Canon EOS R6", "RF50mm F1.8 STM", "2022:01:02 03:04:05", 'green'),
+    'b/DSC_0003.JPG': ("NIKON Z 7", "NIKKOR Z 24-70mm f/4 S", "2021:07:08 09:10:11", 'blue'),
+    # a/IMG_0001.JPG와 내용이 같은 사본
+    'b/IMG_0001 copy.JPG': ("Canon EOS R6", "RF24-105mm F4 L IS USM", "2021:05:06 07:08:09", 'red'),
+}
+
+
+def make_tree(root):
+    for relative_path, (model, lens, date, color) in PHOTOS.items():
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        exif = Image.Exif()
+        exif[0x0110] = model
+        exif_ifd = exif.get_ifd(0x8769)
+        exif_ifd[0xA434] = lens
+        exif_ifd[0x9003] = date
+        output = io.BytesIO()
+        Image.new('RGB', (32, 24), color).save(output, 'JPEG', exif=exif)
+        file_path.write_bytes(output.getvalue())
+    return str(root)
+
+
+def test_scan_json_and_summary(tmp_path, capsys):
+    source = make_tree(tmp_path / 'src')
+    output_path = tmp_path / 'scan.json'
+    assert cli.main(['scan', source, '--no-index', '-q', '--json', str(output_path)]) == 0
+    document = json.loads(output_path.read_text(encoding='utf-8'))
+    assert document['summary'] == {'files': 4, 'cameras': 2, 'lens_groups': 3}
+    assert sorted(document['cameras']['Canon EOS R6']['RF24-105mm F4 L IS USM']) == [
+        os.path.join(source, 'a', 'IMG_0001.JPG'), os.path.join(source, 'b', 'IMG_0001 copy.JPG')]
+
+    assert cli.main(['scan', source, '--no-index', '-q', '--camera', 'nikon*']) == 0
+    assert capsys.readouterr().out.splitlines() == ["NIKON Z 7 (1 files, 1 lenses)",
+                                                     "    NIKKOR Z 24-70mm f/4 S (1 files)"]
+
+
+def test_scan_group_by(tmp_path, capsys):
+    source = make_tree(tmp_path / 'src')
+    assert cli.main(['scan', source, '--no-index', '-q', '--group-by', 'year,camera']) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "2021 (3 files)", "    Canon EOS R6 (2 files)", "    NIKON Z 7 (1 files)",
+        "2022 (1 files)", "    Canon EOS R6 (1 files)",
+    ]
+    output_path = tmp_path / 'groups.json'
+    assert cli.main(['scan', source, '--no-index', '-q', '--group-by', 'year', '--lens', 'RF*',
+                     '--json', str(output_path)]) == 0
+    document = json.loads(output_path.read_text(encoding='utf-8'))
+    assert document['summary'] == {'files': 3, 'group_by': ['year']}
+    assert {name: group['files'] for name, group in document['groups'].items()} == {'2021': 2, '2022': 1}
+    assert cli.main(['scan', source, '--no-index', '-q', '--group-by', 'shutter']) == 2
+
+
+def test_copy_skip_duplicates(tmp_path):
+    source = make_tree(tmp_path / 'src')
+    target = tmp_path / 'dst'
+    assert cli.main(['copy', source, '--target', str(target), '--skip-duplicates', '--no-index', '-q']) == 0
+    copied = sorted(os.path.relpath(os.path.join(folder, name), target)
+                    for folder, _, names in os.walk(target) for name in names)
+    assert copied == [
+        os.path.join('Canon EOS R6', 'RF24-105mm F4 L IS USM', 'IMG_0001.JPG'),
+        os.path.join('Canon EOS R6', 'RF50mm F1.8 STM', 'IMG_0002.JPG'),
+        os.path.join('NIKON Z 7', 'NIKKOR Z 24-70mm f_4 S', 'DSC_0003.JPG'),
+    ]
+    assert (target / 'NIKON Z 7' / 'NIKKOR Z 24-70mm f_4 S' / 'DSC_0003.JPG').read_bytes() == (
+        tmp_path / 'src' / 'b' / 'DSC_0003.JPG').read_bytes()
+    # 원본은 그대로
+    assert sum(len(names) for _, _, names in os.walk(source)) == 4
+
+
+def test_move_updates_index(tmp_path):
+    source = make_tree(tmp_path / 'src')
+    index_path = str(tmp_path / 'index.sqlite3')
+    target = tmp_path / 'dst'
+    assert cli.main(['move', source, '--target', str(target), '--flat', '--camera', 'nikon*',
+                     '--index', index_path, '-q']) == 0
+    assert os.listdir(target / 'NIKON Z 7') == ['DSC_0003.JPG']
+    assert not os.path.exists(os.path.join(source, 'b', 'DSC_0003.JPG'))
+    # 옮긴 파일은 색인에서도 지움
+    conn = open_scan_index(index_path)
+    try:
+        assert len(load_scan_index(conn, [source])) == 3
+    finally:
+        conn.close()
+    output_path = tmp_path / 'scan.csv'
+    assert cli.main(['scan', source, '--index', index_path, '-q', '--csv', str(output_path)]) == 0
+    assert len(output_path.read_text(encoding='utf-8').splitlines()) == 1 + 3
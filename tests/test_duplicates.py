@@ -0,0 +1,38 @@
+import os
+
+from gearview_core import duplicates
+from gearview_core.duplicates import find_duplicates, get_redundant_copies
+
+
+def write(file_path, data):
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return str(file_path)
+
+
+def test_find_duplicates_by_content(tmp_path):
+    block_size = duplicates.EDGE_BLOCK_SIZE
+    big = os.urandom(3 * block_size)
+    # 앞/뒤 블록은 같고 가운데만 다른 큰 파일 (전체 해시 단계에서만 구분됨)
+    middle_changed = big[:block_size] + os.urandom(block_size) + big[-block_size:]
+    small = b'small photo'
+    files = [
+        write(tmp_path / 'a.jpg', big),
+        write(tmp_path / 'b.jpg', big),
+        write(tmp_path / 'c.jpg', middle_changed),
+        write(tmp_path / 'd.jpg', small),
+        write(tmp_path / 'e.jpg', small),
+        write(tmp_path / 'f.jpg', b'small phot0'),  # 크기는 같고 내용만 다름
+        write(tmp_path / 'g.jpg', b'unique'),
+    ]
+    progress = []
+    groups = find_duplicates([(file_path, 0) for file_path in files] + [(files[0], 0)],
+                             worker_count=2, progress_callback=lambda *args: progress.append(args[0]))
+    assert groups == [[files[0], files[1]], [files[3], files[4]]]
+    assert get_redundant_copies(groups) == {files[1], files[4]}
+    assert set(progress) == {"edges", "full"}
+
+
+def test_find_duplicates_skips_unreadable_files(tmp_path):
+    files = [write(tmp_path / 'a.jpg', b'same'), write(tmp_path / 'b.jpg', b'same')]
+    assert find_duplicates([(files[0], 4), (files[1], 4), (str(tmp_path / 'missing.jpg'), 4)]) == [files]
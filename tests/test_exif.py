@@ -0,0 +1,199 @@
+import io
+import random
+import struct
+
+import pytest
+from PIL import Image, TiffImagePlugin
+
+from gearview_core.exif import (read_exif_tags, read_jpeg_exif_tags, get_exif_data, get_camera_info,
+                                get_camera_lens_exif, CAMERA_LENS_TAGS, CANON_CR3_UUID, EXTENDED_TAGS,
+                                ExifParseError, RAF_JPEG_OFFSET_POSITION, RAF_MAGIC)
+
+WANTED_TAGS = {**CAMERA_LENS_TAGS, **EXTENDED_TAGS}
+
+def make_exif(endian='<'):
+    exif = Image.Exif()
+    exif.endian = endian
+    exif[0x010F] = 'Canon'
+    exif[0x0110] = 'Canon EOS R5'
+    exif_ifd = exif.get_ifd(0x8769)
+    exif_ifd[0xA433] = 'Canon'
+    exif_ifd[0xA434] = 'RF24-70mm F2.8 L IS USM'
+    exif_ifd[0x9003] = '2021:05:06 07:08:09'
+    exif_ifd[0x920A] = TiffImagePlugin.IFDRational(50, 1)
+    exif_ifd[0x829D] = TiffImagePlugin.IFDRational(28, 10)
+    exif_ifd[0x8827] = 400
+    exif_ifd[0xA431] = '012345678'
+    return exif
+
+def pillow_tags(exif):
+    """ Pillow가 해석한 같은 태그 (숫자는 float로 맞춤) """
+    values = {**dict(exif), **dict(exif.get_ifd(0x8769))}
+    return {name: normalize(values[tag_id]) for tag_id, name in WANTED_TAGS.items() if tag_id in values}
+
+def normalize(value):
+    return float(value) if isinstance(value, TiffImagePlugin.IFDRational) else value
+
+def jpeg_bytes(exif):
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 12), 'red').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+def app1_segment(payload):
+    return b'\xff\xe1' + struct.pack('>H', len(payload) + 2) + payload
+
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_jpeg_matches_pillow(tmp_path, endian):
+    path = tmp_path / 'IMG_0001.JPG'
+    path.write_bytes(jpeg_bytes(make_exif(endian)))
+    expected = {name: normalize(value) for name, value in get_exif_data(str(path)).items() if name in WANTED_TAGS.values()}
+    assert read_exif_tags(str(path), WANTED_TAGS) == expected
+    assert expected['LensModel'] == 'RF24-70mm F2.8 L IS USM'
+
+@pytest.mark.parametrize('suffix', ['.dng', '.nef', '.cr2', '.arw'])
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_tiff_raw_matches_pillow(tmp_path, suffix, endian):
+    exif = make_exif(endian)
+    tiff = exif.tobytes()[6:]  # "Exif\0\0" 뒤가 TIFF 구조
+    path = tmp_path / ('RAW_0001' + suffix)
+    path.write_bytes(tiff + bytes(4096))
+    loaded = Image.Exif()
+    loaded.load(tiff)
+    assert read_exif_tags(str(path), WANTED_TAGS) == pillow_tags(loaded)
+
+def test_short_app1_before_exif(tmp_path):
+    """ 14바이트보다 짧은 APP1과 XMP APP1 뒤에 있는 Exif도 Pillow 없이 읽어야 함 """
+    data = jpeg_bytes(make_exif())
+    xmp = app1_segment(b'http://ns.adobe.com/xap/1.0/\x00<x:xmpmeta/>')
+    data = data[:2] + app1_segment(b'abcdef') + xmp + app1_segment(b'') + data[2:]
+    path = tmp_path / 'IMG_0002.JPG'
+    path.write_bytes(data)
+    tags = read_jpeg_exif_tags(str(path))
+    assert tags == {'Make': 'Canon', 'Model': 'Canon EOS R5', 'LensMake': 'Canon',
+                    'LensModel': 'RF24-70mm F2.8 L IS USM'}
+
+def test_jpeg_without_exif(tmp_path):
+    path = tmp_path / 'IMG_0003.JPG'
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 12)).save(buffer, 'JPEG')
+    path.write_bytes(buffer.getvalue())
+    assert read_jpeg_exif_tags(str(path)) == {}
+
+# --- RAW/HEIC 헤더 리더 (ISO-BMFF 상자 구조의 CR3/HEIC, 내장 JPEG를 가리키는 RAF) ---
+
+CR3_TAGS = {'Make': 'Canon', 'Model': 'Canon EOS R6', 'LensModel': 'RF24-105mm F4 L IS USM'}
+HEIC_TAGS = {'Make': 'Apple', 'Model': 'iPhone 13 Pro', 'LensModel': 'iPhone 13 Pro back triple camera 5.7mm f/1.5'}
+RAF_TAGS = {'Make': 'FUJIFILM', 'Model': 'X-T5', 'LensModel': 'XF16-55mmF2.8 R LM WR'}
+
+def tiff_bytes(tags, endian='<'):
+    """ tags를 IFD0에 담은 TIFF 구조 (CR3의 CMT2처럼 Exif IFD 태그도 IFD0에 둘 수 있음) """
+    exif = Image.Exif()
+    exif.endian = endian
+    exif.update(tags)
+    return exif.tobytes()[6:]
+
+def box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+def full_box(box_type, version, payload):
+    return box(box_type, bytes([version, 0, 0, 0]) + payload)
+
+def cr3_bytes():
+    canon = box(b'uuid', CANON_CR3_UUID + box(b'CNCV', b'CanonCR3_001/00.10.00/00.00.00')
+                + box(b'CMT1', tiff_bytes({0x010F: 'Canon', 0x0110: 'Canon EOS R6'}))
+                + box(b'CMT2', tiff_bytes({0xA434: 'RF24-105mm F4 L IS USM'}, '>'))
+                + box(b'CMT3', bytes(64)))
+    moov = box(b'moov', box(b'mvhd', bytes(100)) + canon + box(b'trak', bytes(50)))
+    payload = bytes(4096)
+    # 64비트 크기(size == 1)를 쓰는 mdat
+    mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(payload)) + payload
+    return box(b'ftyp', b'crx \x00\x00\x00\x01crx isom') + moov + mdat
+
+def heic_bytes(iloc_version=1, infe_version=2):
+    """ meta 상자의 iinf(항목 종류)와 iloc(항목 위치)이 mdat 안의 Exif 항목을 가리키는 HEIC """
+    exif_item = struct.pack('>I', 6) + b'Exif\x00\x00' + tiff_bytes(
+        {0x010F: 'Apple', 0x0110: 'iPhone 13 Pro', 0xA434: HEIC_TAGS['LensModel']}, '>')
+    ftyp = box(b'ftyp', b'heic\x00\x00\x00\x00mif1heic')
+    # infe 버전 2는 항목 번호 2바이트, 버전 3은 4바이트
+    id_format = '>H' if infe_version == 2 else '>I'
+    infe_image = full_box(b'infe', infe_version, struct.pack(id_format, 1) + b'\x00\x00hvc1\x00')
+    infe_exif = full_box(b'infe', infe_version, struct.pack(id_format, 2) + b'\x00\x00Exif\x00')
+    iinf = full_box(b'iinf', 0, struct.pack('>H', 2) + infe_image + infe_exif)
+    hdlr = full_box(b'hdlr', 0, bytes(4) + b'pict' + bytes(13))
+
+    def meta(mdat_start):
+        exif_start = mdat_start + 8
+        if iloc_version == 1:
+            # 항목마다 construction_method, 위치는 구간 오프셋에 절대 위치
+            items = (struct.pack('>HHHHII', 1, 0, 0, 1, exif_start + len(exif_item), 100)
+                     + struct.pack('>HHHHII', 2, 0, 0, 1, exif_start, len(exif_item)))
+            iloc = full_box(b'iloc', 1, bytes([0x44, 0x00]) + struct.pack('>H', 2) + items)
+        else:
+            # 버전 0, base_offset(4바이트) + 구간 오프셋
+            items = (struct.pack('>HHIHII', 1, 0, 0, 1, exif_start + len(exif_item), 100)
+                     + struct.pack('>HHIHII', 2, 0, mdat_start, 1, 8, len(exif_item)))
+            iloc = full_box(b'iloc', 0, bytes([0x44, 0x40]) + struct.pack('>H', 2) + items)
+        return full_box(b'meta', 0, hdlr + full_box(b'pitm', 0, b'\x00\x01') + iinf + iloc)
+
+    mdat_start = len(ftyp) + len(meta(0))
+    return ftyp + meta(mdat_start) + box(b'mdat', exif_item + bytes(100))
+
+def raf_bytes():
+    exif = Image.Exif()
+    exif[0x010F] = 'FUJIFILM'
+    exif[0x0110] = 'X-T5'
+    exif.get_ifd(0x8769)[0xA434] = RAF_TAGS['LensModel']
+    jpeg = jpeg_bytes(exif)
+    header = (RAF_MAGIC + b'0201FF383501' + b'X-T5'.ljust(32, b'\x00')).ljust(RAF_JPEG_OFFSET_POSITION, b'\x00')
+    header += struct.pack('>II', 160, len(jpeg))
+    return header.ljust(160, b'\x00') + jpeg + bytes(4096)
+
+RAW_FILES = {
+    'IMG_0001.CR3': (cr3_bytes, CR3_TAGS),
+    'IMG_0002.HEIC': (heic_bytes, HEIC_TAGS),
+    'IMG_0003.heic': (lambda: heic_bytes(iloc_version=0), HEIC_TAGS),
+    'IMG_0004.HEIF': (lambda: heic_bytes(infe_version=3), HEIC_TAGS),
+    'DSCF0005.RAF': (raf_bytes, RAF_TAGS),
+}
+
+@pytest.mark.parametrize('name', sorted(RAW_FILES))
+def test_bmff_and_raf_readers(tmp_path, name):
+    make_bytes, expected = RAW_FILES[name]
+    path = tmp_path / name
+    path.write_bytes(make_bytes())
+    assert read_exif_tags(str(path), CAMERA_LENS_TAGS) == expected
+    assert get_camera_info(expected) == get_camera_info(get_camera_lens_exif(str(path)))
+
+@pytest.mark.parametrize('name', sorted(RAW_FILES))
+def test_truncated_raw_files(tmp_path, name):
+    """ 중간에 잘린 파일은 예외 없이 EXIF 없음(또는 잘리기 전까지 읽은 태그)으로 처리 """
+    data = RAW_FILES[name][0]()
+    path = tmp_path / name
+    for length in range(0, len(data), 7):
+        path.write_bytes(data[:length])
+        exif = get_camera_lens_exif(str(path))
+        assert set(exif) <= set(CAMERA_LENS_TAGS.values())
+
+@pytest.mark.parametrize('suffix', ['.cr3', '.heic', '.raf', '.nef', '.dng'])
+def test_garbage_raw_files(tmp_path, suffix):
+    rng = random.Random(suffix)
+    path = tmp_path / ('BAD_0001' + suffix)
+    for data in [b'', b'garbage' * 10, b'\x00' * 100, RAF_MAGIC, b'II*\x00' + b'\xff' * 8]:
+        path.write_bytes(data)
+        assert get_camera_lens_exif(str(path)) == {}
+    for _ in range(200):
+        path.write_bytes(bytes(rng.randrange(256) for _ in range(rng.randrange(200))))
+        assert isinstance(get_camera_lens_exif(str(path)), dict)
+
+def test_heic_exif_in_idat_is_unsupported(tmp_path):
+    """ Exif 항목이 파일 위치가 아닌 곳(construction_method 1, idat)에 있으면 EXIF 없음 """
+    data = bytearray(heic_bytes())
+    # iloc 내용: FullBox 머리 4, 크기 2, 항목 수 2, 항목마다 16바이트 -> 두 번째 항목(Exif)의 construction_method를 1로
+    exif_entry = data.index(b'iloc') + 4 + 4 + 2 + 2 + 16
+    assert data[exif_entry:exif_entry + 4] == struct.pack('>HH', 2, 0)
+    data[exif_entry + 3] = 1
+    path = tmp_path / 'IMG_0006.HEIC'
+    path.write_bytes(bytes(data))
+    with pytest.raises(ExifParseError, match="unsupported Exif item location"):
+        read_exif_tags(str(path))
+    assert get_camera_lens_exif(str(path)) == {}
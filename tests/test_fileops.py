@@ -0,0 +1,216 @@
+import errno
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from gearview_core import fileops
+
+def make_sources(folder, count, size=1000):
+    folder.mkdir()
+    paths = []
+    for i in range(count):
+        path = folder / f'IMG_{i:04d}.JPG'
+        path.write_bytes(bytes([i % 256]) * size)
+        paths.append(str(path))
+    return paths
+
+def test_device_limits_are_separate(tmp_path, monkeypatch):
+    """ 원본 장치와 대상 장치의 동시 작업 수를 따로 제한 """
+    sources = make_sources(tmp_path / 'src', 12)
+    active = {'count': 0, 'max': 0}
+    lock = threading.Lock()
+    real_transfer = fileops.transfer_file
+
+    def counting_transfer(*args, **kwargs):
+        with lock:
+            active['count'] += 1
+            active['max'] = max(active['max'], active['count'])
+        time.sleep(0.02)
+        with lock:
+            active['count'] -= 1
+        return real_transfer(*args, **kwargs)
+
+    monkeypatch.setattr(fileops, 'transfer_file', counting_transfer)
+    jobs = [(path, 'Camera', 'Lens', True) for path in sources]
+    # 원본과 대상이 같은 장치라도 원본 쪽 제한(1)이 적용됨
+    result = fileops.run_file_jobs('copy', jobs, str(tmp_path / 'dst'), worker_count=8,
+                                   source_device_workers=1, target_device_workers=8)
+    assert result[:2] == (12, 0)
+    assert active['max'] == 1
+    active['max'] = 0
+    fileops.run_file_jobs('copy', jobs, str(tmp_path / 'dst2'), worker_count=8,
+                          source_device_workers=8, target_device_workers=2)
+    assert active['max'] == 2
+    assert sorted(os.listdir(tmp_path / 'dst2' / 'Camera' / 'Lens')) == sorted(os.path.basename(p) for p in sources)
+
+def short_copy(source_fd, destination_fd, size):
+    """ 절반만 복사하고 멈추는 커널 복사 (copy_file_range가 0을 반환하는 경우와 같음) """
+    os.write(destination_fd, os.pread(source_fd, size // 2, 0))
+    return size // 2
+
+def unsupported_copy(source_fd, destination_fd, size):
+    os.write(destination_fd, b'partial')
+    raise OSError(errno.EOPNOTSUPP, "not supported")
+
+COPY_METHOD_CHAINS = {
+    'copy_file_range': [('copy_file_range', fileops._copy_file_range_all)],
+    'sendfile': [('sendfile', fileops._sendfile_all)],
+    'copyfileobj': [],
+    'unsupported_then_sendfile': [('clone', unsupported_copy), ('sendfile', fileops._sendfile_all)],
+    'short_then_copyfileobj': [('copy_file_range', short_copy)],
+    'short_then_copy_file_range': [('clone', short_copy), ('copy_file_range', fileops._copy_file_range_all)],
+}
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="kernel copy paths are Linux only")
+@pytest.mark.parametrize('chain', sorted(COPY_METHOD_CHAINS))
+def test_copy_file_fast_fallbacks(tmp_path, monkeypatch, chain):
+    methods = [(name, method) for name, method in COPY_METHOD_CHAINS[chain]
+               if name == 'clone' or hasattr(os, name)]
+    monkeypatch.setattr(fileops, '_kernel_copy_methods', lambda: methods)
+    monkeypatch.setattr(fileops, '_unsupported_copy_methods', {'clone': set(), 'copy_file_range': set(), 'sendfile': set()})
+    source = tmp_path / 'IMG_0001.JPG'
+    data = os.urandom(300_000)
+    source.write_bytes(data)
+    os.utime(source, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+    destination = tmp_path / 'copy.JPG'
+    fileops.copy_file_fast(str(source), str(destination))
+    assert destination.read_bytes() == data
+    assert os.stat(destination).st_mtime_ns == os.stat(source).st_mtime_ns
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="kernel copy paths are Linux only")
+def test_copy_file_fast_rejects_truncated_copy(tmp_path, monkeypatch):
+    """ 모든 방법이 끝까지 복사하지 못하면 성공으로 처리하지 않음 (이동 시 원본 삭제 방지) """
+    monkeypatch.setattr(fileops, '_kernel_copy_methods', lambda: [('copy_file_range', short_copy)])
+    monkeypatch.setattr(fileops.shutil, 'copyfileobj', lambda source, destination: destination.write(source.read(10)))
+    source = tmp_path / 'IMG_0001.JPG'
+    source.write_bytes(os.urandom(1000))
+    with pytest.raises(OSError):
+        fileops.copy_file_fast(str(source), str(tmp_path / 'copy.JPG'))
+    # 실패한 복사의 잘린 대상 파일은 남기지 않음
+    with pytest.raises(OSError):
+        fileops.transfer_file('copy', str(source), str(tmp_path / 'copy2.JPG'))
+    assert not (tmp_path / 'copy2.JPG').exists()
+    # 다른 장치로 이동하는 경우 (이름 바꾸기 대신 복사 후 원본 삭제)
+    def cross_device_rename(source_path, destination_path):
+        raise OSError(errno.EXDEV, "cross-device link")
+    monkeypatch.setattr(os, 'rename', cross_device_rename)
+    result = fileops.run_file_jobs('move', [(str(source), 'Camera', 'Lens', True)], str(tmp_path / 'dst'))
+    assert result[:2] == (0, 1)
+    assert source.exists()
+    assert os.listdir(tmp_path / 'dst' / 'Camera' / 'Lens') == []
+
+def test_reserve_numbers_taken_names(tmp_path):
+    """ 대상 폴더에 이미 있는 이름과 같은 실행에서 예약한 이름을 모두 피함 """
+    folder = tmp_path / 'dst'
+    folder.mkdir()
+    (folder / 'a.jpg').write_bytes(b'existing')
+    (folder / 'a(2).jpg').write_bytes(b'existing')
+    destinations = fileops.DestinationIndex()
+    reserved = [destinations.reserve(str(folder), 'a.jpg')[0] for _ in range(3)]
+    assert reserved == [str(folder / 'a(1).jpg'), str(folder / 'a(3).jpg'), str(folder / 'a(4).jpg')]
+    assert destinations.reserve(str(folder), 'b.jpg')[0] == str(folder / 'b.jpg')
+    # 예약만 하고 파일은 만들지 않음 (기존 파일은 그대로)
+    assert sorted(os.listdir(folder)) == ['a(2).jpg', 'a.jpg']
+
+def test_same_name_sources_in_one_batch(tmp_path):
+    """ 다른 폴더의 같은 이름 파일을 한 번에 복사해도 덮어쓰지 않음 """
+    sources = []
+    for i in range(3):
+        source = tmp_path / f'card{i}' / 'IMG_0001.JPG'
+        source.parent.mkdir()
+        source.write_bytes(bytes([i]) * 100)
+        sources.append(str(source))
+    jobs = [(source, 'Camera', 'Lens', True) for source in sources]
+    assert fileops.run_file_jobs('copy', jobs, str(tmp_path / 'dst'), worker_count=3)[:2] == (3, 0)
+    folder = tmp_path / 'dst' / 'Camera' / 'Lens'
+    assert sorted(os.listdir(folder)) == ['IMG_0001(1).JPG', 'IMG_0001(2).JPG', 'IMG_0001.JPG']
+    assert sorted((folder / name).read_bytes() for name in os.listdir(folder)) == [bytes([i]) * 100 for i in range(3)]
+
+@pytest.mark.parametrize('case_insensitive', [True, False])
+def test_reserve_case_collisions(tmp_path, monkeypatch, case_insensitive):
+    """ 대소문자를 구분하지 않는 파일 시스템에서는 A.JPG와 a.jpg를 같은 이름으로 봄 """
+    monkeypatch.setattr(fileops, 'CASE_INSENSITIVE_NAMES', case_insensitive)
+    folder = tmp_path / 'dst'
+    folder.mkdir()
+    (folder / 'A.JPG').write_bytes(b'existing')
+    destinations = fileops.DestinationIndex()
+    first = destinations.reserve(str(folder), 'a.jpg')[0]
+    second = destinations.reserve(str(folder), 'A.jpg')[0]
+    if case_insensitive:
+        assert (first, second) == (str(folder / 'a(1).jpg'), str(folder / 'A(2).jpg'))
+    else:
+        assert (first, second) == (str(folder / 'a.jpg'), str(folder / 'A.jpg'))
+
+def test_reserve_finds_already_linked_source(tmp_path):
+    """ 이미 원본을 가리키는 파일이 있으면 새 이름 대신 그 경로를 돌려줌 (링크 다시 실행) """
+    source = tmp_path / 'IMG_0001.JPG'
+    source.write_bytes(b'photo')
+    folder = tmp_path / 'dst'
+    folder.mkdir()
+    os.link(source, folder / 'IMG_0001.JPG')
+    source_stat = os.stat(source)
+    destinations = fileops.DestinationIndex(find_linked=True)
+    assert destinations.reserve(str(folder), 'IMG_0001.JPG', source_stat) == (
+        str(folder / 'IMG_0001.JPG'), os.stat(folder).st_dev, True)
+    # 복사 모드는 내용을 비교하지 않으므로 새 번호를 붙임
+    assert fileops.DestinationIndex().reserve(str(folder), 'IMG_0001.JPG', source_stat)[0] == str(
+        folder / 'IMG_0001(1).JPG')
+    # 같은 실행에서 방금 예약한 원본도 다시 찾음
+    other = tmp_path / 'IMG_0002.JPG'
+    other.write_bytes(b'photo 2')
+    path, _, linked = destinations.reserve(str(folder), 'IMG_0002.JPG', os.stat(other))
+    assert (path, linked) == (str(folder / 'IMG_0002.JPG'), False)
+    assert destinations.reserve(str(folder), 'IMG_0002.JPG', os.stat(other))[2]
+
+def link_jobs(sources):
+    return [(source, 'Camera', 'Lens', True) for source in sources]
+
+def test_link_uses_hard_links_and_reruns_incrementally(tmp_path):
+    sources = make_sources(tmp_path / 'src', 3)
+    target = tmp_path / 'links'
+    folder = target / 'Camera' / 'Lens'
+    assert fileops.run_file_jobs('link', link_jobs(sources), str(target))[:2] == (3, 0)
+    inodes = {name: os.stat(folder / name).st_ino for name in os.listdir(folder)}
+    assert inodes == {os.path.basename(source): os.stat(source).st_ino for source in sources}
+    # 다시 실행하면 이미 있는 링크는 그대로 두고 새 원본만 추가
+    sources += make_sources(tmp_path / 'src2', 1)
+    assert fileops.run_file_jobs('link', link_jobs(sources), str(target))[:2] == (4, 0)
+    assert sorted(os.listdir(folder)) == ['IMG_0000(1).JPG', 'IMG_0000.JPG', 'IMG_0001.JPG', 'IMG_0002.JPG']
+    assert all(os.stat(folder / name).st_ino == inode for name, inode in inodes.items())
+
+def test_link_falls_back_to_symlinks(tmp_path, monkeypatch):
+    """ 하드 링크를 만들 수 없으면 절대 경로 심볼릭 링크, 원본이 사라진 링크는 다음 실행에서 지움 """
+    sources = make_sources(tmp_path / 'src', 2)
+
+    def no_hard_links(source_path, destination_path):
+        raise OSError(errno.EPERM, "hard links not supported")
+    monkeypatch.setattr(os, 'link', no_hard_links)
+    target = tmp_path / 'links'
+    folder = target / 'Camera' / 'Lens'
+    assert fileops.run_file_jobs('link', link_jobs(sources), str(target))[:2] == (2, 0)
+    for source in sources:
+        link_path = folder / os.path.basename(source)
+        assert os.readlink(link_path) == os.path.abspath(source)
+    os.remove(sources[1])
+    assert fileops.run_file_jobs('link', link_jobs(sources[:1]), str(target))[:2] == (1, 0)
+    assert os.listdir(folder) == [os.path.basename(sources[0])]
+
+def test_remove_broken_links_only_removes_dangling_symlinks(tmp_path):
+    folder = tmp_path / 'links'
+    folder.mkdir()
+    source = tmp_path / 'IMG_0001.JPG'
+    source.write_bytes(b'photo')
+    removed_source = tmp_path / 'IMG_0002.JPG'
+    removed_source.write_bytes(b'photo')
+    (folder / 'regular.JPG').write_bytes(b'copy')
+    os.link(removed_source, folder / 'hard.JPG')
+    os.symlink(source, folder / 'valid.JPG')
+    os.symlink(removed_source, folder / 'dangling.JPG')
+    os.symlink(tmp_path, folder / 'folder_link')
+    os.remove(removed_source)
+    assert fileops.remove_broken_links([str(folder), str(tmp_path / 'missing')]) == 1
+    assert sorted(os.listdir(folder)) == ['folder_link', 'hard.JPG', 'regular.JPG', 'valid.JPG']
+    assert (folder / 'hard.JPG').read_bytes() == b'photo'
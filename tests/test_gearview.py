@@ -0,0 +1,270 @@
+import os
+
+import pytest
+
+from gearview_core import scanner
+
+
+class FakeTreeview:
+    """ 화면 없이 쓰는 ttk.Treeview 대역 (항목의 계층, 순서, 옵션만 메모리에 보관) """
+    def __init__(self):
+        self.children = {'': []}
+        self.parents = {}
+        self.options = {}
+        self.next_id = 0
+        self.focused = ''
+
+    def insert(self, parent, index, iid=None, **options):
+        if iid is None:
+            self.next_id += 1
+            iid = f'I{self.next_id:03X}'
+        siblings = self.children[parent]
+        siblings.insert(len(siblings) if index == 'end' else index, iid)
+        self.children[iid] = []
+        self.parents[iid] = parent
+        self.options[iid] = {'text': '', 'values': '', 'open': False, 'tags': '', **options}
+        return iid
+
+    def delete(self, *items):
+        for item in items:
+            for child in list(self.children[item]):
+                self.delete(child)
+            parent = self.parents.pop(item)
+            if parent is not None:
+                self.children[parent].remove(item)
+            del self.children[item], self.options[item]
+
+    def exists(self, item):
+        return item in self.options
+
+    def get_children(self, item=''):
+        return tuple(self.children[item])
+
+    def parent(self, item):
+        return self.parents[item]
+
+    def move(self, item, parent, index):
+        self.children[self.parents[item]].remove(item)
+        self.children[parent].insert(index, item)
+        self.parents[item] = parent
+
+    def set_children(self, item, *children):
+        for child in self.children[item]:
+            self.parents[child] = None
+        for child in children:
+            if self.parents[child] is not None:
+                self.children[self.parents[child]].remove(child)
+            self.parents[child] = item
+        self.children[item] = list(children)
+
+    def next(self, item):
+        siblings = self.children[self.parents[item]]
+        index = siblings.index(item) + 1
+        return siblings[index] if index < len(siblings) else ''
+
+    def prev(self, item):
+        siblings = self.children[self.parents[item]]
+        index = siblings.index(item) - 1
+        return siblings[index] if index >= 0 else ''
+
+    def focus(self, item=None):
+        if item is None:
+            return self.focused
+        self.focused = item
+
+    def item(self, item, option=None, **options):
+        if options:
+            self.options[item].update(options)
+        elif option is not None:
+            return self.options[item][option]
+        else:
+            return dict(self.options[item])
+
+    def snapshot(self, item=''):
+        """ 트리 전체를 (텍스트, 하위 항목 목록) 형태로 돌려줌 """
+        return [(self.options[child]['text'], self.snapshot(child)) for child in self.children[item]]
+
+
+class FakeWidget:
+    """ config, pack, after 등 모든 호출을 무시하는 위젯 대역 """
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def gui(gearview):
+    """ 위젯을 대역으로 바꾼 GearView (결과 트리는 FakeTreeview) """
+    gearview.result_tree = FakeTreeview()
+    for name in ('window', 'status_label', 'progress_bar', 'scan_button', 'clear_button', 'preview_label', 'filename_label',
+                 'watch_folders_var'):
+        setattr(gearview, name, FakeWidget())
+    return gearview
+
+
+def scan(gearview, folders, worker_count):
+    """ 스캔 스레드가 보낸 메시지를 모두 UI 쪽 check_scan_result로 처리하고 분류 결과를 돌려줌 """
+    gearview.library.clear()
+    gearview.update_treeview()
+    gearview.scan_files_background(folders, worker_count)
+    result_type, message = gearview.scan_result_queue.queue[-1]
+    assert result_type == "success", message
+    while not gearview.scan_result_queue.empty():
+        gearview.check_scan_result()
+    return grouped_paths(gearview.library)
+
+
+def grouped_paths(library):
+    return {camera: {lens: library.get_group_files(camera, lens) for lens in library.lenses(camera)}
+            for camera in library.cameras()}
+
+
+def scanned_paths(gearview):
+    return [file_path for file_path, _, _, _ in gearview.library.iter_files()]
+
+
+def test_remove_files_from_results_matches_rescan(gui, photo_folders):
+    """ 이동 후 제자리 갱신한 결과와 트리가 남은 파일을 다시 스캔한 결과와 같음 """
+    folders = photo_folders
+    scan(gui, folders, 4)
+    gui.update_treeview()
+    # Camera A는 6개 중 3개, Camera C는 전부 이동 (개수 순서가 바뀌고 빈 그룹이 생김)
+    moved = [path for path in scanned_paths(gui) if os.path.dirname(path) == folders[1]
+             or os.path.basename(path) in ('IMG_1.jpg', 'IMG_3.jpg', 'IMG_5.jpg')]
+    assert len(moved) == 5
+    for file_path in moved:
+        os.remove(file_path)
+    gui.remove_files_from_results(moved)
+    groups = grouped_paths(gui.library)
+    tree = gui.result_tree.snapshot()
+    assert [text for text, _ in tree] == ["Camera B (6 files, 2 lenses)", "Camera A (3 files, 1 lenses)"]
+    assert not set(moved) & (set(scanned_paths(gui)) | set(gui.file_tree_nodes))
+
+    assert scan(gui, folders, 4) == groups
+    gui.update_treeview()
+    assert gui.result_tree.snapshot() == tree
+
+
+def test_streamed_tree_matches_update_treeview(gui, photo_folders, monkeypatch):
+    """ 작은 배치로 나눠 도착한 결과로 만든 트리가 update_treeview로 한 번에 만든 트리와 같음 """
+    monkeypatch.setattr(scanner, 'SCAN_BATCH_SIZE', 4)
+    monkeypatch.setattr(scanner, 'SCAN_BATCH_INTERVAL', 60)
+    scan(gui, photo_folders, 8)
+    streamed_tree = gui.result_tree.snapshot()
+    assert streamed_tree[-1][0] == "Camera C (2 files, 1 lenses)"
+    gui.update_treeview()
+    assert gui.result_tree.snapshot() == streamed_tree
+
+
+def open_tree_item(gui, item):
+    """ 사용자가 항목을 펼친 것처럼 <<TreeviewOpen>> 처리기를 호출 """
+    gui.result_tree.focus(item)
+    gui.on_tree_open(None)
+
+
+def set_photo_mtimes(folders):
+    """ IMG_i.jpg의 수정 시각을 번호 순으로 1초씩 늦게 설정 """
+    for i in range(12):
+        file_path = os.path.join(folders[0], 'sub' if i % 3 == 0 else '', f'IMG_{i}.jpg')
+        os.utime(file_path, (1_000_000 + i, 1_000_000 + i))
+
+
+def test_tree_populates_groups_on_first_open(gui, photo_folders):
+    """ 처음에는 카메라 노드와 빈 자식만 만들고, 펼칠 때 렌즈와 파일 노드를 정렬된 순서로 만듦 """
+    folders = photo_folders
+    set_photo_mtimes(folders)
+    gui.current_sort_mode = 'name'
+    groups = scan(gui, folders, 4)
+    gui.update_treeview()
+    tree = gui.result_tree
+    assert tree.snapshot() == [(text, [("", [])]) for text in
+                               ["Camera A (6 files, 1 lenses)", "Camera B (6 files, 2 lenses)", "Camera C (2 files, 1 lenses)"]]
+    assert not gui.lens_tree_nodes and not gui.file_tree_nodes
+
+    camera_node = gui.camera_tree_nodes["Camera B"]
+    open_tree_item(gui, camera_node)
+    open_tree_item(gui, camera_node)
+    assert tree.snapshot(camera_node) == [("Lens 50mm (3 files)", [("", [])]), ("No lens info (3 files)", [("", [])])]
+    lens_node = gui.lens_tree_nodes[("Camera B", "No lens info")]
+    open_tree_item(gui, lens_node)
+    assert tree.snapshot(lens_node) == [("IMG_8.jpg", []), ("IMG_4.jpg", []), ("IMG_0.jpg", [])]
+    assert sorted(gui.file_tree_nodes) == sorted(groups["Camera B"]["No lens info"])
+
+    # 스캔 중 도착한 파일은 이미 펼친 그룹에만 노드로 추가
+    gui.merge_scan_batch([(os.path.join(folders[1], 'IMG_30.jpg'), "Camera B", "No lens info", (100, 0), ()),
+                          (os.path.join(folders[1], 'IMG_31.jpg'), "Camera C", "No lens info", (100, 0), ())])
+    assert [text for text, _ in tree.snapshot(lens_node)] == ["IMG_8.jpg", "IMG_4.jpg", "IMG_0.jpg", "IMG_30.jpg"]
+    assert tree.snapshot(gui.camera_tree_nodes["Camera C"]) == [("", [])]
+    assert tree.item(gui.camera_tree_nodes["Camera C"], 'text') == "Camera C (3 files, 1 lenses)"
+
+
+def test_sort_and_refresh_use_stored_file_stats(gui, photo_folders, monkeypatch):
+    """ 스캔 중 기록한 크기/수정 시각으로 정렬하고, Refresh File Info는 바뀐 파일만 갱신하고 사라진 파일은 제거 """
+    folders = photo_folders
+    set_photo_mtimes(folders)
+    gui.current_sort_mode = 'name'
+    groups = scan(gui, folders, 4)
+    for file_path in scanned_paths(gui):
+        stat = os.stat(file_path)
+        assert gui.library.get_stat(file_path) == (stat.st_size, stat.st_mtime_ns)
+
+    def no_stat(*args, **kwargs):
+        raise AssertionError("file system accessed while sorting")
+    with monkeypatch.context() as m:
+        m.setattr(os, 'stat', no_stat)
+        m.setattr(os.path, 'getmtime', no_stat)
+        gui.update_treeview()
+        open_tree_item(gui, gui.camera_tree_nodes["Camera B"])
+        lens_node = gui.lens_tree_nodes[("Camera B", "No lens info")]
+        open_tree_item(gui, lens_node)
+    assert [text for text, _ in gui.result_tree.snapshot(lens_node)] == ["IMG_8.jpg", "IMG_4.jpg", "IMG_0.jpg"]
+
+    group_paths = list(groups["Camera B"]["No lens info"])
+    paths_by_name = {os.path.basename(file_path): file_path for file_path in group_paths}
+    newest_path, removed_path = paths_by_name["IMG_0.jpg"], paths_by_name["IMG_4.jpg"]
+    os.utime(newest_path, (2_000_000, 2_000_000))
+    os.remove(removed_path)
+    assert gui.refresh_file_stats(group_paths) == (1, 1)
+    assert [text for text, _ in gui.result_tree.snapshot(lens_node)] == ["IMG_0.jpg", "IMG_8.jpg"]
+    assert removed_path not in gui.library and gui.library.get_stat(removed_path) == (0, 0)
+
+
+def test_preview_prefetches_nearest_neighbours(gui, photo_folders):
+    """ 선택한 파일의 아래/위 형제 파일을 가까운 순으로 번갈아 최대 3개씩 미리 요청 """
+    set_photo_mtimes(photo_folders)
+    scan(gui, photo_folders, 4)
+    open_tree_item(gui, gui.camera_tree_nodes["Camera A"])
+    lens_node = gui.lens_tree_nodes[("Camera A", "Lens 50mm")]
+    open_tree_item(gui, lens_node)
+    file_nodes = gui.result_tree.get_children(lens_node)
+    assert [gui.result_tree.item(item, 'text') for item in file_nodes] == [f"IMG_{i}.jpg" for i in (11, 9, 7, 5, 3, 1)]
+
+    def neighbour_names(item):
+        return [os.path.basename(file_path) for file_path in gui.get_neighbour_file_paths(item)]
+    assert neighbour_names(file_nodes[1]) == ["IMG_7.jpg", "IMG_11.jpg", "IMG_5.jpg", "IMG_3.jpg"]
+    assert neighbour_names(file_nodes[5]) == ["IMG_3.jpg", "IMG_5.jpg", "IMG_7.jpg"]
+
+
+def test_resolve_selected_files_maps_items_without_tree_lookups(gui, photo_folders, monkeypatch):
+    """ 선택한 그룹/파일 아이템을 분석 결과로 바로 바꾸고, 그룹과 그 안의 파일이 함께 선택되어도 한 번만 넣음 """
+    gui.current_sort_mode = 'name'
+    groups = scan(gui, photo_folders, 4)
+    gui.update_treeview()
+    tree = gui.result_tree
+    for camera_name in ("Camera A", "Camera B"):
+        open_tree_item(gui, gui.camera_tree_nodes[camera_name])
+    open_tree_item(gui, gui.lens_tree_nodes[("Camera A", "Lens 50mm")])
+    open_tree_item(gui, gui.lens_tree_nodes[("Camera B", "No lens info")])
+    paths_by_name = {os.path.basename(file_path): file_path for file_path in scanned_paths(gui)}
+    selected_items = [gui.camera_tree_nodes["Camera B"], gui.lens_tree_nodes[("Camera B", "No lens info")],
+                      gui.file_tree_nodes[paths_by_name["IMG_8.jpg"]], gui.file_tree_nodes[paths_by_name["IMG_11.jpg"]],
+                      gui.file_tree_nodes[paths_by_name["IMG_11.jpg"]]]
+
+    def no_tree_lookup(*args, **kwargs):
+        raise AssertionError("selection read back from the tree")
+    monkeypatch.setattr(tree, 'item', no_tree_lookup)
+    jobs = gui.resolve_selected_files(selected_items, False)
+    assert jobs == ([(file_path, "Camera B", "Lens 50mm", False) for file_path in groups["Camera B"]["Lens 50mm"]] +
+                    [(file_path, "Camera B", "No lens info", False) for file_path in groups["Camera B"]["No lens info"]] +
+                    [(paths_by_name["IMG_11.jpg"], "Camera A", "Lens 50mm", True)])
+    assert gui.resolve_selected_files([gui.camera_tree_nodes["Camera C"]], True) == \
+        [(file_path, "Camera C", "No lens info", True) for file_path in groups["Camera C"]["No lens info"]]
@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+
+import pytest
+
+from gearview_core import grouping as grouping_module
+from gearview_core.fields import UNKNOWN_VALUE
+from gearview_core.library import PhotoLibrary
+
+KEYS = ('lens', 'year', 'serial', 'iso')
+
+
+def build_library(rng):
+    """ 연도에는 모르는 값과 빈 값, 본체 번호에는 값이 하나뿐인 필드가 들어간 라이브러리와 행 목록 """
+    library = PhotoLibrary(extra_fields=('year', 'serial', 'iso'))
+    rows = {}
+    for i in range(300):
+        file_path = f"/photos/{i % 7}/IMG_{i:04d}.JPG"
+        lens = rng.choice(["RF24-105mm", "RF50mm", "No lens info"])
+        values = (rng.choice(["2019", "2020", UNKNOWN_VALUE, ""]), "012345", str(rng.choice([100, 400, 3200])))
+        library.add_file(file_path, "Canon EOS R6", lens, (1000, rng.randrange(10 ** 9)), values)
+        rows[file_path] = (lens,) + values
+    # 지운 행은 그룹에 세지 않음
+    removed = rng.sample(sorted(rows), 40)
+    library.remove_files(removed)
+    for file_path in removed:
+        del rows[file_path]
+    return library, rows
+
+
+@pytest.mark.parametrize('max_array_code', [grouping_module.MAX_ARRAY_CODE, 1])
+def test_group_by_matches_tuple_keyed_counts(monkeypatch, max_array_code):
+    # 1이면 그룹 번호가 array 대신 list에 담기는 경우 (기수의 곱이 아주 큰 경우)
+    monkeypatch.setattr(grouping_module, 'MAX_ARRAY_CODE', max_array_code)
+    library, rows = build_library(random.Random(3))
+    grouping = library.group_by(KEYS)
+    assert grouping.total == len(rows)
+    for depth in range(len(KEYS) + 1):
+        expected = Counter(key[:depth] for key in rows.values())
+        for prefix, count in expected.items():
+            assert grouping.count(prefix) == count
+            assert set(grouping.files(prefix)) == {file_path for file_path, key in rows.items()
+                                                   if key[:depth] == prefix}
+            if depth < len(KEYS):
+                children = Counter(key[depth] for key in rows.values() if key[:depth] == prefix)
+                assert dict(grouping.children(prefix)) == children
+    assert grouping.count(("No such lens",)) == 0
+    assert grouping.files(("No such lens",)) == []
+    assert grouping.children(("No such lens",)) == []
+
+
+def test_group_files_are_newest_first():
+    library, rows = build_library(random.Random(5))
+    grouping = library.group_by(('serial',))
+    mtimes = [library.get_mtime(file_path) for file_path in grouping.files(("012345",))]
+    assert len(mtimes) == len(rows)
+    assert mtimes == sorted(mtimes, reverse=True)
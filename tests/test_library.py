@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from gearview_core.library import PhotoLibrary
+
+QUERIES = ['img', '_00', '0001', 'dsc', '.nef', 'p', 'zz', 'new']
+
+
+def snapshot(library):
+    """ 그룹 개수와 파일명 검색 결과 (빈 행을 다시 쓴 라이브러리와 새 라이브러리 비교용) """
+    groups = {(camera_info, lens_info): (library.lens_file_count(camera_info, lens_info),
+                                         sorted(library.get_group_files(camera_info, lens_info)))
+              for camera_info in library.cameras() for lens_info in library.lenses(camera_info)}
+    cameras = {camera_info: library.camera_file_count(camera_info) for camera_info in library.cameras()}
+    searches = {}
+    for query in QUERIES:
+        view = library.filter(name=query)
+        searches[query] = sorted(file_path for camera_info in view.cameras()
+                                 for file_path in view.get_group_files(camera_info))
+    return len(library), cameras, groups, searches
+
+
+# 60이면 지운 행이 남은 행보다 많아져 파일명 색인을 다시 만드는 경우
+@pytest.mark.parametrize('extra_removed', [10, 60])
+def test_reused_rows_match_fresh_library(extra_removed):
+    rng = random.Random(11)
+    files = {}
+    for i in range(120):
+        prefix = rng.choice(['IMG', 'DSC', 'P'])
+        files[f"/photos/{i % 5}/{prefix}_{i:04d}.{rng.choice(['JPG', 'NEF'])}"] = (
+            rng.choice(["Camera A", "Camera B", "Camera C"]), rng.choice(["Lens 1", "Lens 2"]))
+    library = PhotoLibrary()
+    for file_path, (camera_info, lens_info) in files.items():
+        library.add_file(file_path, camera_info, lens_info, (1, 1))
+
+    # Camera C를 모두 지워 그룹과 이름이 사라지게 한 뒤, 비운 행에 다른 이름/그룹의 파일을 넣음
+    removed = [file_path for file_path, (camera_info, _) in files.items() if camera_info == "Camera C"]
+    removed += rng.sample([file_path for file_path in files if file_path not in removed], extra_removed)
+    library.remove_files(removed)
+    for file_path in removed:
+        del files[file_path]
+    for i in range(len(removed) // 2):
+        file_path = f"/photos/new/new_{i:03d}.jpg"
+        files[file_path] = (rng.choice(["Camera A", "Camera D"]), "Lens 3")
+        library.add_file(file_path, *files[file_path], (1, 1))
+    # 이미 있는 파일을 다른 그룹으로 다시 추가
+    moved_path = next(iter(files))
+    files[moved_path] = ("Camera D", "Lens 1")
+    library.add_file(moved_path, "Camera D", "Lens 1", (1, 1))
+
+    fresh = PhotoLibrary()
+    for file_path, (camera_info, lens_info) in files.items():
+        fresh.add_file(file_path, camera_info, lens_info, (1, 1))
+    assert snapshot(library) == snapshot(fresh)
+    assert "Camera C" not in library.cameras()
+    assert all(library.get_group_key(file_path) == group_key for file_path, group_key in files.items())
+    assert not any(file_path in library for file_path in removed)
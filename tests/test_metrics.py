@@ -0,0 +1,63 @@
+import threading
+
+from gearview_core.metrics import Histogram, Metrics, ThreadProfiler
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    """ 백분위수는 해당 순위가 들어가는 구간의 상한이고, 최댓값보다 커지지 않음 """
+    histogram = Histogram()
+    for seconds, repeat in ((0.00005, 50), (0.002, 40), (0.5, 9), (5.0, 1)):
+        for _ in range(repeat):
+            histogram.add(seconds)
+    assert (histogram.percentile(0.5), histogram.percentile(0.9), histogram.percentile(0.99)) == (0.0001, 0.003, 1.0)
+    assert histogram.percentile(1.0) == 5.0
+    summary = histogram.to_dict()
+    assert (summary["count"], summary["min"], summary["max"]) == (100, 0.00005, 5.0)
+    assert summary["buckets"]["<=0.0001s"] == 50 and summary["buckets"][">3s"] == 1
+
+    single = Histogram()
+    single.add(0.002)
+    assert single.percentile(0.5) == 0.002
+
+
+def test_metrics_snapshot_counts_threads_and_throughput():
+    """ 여러 스레드에서 센 값이 빠지지 않고, .bytes 카운터와 .run 시간으로 처리량을 계산 """
+    metrics = Metrics()
+
+    def count_files():
+        for _ in range(1000):
+            metrics.count("files.done")
+    threads = [threading.Thread(target=count_files) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.count("files.bytes", 2 * 1024 * 1024)
+    metrics.observe("files.run", 2.0)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"files.bytes": 2 * 1024 * 1024, "files.done": 4000}
+    assert snapshot["throughput_mb_per_s"] == {"files": 1.0}
+    metrics.reset()
+    assert metrics.snapshot()["counters"] == {}
+
+
+def profiled_work():
+    return sum(i * i for i in range(20000))
+
+
+def test_thread_profiler_merges_finished_threads():
+    profiler = ThreadProfiler()
+    profiler.start()
+    worker = threading.Thread(target=profiled_work)
+    worker.start()
+    worker.join()
+    stats = profiler.stop()
+    assert any(func[2] == 'profiled_work' for func in stats.stats)
+
+
+def test_thread_profiler_restores_thread_run():
+    original_run = threading.Thread.run
+    profiler = ThreadProfiler()
+    profiler.start()
+    profiler.stop()
+    assert threading.Thread.run is original_run
@@ -0,0 +1,32 @@
+from gearview_core.pairs import find_pair_keys, group_pair_rows
+
+
+def test_find_pair_keys_pairs_raw_and_jpeg():
+    paths = ['a/IMG_1.CR2', 'a/IMG_1.JPG', 'a/IMG_2.jpeg', 'a/IMG_2.nef', 'a/IMG_3.JPG', 'a/IMG_4.ARW']
+    assert find_pair_keys(paths) == {
+        'a/IMG_1.CR2': 'a/IMG_1', 'a/IMG_1.JPG': 'a/IMG_1',
+        'a/IMG_2.jpeg': 'a/IMG_2', 'a/IMG_2.nef': 'a/IMG_2',
+    }
+
+
+def test_find_pair_keys_without_raw():
+    assert find_pair_keys(['a/IMG_1.JPG', 'a/IMG_2.jpg']) == {}
+
+
+def test_find_pair_keys_keeps_path_case():
+    assert find_pair_keys(['A/IMG_1.CR2', 'a/img_1.jpg']) == {}
+    assert find_pair_keys(['A/IMG_1.CR2', 'A/IMG_1.jpg']) == {'A/IMG_1.CR2': 'A/IMG_1', 'A/IMG_1.jpg': 'A/IMG_1'}
+
+
+def test_group_pair_rows_prefers_known_lens():
+    rows = [
+        ('a/IMG_1.CR2', 'Canon EOS R6', 'No lens info', (1, 1.0), ()),
+        ('a/IMG_1.JPG', 'Canon EOS R6', 'RF24-105mm F4 L IS USM', (1, 1.0), ()),
+        ('a/IMG_2.JPG', 'Canon EOS R6', 'RF50mm F1.8 STM', (1, 1.0), ()),
+    ]
+    grouped = {row[0]: row[2] for row in group_pair_rows(rows)}
+    assert grouped == {
+        'a/IMG_1.CR2': 'RF24-105mm F4 L IS USM',
+        'a/IMG_1.JPG': 'RF24-105mm F4 L IS USM',
+        'a/IMG_2.JPG': 'RF50mm F1.8 STM',
+    }
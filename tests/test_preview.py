@@ -0,0 +1,156 @@
+import io
+import struct
+import threading
+import time
+
+import pytest
+from PIL import Image, JpegImagePlugin
+
+from gearview_core import preview
+from gearview_core.exif import ExifParseError, read_jpeg_exif_thumbnail
+
+
+def jpeg_bytes(size, color):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def write_jpeg_with_thumbnail(file_path, size, color, thumbnail=None, thumbnail_length=None):
+    """ IFD0(Model)과 IFD1(JPEGInterchangeFormat/Length)만 있는 APP1을 붙인 JPEG """
+    model = b'Camera A\0'
+    ifd0_offset = 8
+    ifd1_offset = ifd0_offset + 2 + 12 + 4
+    model_offset = ifd1_offset + 2 + 2 * 12 + 4
+    thumbnail_offset = model_offset + len(model)
+    tiff = b'II*\0' + struct.pack('<I', ifd0_offset)
+    tiff += struct.pack('<H', 1) + struct.pack('<HHII', 0x0110, 2, len(model), model_offset)
+    tiff += struct.pack('<I', ifd1_offset if thumbnail is not None else 0)
+    tiff += struct.pack('<H', 2)
+    tiff += struct.pack('<HHII', 0x0201, 4, 1, thumbnail_offset)
+    tiff += struct.pack('<HHII', 0x0202, 4, 1, thumbnail_length or len(thumbnail or b''))
+    tiff += struct.pack('<I', 0) + model + (thumbnail or b'')
+    app1 = b'Exif\0\0' + tiff
+    data = jpeg_bytes(size, color)
+    with open(file_path, 'wb') as f:
+        f.write(data[:2] + b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + data[2:])
+
+
+@pytest.fixture
+def decoded_sizes(monkeypatch):
+    """ JPEG을 실제로 디코딩할 때의 크기 (draft 축소가 적용된 뒤의 크기) """
+    sizes = []
+    original_load = JpegImagePlugin.JpegImageFile.load
+
+    def recording_load(self):
+        if self.tile:
+            sizes.append(self.size)
+        return original_load(self)
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, 'load', recording_load)
+    return sizes
+
+
+def test_preview_uses_embedded_thumbnail(tmp_path, decoded_sizes):
+    """ 미리보기 영역을 채울 만한 EXIF 썸네일이 있으면 원본 대신 썸네일만 디코딩 """
+    file_path = str(tmp_path / 'IMG_0001.jpg')
+    thumbnail = jpeg_bytes((160, 120), 'green')
+    write_jpeg_with_thumbnail(file_path, (1600, 1200), 'red', thumbnail)
+    assert read_jpeg_exif_thumbnail(file_path) == thumbnail
+    image = preview.load_preview_image(file_path)
+    assert image.size == (160, 120)
+    red, green, blue = image.getpixel((80, 60))
+    assert green > 100 and red < 50
+    assert decoded_sizes == [(160, 120)]
+
+
+@pytest.mark.parametrize('thumbnail_size', [None, (40, 30)])
+def test_preview_falls_back_to_draft_decode(tmp_path, decoded_sizes, thumbnail_size):
+    """ 썸네일이 없거나 너무 작으면 원본을 미리보기 크기 이상인 가장 작은 배율로 디코딩 """
+    file_path = str(tmp_path / 'IMG_0001.jpg')
+    thumbnail = jpeg_bytes(thumbnail_size, 'green') if thumbnail_size else None
+    write_jpeg_with_thumbnail(file_path, (1600, 1200), 'red', thumbnail)
+    image = preview.load_preview_image(file_path)
+    assert image.size == (200, 150)
+    red, green, blue = image.getpixel((100, 75))
+    assert red > 200 and green < 50
+    assert decoded_sizes[-1] == (200, 150)
+
+
+def test_truncated_thumbnail_is_rejected(tmp_path, decoded_sizes):
+    """ 썸네일 길이가 파일 끝을 넘으면 ExifParseError, 미리보기는 원본 축소 디코딩으로 대체 """
+    file_path = str(tmp_path / 'IMG_0001.jpg')
+    write_jpeg_with_thumbnail(file_path, (800, 600), 'red', jpeg_bytes((160, 120), 'green'), thumbnail_length=10**6)
+    with pytest.raises(ExifParseError):
+        read_jpeg_exif_thumbnail(file_path)
+    assert preview.load_preview_image(file_path).size == (200, 150)
+    assert decoded_sizes == [(200, 150)]
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class LoadedPaths(list):
+    gate = None
+
+
+@pytest.fixture
+def loaded_paths(monkeypatch):
+    """ 디코딩하는 대신 경로를 기록하는 load_preview_image (gate가 닫혀 있으면 대기) """
+    paths = LoadedPaths()
+    gate = threading.Event()
+    gate.set()
+
+    def fake_load_preview_image(file_path, size, thumbnail_cache=None):
+        paths.append(file_path)
+        assert gate.wait(5)
+        return Image.new('RGB', (4, 4))
+    monkeypatch.setattr(preview, 'load_preview_image', fake_load_preview_image)
+    paths.gate = gate
+    return paths
+
+
+def request_and_wait(loader, file_path, prefetch=()):
+    delivered = []
+    loader.request(file_path, 1, [(path, 1) for path in prefetch], lambda *args: delivered.append(args))
+    wait_until(lambda: delivered)
+    return delivered
+
+
+def test_preview_loader_evicts_least_recently_used(loaded_paths):
+    """ 캐시가 가득 차면 가장 오래 쓰지 않은 항목부터 버리고, 캐시에 있으면 다시 디코딩하지 않음 """
+    loader = preview.PreviewLoader(worker_count=1, cache_size=2)
+    request_and_wait(loader, 'a.jpg')
+    request_and_wait(loader, 'b.jpg')
+    assert loader.get_cached('a.jpg', 1) is not None
+    request_and_wait(loader, 'c.jpg')
+    assert loader.get_cached('b.jpg', 1) is None
+    assert loader.get_cached('a.jpg', 1) is not None and loader.get_cached('c.jpg', 1) is not None
+    assert request_and_wait(loader, 'a.jpg')[0][0] == 'a.jpg'
+    assert loaded_paths == ['a.jpg', 'b.jpg', 'c.jpg']
+    # 수정 시각이 바뀌면 다른 항목
+    assert loader.get_cached('a.jpg', 2) is None
+
+
+def test_preview_loader_prefetches_and_drops_stale_requests(loaded_paths):
+    """ 이웃 파일을 미리 만들어 두고, 새 요청이 오면 아직 시작하지 않은 이전 요청은 버림 """
+    loader = preview.PreviewLoader(worker_count=1, cache_size=16)
+    delivered = request_and_wait(loader, 'a.jpg', prefetch=['b.jpg', 'c.jpg'])
+    wait_until(lambda: loader.get_cached('c.jpg', 1) is not None)
+    assert loaded_paths == ['a.jpg', 'b.jpg', 'c.jpg'] and len(delivered) == 1
+
+    loaded_paths.gate.clear()
+    stale = []
+    loader.request('x.jpg', 1, [('y.jpg', 1), ('z.jpg', 1)], lambda *args: stale.append(args))
+    wait_until(lambda: loaded_paths[-1] == 'x.jpg')
+    current = []
+    loader.request('w.jpg', 1, [('b.jpg', 1)], lambda *args: current.append(args))
+    loaded_paths.gate.set()
+    wait_until(lambda: current)
+    assert loaded_paths == ['a.jpg', 'b.jpg', 'c.jpg', 'x.jpg', 'w.jpg']
+    assert stale == [] and current[0][0] == 'w.jpg' and not loader.is_waiting()
+    # 이미 만든 파일을 다시 선택하면 콜백을 바로 호출
+    assert request_and_wait(loader, 'x.jpg')[0][0] == 'x.jpg'
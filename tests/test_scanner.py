@@ -0,0 +1,198 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from gearview_core import scanner
+from gearview_core.index import load_scan_index, open_scan_index
+
+
+def write_jpeg(file_path, model):
+    exif = Image.Exif()
+    exif[0x0110] = model
+    Image.new('RGB', (16, 16), 'blue').save(file_path, 'JPEG', exif=exif)
+
+
+def grouped_paths(library):
+    return {camera: {lens: library.get_group_files(camera, lens) for lens in library.lenses(camera)}
+            for camera in library.cameras()}
+
+
+def test_map_in_order_keeps_input_order_and_bounds_pending():
+    """ 늦게 끝나는 작업이 있어도 입력 순서대로 돌려주고, 대기 중인 작업은 max_pending개 미만으로 유지 """
+    submitted = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            return super().submit(fn, *args)
+
+    def slow_square(n):
+        time.sleep(0.001 * (10 - n % 10))
+        return n * n
+
+    results = []
+    with RecordingExecutor(max_workers=4) as executor:
+        for result in scanner.map_in_order(executor, slow_square, range(40), 5):
+            results.append(result)
+            assert len(submitted) - len(results) < 5
+    assert results == [n * n for n in range(40)]
+
+
+def test_parallel_scan_matches_serial_scan(photo_folders):
+    """ 작업자 수와 상관없이 그룹과 그룹 안 파일 순서가 직렬 스캔과 같고, 파일명만 겹치는 파일은 둘 다 남김 """
+    serial, _ = scanner.scan_folders(photo_folders, worker_count=1, use_index=False)
+    parallel, _ = scanner.scan_folders(photo_folders, worker_count=8, use_index=False)
+    assert grouped_paths(parallel) == grouped_paths(serial)
+    assert sorted(serial.cameras()) == ["Camera A", "Camera B", "Camera C"]
+    assert sorted(serial.get_group_files("Camera C")) == [os.path.join(photo_folders[1], name)
+                                                          for name in ('IMG_0.jpg', 'IMG_20.JPEG')]
+    assert len(serial) == 14
+    assert os.path.join(photo_folders[0], 'sub', 'IMG_0.jpg') in serial
+
+
+def test_scan_events_stream_batches_in_input_order(photo_folders, monkeypatch):
+    """ ("total", n) 다음에 입력 순서대로 나눈 배치가 오고 success로 끝남 """
+    serial, _ = scanner.scan_folders(photo_folders, worker_count=1, use_index=False)
+    monkeypatch.setattr(scanner, 'SCAN_BATCH_SIZE', 4)
+    monkeypatch.setattr(scanner, 'SCAN_BATCH_INTERVAL', 60)
+    events = list(scanner.iter_scan_events(photo_folders, 8, use_index=False))
+    assert events[0] == ("total", 14)
+    assert [event[0] for event in events[1:-1]] == ["batch"] * 4
+    assert [len(event[1]) for event in events[1:-1]] == [4, 4, 4, 2]
+    assert events[-1][0] == "success"
+    streamed = {}
+    for event in events[1:-1]:
+        for file_path, camera_info, lens_info, _, _ in event[1]:
+            streamed.setdefault(camera_info, {}).setdefault(lens_info, []).append(file_path)
+    assert streamed == grouped_paths(serial)
+
+
+def walk_jpeg_paths(top, followlinks=False):
+    return [os.path.join(root, file) for root, _, files in os.walk(top, followlinks=followlinks)
+            for file in files if file.lower().endswith(('.jpg', '.jpeg'))]
+
+
+def test_directory_crawler_matches_os_walk(tmp_path):
+    """ 여러 스레드로 읽어도 os.walk와 같은 순서로 JPG만 돌려주고, 링크 폴더와 숨김 폴더는 옵션대로 처리 """
+    top = tmp_path / 'tree'
+    for folder in ('a/b/c', 'a/d', 'e', '.hidden', '@eaDir'):
+        os.makedirs(top / folder)
+    os.makedirs(tmp_path / 'outside')
+    names = ['1.jpg', 'a/2.JPG', 'a/b/3.jpeg', 'a/b/c/4.jpg', 'a/d/5.jpg', 'e/6.jpg', 'a/7.txt', 'a/b/8.jpg',
+             '.hidden/9.jpg', '@eaDir/10.jpg']
+    for index, name in enumerate(names):
+        write_jpeg(str(top / name), f"Camera {index}")
+    write_jpeg(str(tmp_path / 'outside' / '11.jpg'), "Camera 11")
+    os.symlink(tmp_path / 'outside', top / 'e' / 'link')
+
+    def crawl(**options):
+        return [entry.path for entry in scanner.DirectoryCrawler(4, **options).iter_files([str(top)])]
+
+    expected = walk_jpeg_paths(str(top))
+    assert len(expected) == 9
+    assert crawl() == expected
+    followed = walk_jpeg_paths(str(top), followlinks=True)
+    assert sorted(followed) == sorted(expected + [str(top / 'e' / 'link' / '11.jpg')])
+    assert crawl(follow_symlinks=True) == followed
+    assert crawl(skip_hidden=True) == [path for path in expected if '.hidden' not in path and '@eaDir' not in path]
+
+    # 상위 폴더를 가리키는 링크 순환은 한 번만 읽음
+    os.symlink(top / 'a', top / 'a' / 'b' / 'loop')
+    assert sorted(crawl(follow_symlinks=True)) == sorted(followed)
+
+
+def test_analyze_file_survives_parser_errors(monkeypatch):
+    """ 헤더 리더의 예상하지 못한 예외도 파일 하나의 실패로 처리 (스캔은 계속) """
+    def broken_reader(file_path, wanted):
+        raise ValueError("corrupt tag value")
+    monkeypatch.setattr(scanner, 'get_camera_lens_exif', broken_reader)
+    camera_info, lens_info, field_values, readable = scanner.analyze_file('IMG_0001.JPG', ('year',))
+    assert (camera_info, lens_info, field_values, readable) == ("No camera info", "No lens info", ("Unknown",), False)
+
+
+def test_scan_index_rereads_only_changed_files(tmp_path, monkeypatch):
+    """ 크기나 수정 시각이 바뀐 파일만 다시 읽고, 사라진 파일은 색인에서 지움 """
+    photo_dir = tmp_path / 'photos'
+    photo_dir.mkdir()
+    paths = [str(photo_dir / f'IMG_{i}.JPG') for i in range(4)]
+    for file_path in paths:
+        write_jpeg(file_path, "Camera A")
+    index_path = str(tmp_path / 'index.sqlite3')
+    read_paths = []
+    analyze_file = scanner.analyze_file
+
+    def recording_analyze_file(file_path, extra_fields=()):
+        read_paths.append(file_path)
+        return analyze_file(file_path, extra_fields)
+    monkeypatch.setattr(scanner, 'analyze_file', recording_analyze_file)
+
+    def scan():
+        read_paths.clear()
+        library, _ = scanner.scan_folders([str(photo_dir)], index_path=index_path, worker_count=2)
+        return library
+
+    assert len(scan()) == 4 and sorted(read_paths) == paths
+    assert scan().get_group_files("Camera A") and read_paths == []
+
+    # paths[0]: 수정 시각만 바뀜, paths[1]: 크기만 바뀜 (수정 시각은 그대로), paths[3]: 삭제
+    stat = os.stat(paths[0])
+    write_jpeg(paths[0], "Camera B")
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    stat = os.stat(paths[1])
+    with open(paths[1], 'ab') as f:
+        f.write(b'\0' * 10)
+    os.utime(paths[1], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.remove(paths[3])
+    library = scan()
+    assert sorted(read_paths) == paths[:2]
+    assert library.get_group_key(paths[0]) == ("Camera B", "No lens info")
+
+    conn = open_scan_index(index_path)
+    try:
+        entries = load_scan_index(conn, [str(photo_dir)])
+    finally:
+        conn.close()
+    assert sorted(entries) == paths[:3]
+    assert entries[paths[1]][0] == os.path.getsize(paths[1])
+
+
+def test_scan_index_keeps_entries_of_unlisted_folders(tmp_path, monkeypatch):
+    """ 읽을 수 없는 폴더와 건너뛴 숨김 폴더의 색인 항목은 지우지 않고, 지워진 파일과 폴더의 항목만 지움 """
+    photo_dir = tmp_path / 'photos'
+    for name in ('locked', '.hidden', 'gone'):
+        (photo_dir / name).mkdir(parents=True)
+    paths = {name: str(photo_dir / name / 'IMG_1.JPG') for name in ('locked', '.hidden', 'gone')}
+    paths['top'] = str(photo_dir / 'IMG_2.JPG')
+    for file_path in paths.values():
+        write_jpeg(file_path, "Camera A")
+    index_path = str(tmp_path / 'index.sqlite3')
+    scanner.scan_folders([str(photo_dir)], index_path=index_path, worker_count=2)
+
+    locked_dir = str(photo_dir / 'locked')
+    os.chmod(locked_dir, 0)
+    if os.geteuid() == 0:
+        # root는 권한과 관계없이 읽을 수 있으므로 목록 읽기 실패를 직접 만듦
+        scandir = os.scandir
+
+        def failing_scandir(path='.'):
+            if os.path.normpath(path) == locked_dir:
+                raise PermissionError(13, "Permission denied", path)
+            return scandir(path)
+        monkeypatch.setattr(os, 'scandir', failing_scandir)
+    os.remove(paths['gone'])
+    os.rmdir(photo_dir / 'gone')
+    try:
+        library, _ = scanner.scan_folders([str(photo_dir)], index_path=index_path, worker_count=2,
+                                          skip_hidden=True)
+    finally:
+        os.chmod(locked_dir, 0o755)
+    assert len(library) == 1
+
+    conn = open_scan_index(index_path)
+    try:
+        entries = load_scan_index(conn, [str(photo_dir)])
+    finally:
+        conn.close()
+    assert sorted(entries) == sorted([paths['locked'], paths['.hidden'], paths['top']])
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from gearview_core.library import PhotoLibrary
+from gearview_core.search import SubstringIndex
+
+NAMES = ['IMG_0001.JPG', 'img_0002.jpg', 'DSC_1234.NEF', 'dsc_1234.jpg', 'P1.jpg', 'ab', 'a',
+         'Holiday IMG.jpeg', 'IMG_0001 (1).JPG', 'ÄÖÜ_photo.jpg', '_MG_0010.CR2']
+QUERIES = ['', 'i', 'img', 'IMG_', '_00', '0001', '.jpg', 'a', 'ab', 'b', 'p1', '(1)', 'äö', 'photo.j', 'zzz', '1234.nef']
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_candidates_include_every_match(query):
+    index = SubstringIndex()
+    for item_id, name in enumerate(NAMES):
+        index.add(item_id, name)
+    expected = {item_id for item_id, name in enumerate(NAMES) if query.lower() in name.lower()}
+    candidates = index.candidates(query)
+    assert expected <= candidates
+    assert {item_id for item_id in candidates if query.lower() in NAMES[item_id].lower()} == expected
+
+
+def view_files(view):
+    return {file_path for camera_info in view.cameras() for file_path in view.get_group_files(camera_info)}
+
+
+def test_name_filter_matches_plain_substring_filter():
+    rng = random.Random(7)
+    library = PhotoLibrary()
+    paths = [f"/photos/{rng.choice(['a', 'b'])}/{name}" for name in NAMES]
+    paths += [f"/photos/c/{rng.choice(['IMG', 'DSC', 'P'])}_{rng.randrange(100):04d}.jpg" for _ in range(200)]
+    paths = list(dict.fromkeys(paths))
+    for file_path in paths:
+        library.add_file(file_path, rng.choice(["Camera A", "Camera B"]), "Lens", (1, 1))
+
+    def check():
+        for query in QUERIES:
+            expected = {file_path for file_path in paths if query.lower() in file_path.rsplit('/', 1)[1].lower()}
+            assert view_files(library.filter(name=query)) == expected, query
+
+    check()
+    # 지운 행이 색인 후보에 남아 있어도 결과에는 없어야 함
+    removed = paths[::3]
+    library.remove_files(removed)
+    paths = [file_path for file_path in paths if file_path not in set(removed)]
+    check()
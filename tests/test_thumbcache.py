@@ -0,0 +1,29 @@
+import os
+
+from PIL import Image
+
+from gearview_core.thumbcache import ThumbnailCache, get_thumbnail_name
+
+
+def test_put_and_get(tmp_path):
+    source = tmp_path / 'photo.jpg'
+    Image.new('RGB', (640, 480), 'red').save(source)
+    cache = ThumbnailCache(cache_dir=str(tmp_path / 'cache'), read_shared=False)
+    cache.put(str(source), Image.open(source))
+    thumbnail = cache.get(str(source))
+    assert thumbnail is not None
+    assert max(thumbnail.size) == 256
+
+
+def test_put_removes_temp_file_when_save_fails(tmp_path, monkeypatch):
+    source = tmp_path / 'photo.jpg'
+    Image.new('RGB', (64, 48), 'red').save(source)
+    cache = ThumbnailCache(cache_dir=str(tmp_path / 'cache'), read_shared=False)
+
+    def fail_save(*args, **kwargs):
+        raise ValueError("unsupported image")
+    image = Image.open(source)
+    monkeypatch.setattr(Image.Image, 'save', fail_save)
+    cache.put(str(source), image)
+    assert os.listdir(cache.thumbnail_dir) == []
+    assert not os.path.exists(os.path.join(cache.thumbnail_dir, get_thumbnail_name(str(source))))
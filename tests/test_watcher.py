@@ -0,0 +1,34 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from gearview_core import watcher
+from gearview_core.watcher import FolderWatcher
+
+CLASSIFICATIONS = {
+    'IMG_1.CR2': ("Canon EOS R6", "No lens info"),
+    'IMG_1.JPG': ("Canon EOS R6", "RF24-105mm F4 L IS USM"),
+    'IMG_2.JPG': ("Canon EOS R6", "RF50mm F1.8 STM"),
+}
+
+
+def fake_analyze_file(file_path, extra_fields=()):
+    camera_info, lens_info = CLASSIFICATIONS[os.path.basename(file_path)]
+    return camera_info, lens_info, (), True
+
+
+def test_changed_jpeg_is_grouped_with_unchanged_raw(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher, 'analyze_file', fake_analyze_file)
+    raw_path, jpeg_path, other_path = (str(tmp_path / name) for name in CLASSIFICATIONS)
+    changes = []
+    folder_watcher = FolderWatcher([str(tmp_path)], lambda rows, removed_paths: changes.append(rows),
+                                   use_index=False)
+    folder_watcher._known = {raw_path: (10, 1), jpeg_path: (5, 1), other_path: (5, 1)}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        folder_watcher._executor = executor
+        folder_watcher._apply([(jpeg_path, (6, 2))], [])
+    rows = {row[0]: (row[2], row[3]) for row in changes[0]}
+    assert rows == {
+        jpeg_path: ("RF24-105mm F4 L IS USM", (6, 2)),
+        raw_path: ("RF24-105mm F4 L IS USM", (10, 1)),
+    }
+    assert folder_watcher._known[raw_path] == (10, 1)